@@ -1,10 +1,12 @@
 import traceback
 
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
 
 from app.core.config import settings
-from app.schemas.chat import ChatRequest, ChatResponse
+from app.schemas.chat import ChatRequest, ChatResponse, ChatStreamError, ChatStreamEvent
 from app.services.chat_service import ChatService
+from app.utils.logger import LOGGER
 
 router = APIRouter(prefix="/chat", tags=["chat"])
 
@@ -18,14 +20,14 @@ def get_chat_service() -> ChatService:
 
 
 @router.post("/", response_model=ChatResponse)
-def rag_endpoint(
+async def rag_endpoint(
     request: ChatRequest, chat_service: ChatService = Depends(get_chat_service)
 ):
     """
     * process user question with rag pipeline
     """
     try:
-        response = chat_service.process_question(
+        response = await chat_service.process_question(
             question=request.question,
             top_k=settings.top_k_results,
         )
@@ -34,3 +36,33 @@ def rag_endpoint(
         # in development only, do not do this in production
         tb_str = traceback.print_exc()
         raise HTTPException(status_code=500, detail=str(tb_str))
+
+
+@router.post("/stream")
+async def rag_stream_endpoint(
+    request: ChatRequest, chat_service: ChatService = Depends(get_chat_service)
+):
+    """
+    * process user question and stream the answer as server-sent events
+    * retrieval -> token (repeated) -> done, or error
+    """
+
+    async def event_stream():
+        try:
+            async for event in chat_service.stream_question(
+                question=request.question,
+                top_k=settings.top_k_results,
+            ):
+                yield event.to_sse()
+        except Exception as e:
+            # * headers are already sent - report the failure in-band
+            LOGGER.exception(f"[Chat] Streaming failed: {str(e)}")
+            yield ChatStreamEvent(
+                event="error", data=ChatStreamError(detail=str(e))
+            ).to_sse()
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
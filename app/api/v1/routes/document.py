@@ -1,15 +1,21 @@
+import asyncio
 import os
 import tempfile
+import uuid
 from pathlib import Path
-from typing import List
+from typing import Dict, List, Tuple
 
-import aiofiles
-from fastapi import APIRouter, Depends, File, HTTPException, UploadFile, status
+from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile, status
 from fastapi.responses import JSONResponse
 
 from app.core.config import settings
+from app.core.service_manager import service_manager
+from app.schemas.documents import DocumentListResponse, DocumentRecord
+from app.schemas.jobs import IngestionJobResponse
 from app.services.document_service import DocumentService
+from app.services.ingestion_queue import IngestionQueue, QueueFullError
 from app.utils.logger import LOGGER
+from app.utils.upload import FileTooLargeError, spool_upload
 
 router = APIRouter(prefix="/documents", tags=["documents"])
 
@@ -22,14 +28,22 @@ def get_document_service() -> DocumentService:
     return DocumentService()
 
 
-@router.post("/upload")
+def get_ingestion_queue() -> IngestionQueue:
+    """
+    * get background ingestion queue from service manager
+    """
+    return service_manager.get_ingestion_queue()
+
+
+@router.post("/upload", status_code=status.HTTP_202_ACCEPTED)
 async def upload_document(
     file: UploadFile = File(...),
-    document_service: DocumentService = Depends(get_document_service),
+    ingestion_queue: IngestionQueue = Depends(get_ingestion_queue),
 ):
     """
-    * upload document and store in qdrant vector database
+    * upload document and queue it for background ingestion into qdrant
     """
+    file_path = None
     try:
         # * validate file type
         allowed_types = [
@@ -43,64 +57,57 @@ async def upload_document(
                 detail=f"unsupported file type: {file.content_type}",
             )
 
-        # * validate file size
-        # if hasattr(settings, 'max_file_size') and file.size > settings.max_file_size:
-        #     raise HTTPException(
-        #         status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
-        #         detail=f"file size exceeds maximum allowed size"
-        #     )
-
-        # * create temporary file
-        with tempfile.NamedTemporaryFile(
-            delete=False, suffix=Path(file.filename).suffix
-        ) as temp_file:
-            temp_path = temp_file.name
-
-            async with aiofiles.open(temp_path, "wb") as f:
-                content = await file.read()
-                await f.write(content)
-
-        try:
-            # * process document and store in qdrant
-            processed_doc = await document_service.process_document(
-                file_path=temp_path,
-                filename=file.filename,
-                content_type=file.content_type,
-            )
+        # * stream upload into upload dir so queued work survives a restart
+        # * (file size is validated while streaming)
+        file_path = os.path.join(
+            settings.upload_dir, f"{uuid.uuid4().hex}{Path(file.filename).suffix}"
+        )
+        spooled = await spool_upload(
+            file,
+            file_path,
+            max_size=settings.max_file_size,
+            chunk_size=settings.upload_chunk_size,
+        )
 
-            if processed_doc is None:
-                LOGGER.error(f"Processing returned None for file: {file.filename}")
-                raise HTTPException(
-                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                    detail="Document could not be processed",
-                )
-
-            return JSONResponse(
-                status_code=status.HTTP_201_CREATED,
-                content={
-                    "status": "success",
-                    "message": "document uploaded and processed successfully",
-                    "data": {
-                        "filename": processed_doc.filename,
-                        "chunks_created": processed_doc.chunks_created,
-                        "content_type": processed_doc.content_type,
-                        "processed_at": (
-                            processed_doc.created_at.isoformat()
-                            if hasattr(processed_doc, "created_at")
-                            else None
-                        ),
-                    },
-                },
-            )
+        job = await ingestion_queue.submit(
+            file_path=spooled.path,
+            filename=file.filename,
+            content_type=file.content_type,
+            content_hash=spooled.content_hash,
+        )
 
-        finally:
-            # * cleanup temp file
-            if os.path.exists(temp_path):
-                os.unlink(temp_path)
+        return JSONResponse(
+            status_code=status.HTTP_202_ACCEPTED,
+            content={
+                "status": "accepted",
+                "message": "document queued for processing",
+                "data": {
+                    "job_id": job.id,
+                    "filename": job.filename,
+                    "content_type": job.content_type,
+                    "job_status": job.status,
+                },
+            },
+        )
 
     except HTTPException:
         raise
+    except FileTooLargeError:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail="file size exceeds maximum allowed size",
+        )
+    except QueueFullError:
+        # * cleanup stored file - the job was never queued
+        if file_path and os.path.exists(file_path):
+            os.unlink(file_path)
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="ingestion queue is full, try again later",
+        )
     except Exception as e:
+        if file_path and os.path.exists(file_path):
+            os.unlink(file_path)
         LOGGER.error(f"document upload failed: {file.filename} - {str(e)}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -108,6 +115,23 @@ async def upload_document(
         )
 
 
+@router.get("/jobs/{job_id}", response_model=IngestionJobResponse)
+async def get_ingestion_job(
+    job_id: str,
+    ingestion_queue: IngestionQueue = Depends(get_ingestion_queue),
+):
+    """
+    * get ingestion job status with per-stage progress
+    """
+    job = await ingestion_queue.get_job(job_id)
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="job not found"
+        )
+    # * file_path is the server's spool location - never sent to clients
+    return IngestionJobResponse.model_validate(job.model_dump())
+
+
 @router.post("/upload-multiple")
 async def upload_multiple_documents(
     files: List[UploadFile] = File(...),
@@ -118,81 +142,88 @@ async def upload_multiple_documents(
     """
     try:
         # * validate number of files
-        max_files = getattr(settings, "max_bulk_upload_count", 10)
+        max_files = settings.max_bulk_upload_count
         if len(files) > max_files:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail=f"too many files. maximum allowed: {max_files}",
             )
 
-        results = []
-        errors = []
         allowed_types = [
             "text/plain",
             "application/pdf",
             "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
         ]
-
-        for file in files:
-            try:
-                # * validate file type
-                if file.content_type not in allowed_types:
-                    errors.append(
-                        {
-                            "filename": file.filename,
-                            "error": f"unsupported file type: {file.content_type}",
-                        }
-                    )
-                    continue
-
-                # * validate file size
-                if (
-                    hasattr(settings, "max_file_size")
-                    and file.size > settings.max_file_size
-                ):
-                    errors.append(
-                        {
+        # * per-request bound - the global ingestion cap lives in DocumentService
+        semaphore = asyncio.Semaphore(settings.bulk_upload_concurrency)
+
+        async def process_file(file: UploadFile) -> Tuple[bool, Dict]:
+            """
+            * run one file through spool, extraction, embedding and upsert
+            * returns (success, result or error entry)
+            """
+            # * validate file type
+            if file.content_type not in allowed_types:
+                return False, {
+                    "filename": file.filename,
+                    "error": f"unsupported file type: {file.content_type}",
+                }
+
+            async with semaphore:
+                try:
+                    # * stream upload to a temp file (size validated while streaming)
+                    with tempfile.NamedTemporaryFile(
+                        delete=False, suffix=Path(file.filename).suffix
+                    ) as temp_file:
+                        temp_path = temp_file.name
+
+                    try:
+                        spooled = await spool_upload(
+                            file,
+                            temp_path,
+                            max_size=settings.max_file_size,
+                            chunk_size=settings.upload_chunk_size,
+                        )
+                    except FileTooLargeError:
+                        return False, {
                             "filename": file.filename,
                             "error": "file size exceeds maximum allowed size",
                         }
-                    )
-                    continue
-
-                # * create temporary file
-                with tempfile.NamedTemporaryFile(
-                    delete=False, suffix=Path(file.filename).suffix
-                ) as temp_file:
-                    temp_path = temp_file.name
 
-                    async with aiofiles.open(temp_path, "wb") as f:
-                        content = await file.read()
-                        await f.write(content)
-
-                try:
-                    # * process document and store in qdrant
-                    processed_doc = await document_service.process_document(
-                        file_path=temp_path,
-                        filename=file.filename,
-                        content_type=file.content_type,
-                    )
-
-                    results.append(
-                        {
+                    try:
+                        # * process document and store in qdrant
+                        processed_doc = await document_service.process_document(
+                            file_path=temp_path,
+                            filename=file.filename,
+                            content_type=file.content_type,
+                            content_hash=spooled.content_hash,
+                        )
+                        if processed_doc is None:
+                            raise ValueError("document could not be processed")
+
+                        return True, {
                             "filename": file.filename,
                             "chunks_created": processed_doc.chunks_created,
                             "content_type": processed_doc.content_type,
-                            "status": "success",
+                            # * identical content was already ingested
+                            "status": (
+                                "skipped" if processed_doc.deduplicated else "success"
+                            ),
                         }
-                    )
 
-                finally:
-                    # * cleanup temp file
-                    if os.path.exists(temp_path):
-                        os.unlink(temp_path)
+                    finally:
+                        # * cleanup temp file
+                        if os.path.exists(temp_path):
+                            os.unlink(temp_path)
+
+                except Exception as e:
+                    LOGGER.error(f"file processing failed - {file.filename} - {str(e)}")
+                    return False, {"filename": file.filename, "error": str(e)}
 
-            except Exception as e:
-                LOGGER.error(f"file processing failed - {file.filename} - {str(e)}")
-                errors.append({"filename": file.filename, "error": str(e)})
+        # * process files concurrently - results keep the upload order
+        outcomes = await asyncio.gather(*(process_file(file) for file in files))
+        results = [entry for success, entry in outcomes if success]
+        errors = [entry for success, entry in outcomes if not success]
 
         return JSONResponse(
             status_code=status.HTTP_201_CREATED,
@@ -221,51 +252,131 @@ async def upload_multiple_documents(
         )
 
 
-# # ========================================================================================================
-
-# # @router.get("/{document_id}", response_model=DocumentResponse)
-# # async def get_document(document_id: int, db: Session = Depends(get_db)):
-# #     """get document by id"""
-# #     document = document_service.get_document(db, document_id)
-# #     if not document:
-# #         raise HTTPException(status_code=404, detail="Document not found")
-# #     return document
-
-
-# # @router.get("/", response_model=List[DocumentResponse])
-# # async def get_documents(
-# #     skip: int = 0,
-# #     limit: int = 100,
-# #     db: Session = Depends(get_db)
-# # ):
-# #     """get all documents with pagination"""
-# #     documents = document_service.get_documents(db, skip, limit)
-# #     return documents
-
-
-# # @router.put("/{document_id}", response_model=DocumentResponse)
-# # async def update_document(
-# #     document_id: int,
-# #     document_update: DocumentUpdate,
-# #     db: Session = Depends(get_db)
-# # ):
-# #     """update document metadata and vector embedding"""
-# #     try:
-# #         db_document = document_service.update_document(db, document_id, document_update)
-# #         if not db_document:
-# #             raise HTTPException(status_code=404, detail="Document not found")
-# #         return db_document
-# #     except Exception as e:
-# #         raise HTTPException(status_code=500, detail=str(e))
-
-
-# # @router.delete("/{document_id}", response_model=MessageResponse)
-# # async def delete_document(document_id: int, db: Session = Depends(get_db)):
-# #     """delete document from both postgresql and vector store"""
-# #     try:
-# #         success = document_service.delete_document(db, document_id)
-# #         if not success:
-# #             raise HTTPException(status_code=404, detail="Document not found")
-# #         return MessageResponse(message="Document deleted successfully", success=True)
-# #     except Exception as e:
-# #         raise HTTPException(status_code=500, detail=str(e))
+@router.put("/{filename}")
+async def update_document(
+    filename: str,
+    file: UploadFile = File(...),
+    document_service: DocumentService = Depends(get_document_service),
+):
+    """
+    * re-ingest a revised document - only new or changed chunks are embedded
+    """
+    allowed_types = [
+        "text/plain",
+        "application/pdf",
+        "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    ]
+    if file.content_type not in allowed_types:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"unsupported file type: {file.content_type}",
+        )
+
+    with tempfile.NamedTemporaryFile(
+        delete=False, suffix=Path(filename).suffix
+    ) as temp_file:
+        temp_path = temp_file.name
+
+    try:
+        spooled = await spool_upload(
+            file,
+            temp_path,
+            max_size=settings.max_file_size,
+            chunk_size=settings.upload_chunk_size,
+        )
+        updated_doc = await document_service.update_document(
+            file_path=spooled.path,
+            filename=filename,
+            content_type=file.content_type,
+            content_hash=spooled.content_hash,
+        )
+
+        if updated_doc is None:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="document update failed",
+            )
+
+        return JSONResponse(
+            status_code=status.HTTP_200_OK,
+            content={
+                "status": "success",
+                "message": "document updated successfully",
+                "data": {
+                    "filename": updated_doc.filename,
+                    "chunks_created": updated_doc.chunks_created,
+                    "chunks_embedded": updated_doc.chunks_embedded,
+                    "chunks_reused": updated_doc.chunks_reused,
+                    "chunks_deleted": updated_doc.chunks_deleted,
+                    "content_type": updated_doc.content_type,
+                },
+            },
+        )
+
+    except FileTooLargeError:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail="file size exceeds maximum allowed size",
+        )
+    finally:
+        # * cleanup temp file
+        if os.path.exists(temp_path):
+            os.unlink(temp_path)
+
+
+@router.get("/", response_model=DocumentListResponse)
+async def list_documents(
+    limit: int = Query(100, ge=1, le=1000),
+    offset: int = Query(0, ge=0),
+    document_service: DocumentService = Depends(get_document_service),
+):
+    """
+    * registered documents with status and ingestion metadata, newest first
+    """
+    return await document_service.list_documents(limit=limit, offset=offset)
+
+
+@router.get("/{doc_id}", response_model=DocumentRecord)
+async def get_document(
+    doc_id: int,
+    document_service: DocumentService = Depends(get_document_service),
+):
+    """
+    * get document by id
+    """
+    document = await document_service.get_document(doc_id)
+    if document is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="document not found"
+        )
+    return document
+
+
+@router.delete("/{doc_id}")
+async def delete_document(
+    doc_id: int,
+    document_service: DocumentService = Depends(get_document_service),
+):
+    """
+    * delete a document from the vector store and the document registry
+    """
+    try:
+        document = await document_service.delete_document(doc_id)
+    except Exception as e:
+        LOGGER.error(f"document delete failed: {doc_id} - {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="document delete failed",
+        )
+    if document is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="document not found"
+        )
+    return JSONResponse(
+        status_code=status.HTTP_200_OK,
+        content={
+            "status": "success",
+            "message": "document deleted successfully",
+            "data": {"doc_id": document.doc_id, "filename": document.filename},
+        },
+    )
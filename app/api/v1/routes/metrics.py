@@ -0,0 +1,30 @@
+from fastapi import APIRouter, Depends
+
+from app.core.service_manager import service_manager
+from app.schemas.metrics import MetricsResponse
+from app.services.embeddings_service import EmbeddingService
+
+router = APIRouter(prefix="/metrics", tags=["metrics"])
+
+
+def get_embedding_service() -> EmbeddingService:
+    """
+    * get initialized embedding service from service manager
+    """
+    return service_manager.get_embedding_service()
+
+
+@router.get("/", response_model=MetricsResponse)
+def get_metrics(
+    embedding_service: EmbeddingService = Depends(get_embedding_service),
+):
+    """
+    * embedding usage, throttled time, embedding time, query cache usage and
+      coalesced chat questions and cached answers
+    """
+    return MetricsResponse(
+        embedding=embedding_service.get_metrics(),
+        embedding_cache=embedding_service.get_cache_metrics(),
+        chat=service_manager.get_chat_single_flight().snapshot(),
+        answer_cache=service_manager.get_answer_cache().snapshot(),
+    )
@@ -0,0 +1,81 @@
+# * maintenance commands
+# * usage: python -m app.cli compact-embeddings [--max-mb 512]
+# *        python -m app.cli migrate-payloads [--batch-size 256]
+
+import argparse
+import asyncio
+import os
+
+from app.core.config import settings
+from app.core.executors import execution_layer
+from app.services.document_registry import create_document_registry
+from app.services.embedding_store import PersistentEmbeddingStore
+from app.services.qdrant_vector_store import QdrantVectorStore
+
+
+def compact_embeddings(args: argparse.Namespace):
+    """
+    * evict the persistent embedding store down to its size limit and vacuum it
+    """
+    db_path = os.path.join(settings.data_dir, settings.embedding_store_db)
+    max_mb = args.max_mb if args.max_mb is not None else settings.embedding_store_max_mb
+    store = PersistentEmbeddingStore(db_path, max_bytes=max_mb * 1024 * 1024)
+    try:
+        before = os.path.getsize(db_path)
+        used = store.compact()
+        print(
+            f"compacted {db_path}: {store.count()} embeddings, "
+            f"{before / 1024 / 1024:.1f}MB -> {used / 1024 / 1024:.1f}MB"
+        )
+    finally:
+        store.close()
+
+
+async def _migrate_payloads(batch_size: int):
+    registry = create_document_registry()
+    await registry.open()
+    # * no embedding calls - payloads are rewritten, vectors are kept
+    vector_store = QdrantVectorStore(embedding_service=None, document_registry=registry)
+    try:
+        migrated = await vector_store.migrate_payloads(batch_size=batch_size)
+        print(f"migrated {migrated} points in {vector_store.collection_name}")
+    finally:
+        await vector_store.aclose()
+        await registry.close()
+        execution_layer.shutdown()
+
+
+def migrate_payloads(args: argparse.Namespace):
+    """
+    * rewrite legacy qdrant point payloads in place as compact payloads
+    """
+    asyncio.run(_migrate_payloads(args.batch_size))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="sitbrain-backend maintenance")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    compact = commands.add_parser(
+        "compact-embeddings", help="evict and vacuum the persistent embedding store"
+    )
+    compact.add_argument(
+        "--max-mb", type=int, default=None, help="size limit (default from settings)"
+    )
+    compact.set_defaults(func=compact_embeddings)
+
+    migrate = commands.add_parser(
+        "migrate-payloads",
+        help="rewrite legacy qdrant payloads as compact, versioned payloads",
+    )
+    migrate.add_argument(
+        "--batch-size", type=int, default=256, help="points rewritten per request"
+    )
+    migrate.set_defaults(func=migrate_payloads)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
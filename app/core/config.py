@@ -44,6 +44,11 @@ class Settings(BaseSettings):
     chunk_overlap: int = 200
     top_k_results: int = 5
 
+    # * rag prompt context settings
+    context_max_tokens: int = 3000  # token budget for retrieved chunks
+    context_min_chunk_tokens: int = 64  # smallest truncated chunk worth keeping
+    context_dedup_threshold: float = 0.9  # shingle jaccard of near-duplicates
+
     # * api settings
     api_host: str = "0.0.0.0"
     api_port: int = 8080
@@ -52,6 +57,63 @@ class Settings(BaseSettings):
     root_dir: str
     data_dir: str
     upload_dir: str
+    max_file_size: int = 50 * 1024 * 1024  # bytes
+    max_bulk_upload_count: int = 10
+    upload_chunk_size: int = 1024 * 1024  # bytes read per spool step
+
+    # * execution layer settings
+    cpu_workers: int = 2  # process pool for document parsing (0 = use threads)
+    io_workers: int = 8  # thread pool for blocking sdk calls
+    pdf_pages_per_task: int = 25  # page range size for parallel pdf parsing
+
+    # * ingestion concurrency settings
+    bulk_upload_concurrency: int = 4  # files processed at once per bulk request
+    max_concurrent_ingestions: int = 8  # global cap across all requests and jobs
+    embedding_batch_size: int = 8  # initial chunks per embedding request
+    embedding_concurrency: int = 4  # embedding requests in flight per service
+    pipeline_batch_size: int = 256  # chunks per pipeline batch (one upsert)
+    pipeline_queue_size: int = 4  # batches buffered between pipeline stages
+    pipeline_confirm_timeout: float = 60.0  # seconds for qdrant to apply upserts
+
+    # * embedding api quota settings (0 = unlimited)
+    embedding_requests_per_minute: int = 1500
+    embedding_tokens_per_minute: int = 1_000_000
+    embedding_max_retries: int = 5  # retries on 429/5xx responses
+    embedding_retry_base_delay: float = 1.0  # seconds, doubled per retry
+    embedding_retry_max_delay: float = 30.0  # seconds
+
+    # * adaptive embedding batch settings (provider per-request limits)
+    embedding_max_batch_size: int = 100  # texts per embed_content request
+    embedding_max_batch_tokens: int = 20_000  # estimated tokens per request
+    embedding_target_latency: float = 2.0  # seconds - slower requests shrink
+
+    # * query embedding cache settings
+    query_cache_size: int = 4096  # cached query vectors (0 = disabled)
+    query_cache_ttl: float = 3600.0  # seconds
+
+    # * semantic answer cache settings
+    answer_cache_size: int = 1024  # cached answers (0 = disabled)
+    answer_cache_ttl: float = 3600.0  # seconds
+    answer_cache_threshold: float = 0.95  # min cosine similarity of questions
+
+    # * query embedding micro-batching settings
+    query_batch_max_size: int = 32  # queries per batched request
+    query_batch_max_wait_ms: float = 5.0  # max delay added to a query
+
+    # * persistent embedding store settings
+    embedding_store_db: str = "embedding_store.db"  # in data_dir ("" = disabled)
+    embedding_store_max_mb: int = 1024  # lru eviction past this size
+
+    # * ingestion job queue settings
+    ingestion_workers: int = 2
+    ingestion_queue_size: int = 100
+    ingestion_job_db: str = "ingestion_jobs.db"
+
+    # * document registry settings (doc_id referenced by qdrant payloads)
+    document_registry_backend: str = "sqlite"  # "sqlite" | "postgres"
+    document_registry_db: str = "document_registry.db"  # sqlite, in data_dir
+    postgres_pool_min_size: int = 1
+    postgres_pool_max_size: int = 10
 
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
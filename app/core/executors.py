@@ -0,0 +1,86 @@
+import asyncio
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Optional
+
+from app.core.config import settings
+from app.utils.logger import LOGGER
+
+
+class ExecutionLayer:
+    """
+    * executors that keep blocking work off the event loop
+    * - process pool: cpu-bound work (document parsing)
+    * - thread pool: blocking network i/o and light cpu work (sync sdk clients)
+    """
+
+    def __init__(self, cpu_workers: int, io_workers: int):
+        self.cpu_workers = cpu_workers
+        self.io_workers = io_workers
+        self._process_pool: Optional[ProcessPoolExecutor] = None
+        self._thread_pool: Optional[ThreadPoolExecutor] = None
+
+    def start(self):
+        """
+        * create executor pools (safe to call more than once)
+        """
+        if self._thread_pool is None:
+            self._thread_pool = ThreadPoolExecutor(
+                max_workers=self.io_workers, thread_name_prefix="io-worker"
+            )
+        if self._process_pool is None and self.cpu_workers > 0:
+            # * spawn - forking a process that already runs sdk threads is unsafe
+            self._process_pool = ProcessPoolExecutor(
+                max_workers=self.cpu_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        LOGGER.info(
+            f"execution layer started: cpu_workers={self.cpu_workers}, "
+            f"io_workers={self.io_workers}"
+        )
+
+    async def run_in_process(self, func: Callable, *args, **kwargs) -> Any:
+        """
+        * run a picklable cpu-bound function in the process pool
+        * falls back to the thread pool when cpu_workers is 0
+        """
+        executor = self._get_process_pool() or self._get_thread_pool()
+        return await self._run(executor, func, *args, **kwargs)
+
+    async def run_in_thread(self, func: Callable, *args, **kwargs) -> Any:
+        """
+        * run a blocking function in the thread pool
+        """
+        return await self._run(self._get_thread_pool(), func, *args, **kwargs)
+
+    def shutdown(self):
+        """
+        * shutdown executor pools
+        """
+        if self._process_pool is not None:
+            self._process_pool.shutdown(wait=False, cancel_futures=True)
+            self._process_pool = None
+        if self._thread_pool is not None:
+            self._thread_pool.shutdown(wait=False, cancel_futures=True)
+            self._thread_pool = None
+
+    async def _run(self, executor: Executor, func: Callable, *args, **kwargs) -> Any:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor, partial(func, *args, **kwargs))
+
+    def _get_process_pool(self) -> Optional[ProcessPoolExecutor]:
+        if self._process_pool is None and self.cpu_workers > 0:
+            self.start()
+        return self._process_pool
+
+    def _get_thread_pool(self) -> ThreadPoolExecutor:
+        if self._thread_pool is None:
+            self.start()
+        return self._thread_pool
+
+
+# * global execution layer instance
+execution_layer = ExecutionLayer(
+    cpu_workers=settings.cpu_workers, io_workers=settings.io_workers
+)
@@ -1,8 +1,20 @@
+import asyncio
+import os
 from typing import Optional
 
+from app.core.config import settings
+from app.core.executors import execution_layer
+from app.services.answer_cache import SemanticAnswerCache
+from app.services.document_registry import (
+    DocumentRegistry,
+    create_document_registry,
+)
 from app.services.embeddings_service import EmbeddingService
+from app.services.ingestion_queue import IngestionQueue
+from app.services.job_store import IngestionJobStore
 from app.services.llm_service import LLMService
 from app.services.qdrant_vector_store import QdrantVectorStore
+from app.services.single_flight import KeyedLock, SingleFlight
 from app.utils.logger import LOGGER
 
 
@@ -18,6 +30,12 @@ class ServiceManager:
         self.embedding_service: Optional[EmbeddingService] = None
         self.llm_service: Optional[LLMService] = None
         self.vector_store: Optional[QdrantVectorStore] = None
+        self.ingestion_queue: Optional[IngestionQueue] = None
+        self.chat_single_flight: Optional[SingleFlight] = None
+        self.answer_cache: Optional[SemanticAnswerCache] = None
+        self.document_registry: Optional[DocumentRegistry] = None
+        self.ingestion_slots: Optional[asyncio.Semaphore] = None
+        self.content_locks: Optional[KeyedLock] = None
 
     @classmethod
     def get_instance(cls) -> "ServiceManager":
@@ -39,6 +57,9 @@ class ServiceManager:
         try:
             LOGGER.info("initializing application services...")
 
+            # * start process/thread pools for blocking work
+            execution_layer.start()
+
             # * initialize embedding service
             LOGGER.info("initializing embedding service...")
             self.embedding_service = EmbeddingService()
@@ -46,17 +67,51 @@ class ServiceManager:
             # * initialize llm service
             LOGGER.info("initializing llm service...")
             self.llm_service = LLMService()
+            # * identical in-flight chat questions share one rag run
+            self.chat_single_flight = SingleFlight()
+            # * answers for near-duplicate questions over the same context
+            self.answer_cache = SemanticAnswerCache(
+                max_entries=settings.answer_cache_size,
+                ttl_seconds=settings.answer_cache_ttl,
+                threshold=settings.answer_cache_threshold,
+            )
+
+            # * documents referenced by qdrant payloads (doc_id)
+            LOGGER.info("opening document registry...")
+            self.document_registry = create_document_registry()
+            await self.document_registry.open()
 
             # * initialize qdrant vector store
             LOGGER.info("initializing qdrant vector store...")
             self.vector_store = QdrantVectorStore(
-                embedding_service=self.embedding_service
+                embedding_service=self.embedding_service,
+                document_registry=self.document_registry,
             )
 
             # * warm up services
             await self._warmup_services()
 
+            # * global cap on documents being ingested at once (bulk uploads +
+            # * job workers) - bounds embedding quota and in-flight memory
+            self.ingestion_slots = asyncio.Semaphore(settings.max_concurrent_ingestions)
+            # * one ingestion per content hash at a time - the duplicate check
+            # * and the ingest it guards run as one step
+            self.content_locks = KeyedLock()
+
+            # * start background ingestion queue (requeues unfinished jobs)
+            LOGGER.info("starting ingestion job queue...")
+            self.ingestion_queue = IngestionQueue(
+                job_store=IngestionJobStore(
+                    os.path.join(settings.data_dir, settings.ingestion_job_db)
+                ),
+                num_workers=settings.ingestion_workers,
+                max_queue_size=settings.ingestion_queue_size,
+            )
+
             self._initialized = True
+
+            # * workers build document services, so start after initialization
+            await self.ingestion_queue.start()
             LOGGER.info("all services initialized successfully")
 
         except Exception as e:
@@ -72,7 +127,7 @@ class ServiceManager:
 
             # * warm up embedding service
             if self.embedding_service:
-                self.embedding_service.generate_embedding(
+                await self.embedding_service.agenerate_embedding(
                     "warmup test", task_type="retrieval_query"
                 )
 
@@ -123,6 +178,64 @@ class ServiceManager:
             raise RuntimeError("llm service not initialized - call initialize() first")
         return self.llm_service
 
+    def get_chat_single_flight(self) -> SingleFlight:
+        """
+        * get chat question coalescing instance
+        """
+        if not self._initialized or self.chat_single_flight is None:
+            raise RuntimeError(
+                "chat single flight not initialized - call initialize() first"
+            )
+        return self.chat_single_flight
+
+    def get_answer_cache(self) -> SemanticAnswerCache:
+        """
+        * get semantic answer cache instance
+        """
+        if not self._initialized or self.answer_cache is None:
+            raise RuntimeError("answer cache not initialized - call initialize() first")
+        return self.answer_cache
+
+    def get_document_registry(self) -> DocumentRegistry:
+        """
+        * get document registry instance
+        """
+        if not self._initialized or self.document_registry is None:
+            raise RuntimeError(
+                "document registry not initialized - call initialize() first"
+            )
+        return self.document_registry
+
+    def get_ingestion_slots(self) -> asyncio.Semaphore:
+        """
+        * get semaphore limiting concurrent document ingestions
+        """
+        if not self._initialized or self.ingestion_slots is None:
+            raise RuntimeError(
+                "ingestion slots not initialized - call initialize() first"
+            )
+        return self.ingestion_slots
+
+    def get_content_locks(self) -> KeyedLock:
+        """
+        * get per content hash ingestion locks
+        """
+        if not self._initialized or self.content_locks is None:
+            raise RuntimeError(
+                "content locks not initialized - call initialize() first"
+            )
+        return self.content_locks
+
+    def get_ingestion_queue(self) -> IngestionQueue:
+        """
+        * get ingestion job queue instance
+        """
+        if not self._initialized or self.ingestion_queue is None:
+            raise RuntimeError(
+                "ingestion queue not initialized - call initialize() first"
+            )
+        return self.ingestion_queue
+
     async def shutdown(self):
         """
         * cleanup services on shutdown
@@ -131,13 +244,21 @@ class ServiceManager:
             LOGGER.info("shutting down services...")
 
             # * add cleanup logic here
+            if self.ingestion_queue:
+                # * stop workers first - unfinished jobs are recovered on restart
+                await self.ingestion_queue.shutdown()
+                self.ingestion_queue.job_store.close()
+
             if self.vector_store:
-                # * close vector store connections if needed
-                pass
+                await self.vector_store.aclose()
 
             if self.embedding_service:
-                # * cleanup embedding service if needed
-                pass
+                self.embedding_service.close()
+
+            if self.document_registry:
+                await self.document_registry.close()
+
+            execution_layer.shutdown()
 
             self._initialized = False
             LOGGER.info("services shutdown completed")
@@ -5,8 +5,10 @@ from fastapi import FastAPI
 from fastapi.responses import JSONResponse
 
 from app.api.v1.main import api_router
+from app.core.config import settings
 from app.core.service_manager import service_manager
 from app.utils.logger import LOGGER
+from app.utils.upload import UploadSizeLimitMiddleware
 
 
 @asynccontextmanager
@@ -42,6 +44,13 @@ app = FastAPI(
     lifespan=lifespan,  # initialize services first running up
 )
 
+# * reject oversized uploads before the multipart body is spooled
+app.add_middleware(
+    UploadSizeLimitMiddleware,
+    max_file_size=settings.max_file_size,
+    max_files=settings.max_bulk_upload_count,
+)
+
 
 # * default endpoint
 @app.get("/")
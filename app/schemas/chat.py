@@ -1,4 +1,4 @@
-from typing import List, Optional
+from typing import List, Literal, Optional, Union
 
 from pydantic import BaseModel, Field
 
@@ -34,3 +34,61 @@ class ChatResponse(BaseModel):
     sources: List[str] = Field(default=[], description="source references")
     processing_time: float = Field(..., description="processing time in seconds")
     session_id: Optional[str] = Field(None, description="session identifier")
+
+
+class RetrievedSource(BaseModel):
+    """
+    * retrieved chunk metadata sent before the answer streams
+    """
+
+    id: str
+    score: float
+    filename: str
+    page_number: Optional[int] = None
+
+
+class RetrievedChunk(BaseModel):
+    """
+    * retrieved chunk - only the payload fields the rag pipeline reads
+    """
+
+    id: str
+    score: float
+    document: str
+    filename: str
+    page_number: Optional[int] = None
+    chunk_index: Optional[int] = None
+    page_end: Optional[int] = None  # * set when neighbouring chunks are stitched
+
+
+class ChatStreamRetrieval(BaseModel):
+    chunks: List[RetrievedSource]
+    retrieval_time: float = Field(..., description="seconds until retrieval finished")
+
+
+class ChatStreamToken(BaseModel):
+    text: str
+
+
+class ChatStreamDone(BaseModel):
+    sources: List[str] = Field(default=[], description="source filenames")
+    processing_time: float = Field(..., description="processing time in seconds")
+    time_to_first_token: Optional[float] = Field(
+        None, description="seconds until the first answer token"
+    )
+
+
+class ChatStreamError(BaseModel):
+    detail: str
+
+
+class ChatStreamEvent(BaseModel):
+    """
+    * one server-sent event of a streamed chat answer
+    """
+
+    event: Literal["retrieval", "token", "done", "error"]
+    data: Union[ChatStreamRetrieval, ChatStreamToken, ChatStreamDone, ChatStreamError]
+
+    def to_sse(self) -> str:
+        return f"event: {self.event}\ndata: {self.data.model_dump_json()}\n\n"
@@ -1,5 +1,6 @@
 from datetime import datetime
-from typing import Optional
+from enum import StrEnum
+from typing import Any, Dict, List, Optional
 
 from pydantic import BaseModel, Field
 
@@ -9,13 +10,89 @@ class ProcessedDocument(BaseModel):
     filename: str
     chunks_created: int
     content_type: str
+    content_hash: Optional[str] = None
+    deduplicated: bool = False  # identical content was already ingested
     created_at: datetime = Field(default_factory=datetime.now)
 
 
+class UpdatedDocument(ProcessedDocument):
+    chunks_embedded: int  # new or changed chunks sent to the embedding api
+    chunks_reused: int  # unchanged chunks that kept their stored vectors
+    chunks_deleted: int  # stale points removed
+
+
+# * version of the compact point payload written to qdrant (ChunkPayload)
+# * points without "v" are legacy dict(ChunkMetadata) payloads
+CHUNK_PAYLOAD_VERSION = 2
+
+
+class ChunkPayload(BaseModel):
+    """
+    * compact qdrant point payload - filename, content type etc. live once per
+      document in the document registry (doc_id)
+    """
+
+    v: int = CHUNK_PAYLOAD_VERSION
+    doc_id: int
+    text: str
+    page: Optional[int] = None
+    chunk: int
+    content_hash: Optional[str] = None  # * document revision (point ids, dedup)
+    chunk_hash: Optional[str] = None  # * sha256 of the chunk text
+    ts: int  # * epoch seconds
+
+
 class ChunkMetadata(BaseModel):
     document: str
     source: str
     filename: str
     page_number: Optional[int]
     chunk_index: int
+    doc_id: Optional[int] = None  # * document registry id (required in payloads)
+    content_hash: Optional[str] = None
+    chunk_hash: Optional[str] = None  # sha256 of the chunk text
     created_at: datetime = Field(default_factory=datetime.now)
+
+    def to_payload(self) -> Dict[str, Any]:
+        """
+        * compact point payload (source path and filename stay out of qdrant)
+        """
+        return ChunkPayload(
+            doc_id=self.doc_id,
+            text=self.document,
+            page=self.page_number,
+            chunk=self.chunk_index,
+            content_hash=self.content_hash,
+            chunk_hash=self.chunk_hash,
+            ts=int(self.created_at.timestamp()),
+        ).model_dump()
+
+
+class DocumentStatus(StrEnum):
+    processing = "processing"
+    ready = "ready"
+    failed = "failed"
+
+
+class DocumentRecord(BaseModel):
+    """
+    * document registry entry - one per filename, referenced by point doc_id
+    * content_hash, size, chunk_count and embedding_model describe the revision
+      currently stored in the vector store
+    """
+
+    doc_id: int
+    filename: str
+    content_type: Optional[str] = None
+    content_hash: Optional[str] = None
+    size: Optional[int] = None  # bytes
+    chunk_count: Optional[int] = None
+    status: DocumentStatus = DocumentStatus.processing
+    embedding_model: Optional[str] = None
+    created_at: datetime
+    updated_at: datetime
+
+
+class DocumentListResponse(BaseModel):
+    total: int
+    documents: List[DocumentRecord]
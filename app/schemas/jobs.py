@@ -0,0 +1,50 @@
+from datetime import datetime
+from enum import StrEnum
+from typing import Dict, Optional
+
+from pydantic import BaseModel, Field
+
+
+class JobStatus(StrEnum):
+    queued = "queued"
+    running = "running"
+    completed = "completed"
+    failed = "failed"
+
+
+class JobStage(StrEnum):
+    extracting = "extracting"
+    chunking = "chunking"
+    embedding = "embedding"
+    upserting = "upserting"
+
+
+class StageProgress(BaseModel):
+    done: int = 0
+    total: int = 0
+
+
+class IngestionJobResponse(BaseModel):
+    """
+    * background ingestion job with per-stage progress, as returned to clients
+    """
+
+    id: str
+    filename: str
+    content_type: str
+    content_hash: Optional[str] = None
+    status: JobStatus = JobStatus.queued
+    stage: Optional[JobStage] = None
+    progress: Dict[str, StageProgress] = Field(default_factory=dict)
+    chunks_created: Optional[int] = None
+    error: Optional[str] = None
+    created_at: datetime = Field(default_factory=datetime.now)
+    updated_at: datetime = Field(default_factory=datetime.now)
+
+
+class IngestionJob(IngestionJobResponse):
+    """
+    * stored job - also knows where the spooled upload lives on the server
+    """
+
+    file_path: str
@@ -0,0 +1,74 @@
+from pydantic import BaseModel, Field
+
+
+class EmbeddingMetrics(BaseModel):
+    """
+    * embedding api usage since startup
+    """
+
+    requests: int = Field(0, description="embed_content calls that succeeded")
+    texts: int = Field(0, description="texts embedded")
+    store_hits: int = Field(
+        0, description="texts served from the persistent embedding store"
+    )
+    estimated_tokens: int = Field(0, description="estimated tokens sent")
+    retries: int = Field(0, description="calls retried after 429/5xx errors")
+    failures: int = Field(0, description="calls that failed after all retries")
+    throttled_seconds: float = Field(
+        0.0, description="time spent waiting on the rate limiter and backoff"
+    )
+    embedding_seconds: float = Field(
+        0.0, description="time spent waiting on the embedding api"
+    )
+
+
+class EmbeddingCacheMetrics(BaseModel):
+    """
+    * query embedding cache usage since startup
+    """
+
+    hits: int = 0
+    misses: int = 0
+    evictions: int = Field(0, description="entries dropped by lru eviction")
+    expirations: int = Field(0, description="entries dropped after ttl")
+    entries: int = 0
+    max_entries: int = 0
+
+
+class AnswerCacheMetrics(BaseModel):
+    """
+    * semantic answer cache usage since startup
+    """
+
+    hits: int = Field(0, description="answers served without llm generation")
+    misses: int = 0
+    evictions: int = Field(0, description="entries dropped by lru eviction")
+    expirations: int = Field(0, description="entries dropped after ttl")
+    invalidations: int = Field(
+        0, description="entries dropped after a document was re-ingested or deleted"
+    )
+    entries: int = 0
+    max_entries: int = 0
+
+
+class SingleFlightMetrics(BaseModel):
+    """
+    * chat question coalescing since startup
+    """
+
+    requests: int = 0
+    coalesced: int = Field(
+        0, description="requests that shared an identical in-flight question"
+    )
+    in_flight: int = 0
+
+
+class MetricsResponse(BaseModel):
+    """
+    * service metrics response
+    """
+
+    embedding: EmbeddingMetrics
+    embedding_cache: EmbeddingCacheMetrics
+    chat: SingleFlightMetrics
+    answer_cache: AnswerCacheMetrics
@@ -0,0 +1,135 @@
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import FrozenSet, Iterable, List, Optional
+
+import numpy as np
+
+from app.schemas.metrics import AnswerCacheMetrics
+
+
+@dataclass
+class _CachedAnswer:
+    chunk_ids: FrozenSet[str]
+    documents: FrozenSet[str]
+    answer: str
+    expires_at: float
+
+
+class SemanticAnswerCache:
+    """
+    * caches generated answers by question embedding
+    * a new question is served from the cache when its embedding is within
+      cosine threshold of a cached question and retrieval returned the same
+      chunk set - so the answer was generated from identical context
+    * lru + ttl bounded; entries are dropped when a contributing document is
+      re-ingested or deleted
+    * question vectors live in one float32 matrix (local vector index)
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float, threshold: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.threshold = threshold
+        self._lock = threading.Lock()
+        self._vectors: Optional[np.ndarray] = None  # * (max_entries, dim)
+        self._entries: "OrderedDict[int, _CachedAnswer]" = OrderedDict()  # * by slot
+        self._free_slots = list(range(max_entries - 1, -1, -1))
+        self._metrics = AnswerCacheMetrics(max_entries=max_entries)
+
+    def get(self, question_vector: List[float], chunk_ids: Iterable) -> Optional[str]:
+        """
+        * cached answer for a near-duplicate question with the same context
+        """
+        query = self._normalize(question_vector)
+        chunk_ids = frozenset(str(chunk_id) for chunk_id in chunk_ids)
+        now = time.monotonic()
+
+        with self._lock:
+            if not self._entries:
+                self._metrics.misses += 1
+                return None
+            slots = np.fromiter(self._entries.keys(), dtype=np.int64)
+            scores = self._vectors[slots] @ query
+            for i in np.argsort(-scores):
+                if scores[i] < self.threshold:
+                    break
+                slot = int(slots[i])
+                entry = self._entries[slot]
+                if entry.expires_at < now:
+                    self._remove(slot)
+                    self._metrics.expirations += 1
+                    continue
+                if entry.chunk_ids == chunk_ids:
+                    self._entries.move_to_end(slot)
+                    self._metrics.hits += 1
+                    return entry.answer
+            self._metrics.misses += 1
+            return None
+
+    def put(
+        self,
+        question_vector: List[float],
+        chunk_ids: Iterable,
+        documents: Iterable[str],
+        answer: str,
+    ):
+        """
+        * cache an answer, evicting the least recently used entry when full
+        """
+        if self.max_entries <= 0:
+            return
+        vector = self._normalize(question_vector)
+
+        with self._lock:
+            if self._vectors is None:
+                self._vectors = np.zeros(
+                    (self.max_entries, vector.shape[0]), dtype=np.float32
+                )
+            if not self._free_slots:
+                self._remove(next(iter(self._entries)))
+                self._metrics.evictions += 1
+            slot = self._free_slots.pop()
+            self._vectors[slot] = vector
+            self._entries[slot] = _CachedAnswer(
+                chunk_ids=frozenset(str(chunk_id) for chunk_id in chunk_ids),
+                documents=frozenset(documents),
+                answer=answer,
+                expires_at=time.monotonic() + self.ttl_seconds,
+            )
+
+    def invalidate_documents(self, documents: Iterable[str]) -> int:
+        """
+        * drop answers generated from any of these documents (by filename)
+        """
+        documents = set(documents)
+        with self._lock:
+            stale = [
+                slot
+                for slot, entry in self._entries.items()
+                if entry.documents & documents
+            ]
+            for slot in stale:
+                self._remove(slot)
+            self._metrics.invalidations += len(stale)
+            return len(stale)
+
+    def clear(self):
+        with self._lock:
+            for slot in list(self._entries):
+                self._remove(slot)
+
+    def snapshot(self) -> AnswerCacheMetrics:
+        with self._lock:
+            return self._metrics.model_copy(update={"entries": len(self._entries)})
+
+    def _remove(self, slot: int):
+        del self._entries[slot]
+        self._free_slots.append(slot)
+
+    @staticmethod
+    def _normalize(vector: List[float]) -> np.ndarray:
+        vector = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
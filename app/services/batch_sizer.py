@@ -0,0 +1,88 @@
+import threading
+from typing import List
+
+from google.genai import errors
+
+from app.services.rate_limiter import estimate_tokens
+
+
+class AdaptiveBatchSizer:
+    """
+    * sizes embedding requests by chunk count and estimated tokens
+    * the item limit grows while request latency stays under target and
+      shrinks on slow responses, errors and payload-size rejections
+    * never exceeds the provider's per-request limits
+    """
+
+    def __init__(
+        self,
+        initial_size: int,
+        max_size: int,
+        max_tokens: int,
+        target_latency: float,
+        min_size: int = 1,
+    ):
+        self.min_size = max(1, min_size)
+        self.max_size = max(self.min_size, max_size)
+        self.max_tokens = max_tokens
+        self.target_latency = target_latency
+        self.size = min(max(initial_size, self.min_size), self.max_size)
+        self._lock = threading.Lock()
+
+    def split(self, texts: List[str]) -> List[List[str]]:
+        """
+        * pack texts into batches under the current item limit and token cap
+        """
+        size = self.size
+        batches, batch, batch_tokens = [], [], 0
+        for text in texts:
+            tokens = estimate_tokens(text)
+            if batch and (
+                len(batch) >= size or batch_tokens + tokens > self.max_tokens
+            ):
+                batches.append(batch)
+                batch, batch_tokens = [], 0
+            batch.append(text)
+            batch_tokens += tokens
+        if batch:
+            batches.append(batch)
+        return batches
+
+    def record_success(self, batch_size: int, latency: float):
+        """
+        * grow by half while healthy, back off by a quarter when slow
+        """
+        with self._lock:
+            if latency > self.target_latency:
+                self.size = max(self.min_size, self.size * 3 // 4)
+            elif batch_size >= self.size:
+                # * only full batches prove the current size is healthy
+                self.size = min(self.max_size, self.size + max(1, self.size // 2))
+
+    def record_error(self):
+        """
+        * halve after a failed request (quota, server error)
+        """
+        with self._lock:
+            self.size = max(self.min_size, self.size // 2)
+
+    def record_rejection(self, batch_size: int):
+        """
+        * payload rejected as too large - stay below the rejected size
+        """
+        with self._lock:
+            self.size = max(self.min_size, min(self.size, batch_size // 2))
+
+
+def is_payload_rejection(error: Exception) -> bool:
+    """
+    * request rejected for its size (too many texts or too many tokens)
+    """
+    if not isinstance(error, errors.ClientError):
+        return False
+    if error.code == 413:
+        return True
+    message = (error.message or "").lower()
+    return error.code == 400 and any(
+        hint in message for hint in ("batch", "payload", "too large", "exceed")
+    )
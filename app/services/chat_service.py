@@ -1,10 +1,22 @@
-import json
 import time
-from typing import Dict, List
+from typing import AsyncIterator, List, Tuple
 
+from app.core.config import settings
 from app.core.prompts import rag_prompt_template
 from app.core.service_manager import service_manager
-from app.schemas.chat import ChatResponse
+from app.schemas.chat import (
+    ChatResponse,
+    ChatStreamDone,
+    ChatStreamEvent,
+    ChatStreamRetrieval,
+    ChatStreamToken,
+    RetrievedChunk,
+    RetrievedSource,
+)
+from app.services.context_builder import ContextBuilder
+from app.services.context_merger import ContextMerger
+from app.services.embedding_cache import normalize_text
+from app.utils.logger import LOGGER
 
 
 class ChatService:
@@ -15,23 +27,55 @@ class ChatService:
     def __init__(self):
         self.llm_model = service_manager.get_llm_service().get_chat_model()
         self.vector_store = service_manager.get_vector_store()
+        self.embedding_service = service_manager.get_embedding_service()
+        self.single_flight = service_manager.get_chat_single_flight()
+        self.answer_cache = service_manager.get_answer_cache()
+        self.context_merger = ContextMerger(
+            max_overlap=settings.chunk_overlap,
+            dedup_threshold=settings.context_dedup_threshold,
+        )
+        self.context_builder = ContextBuilder(
+            max_tokens=settings.context_max_tokens,
+            min_chunk_tokens=settings.context_min_chunk_tokens,
+        )
 
-    def process_question(self, question: str, top_k: int = 5) -> ChatResponse:
+    async def process_question(self, question: str, top_k: int = 5) -> ChatResponse:
         """
-        * process user question with rag pipeline
+        * process user question with rag pipeline (non-blocking end to end)
+        * concurrent identical questions (after normalization) share one run
         """
         start_time = time.time()
-
-        # * step 1: Retrieval
-        retrieved_results = self.vector_store.retrieve_contexts(
-            query=question, top_k=top_k
+        response = await self.single_flight.do(
+            (normalize_text(question), top_k),
+            lambda: self._answer_question(question, top_k),
         )
+        # * waiters report their own latency
+        return response.model_copy(update={"processing_time": time.time() - start_time})
 
-        # * step 2: Augmented - prepare context in llm-ready (strinified json)
-        context = self._prepare_context_with_sources(retrieved_results)
+    async def _answer_question(self, question: str, top_k: int) -> ChatResponse:
+        """
+        * run retrieval and generation for one question
+        """
+        start_time = time.time()
 
-        # * step 3: Generation
-        answer = self._generate_answer(question, context)
+        # * step 1: Retrieval
+        query_vector, retrieved_results = await self._retrieve(question, top_k)
+        chunk_ids = [retrieved_chunk.id for retrieved_chunk in retrieved_results]
+
+        # * near-duplicate question over the same chunks - skip generation
+        answer = self.answer_cache.get(query_vector, chunk_ids)
+        if answer is None:
+            # * step 2: Augmented - prepare token-budgeted context for the prompt
+            context = self._prepare_context_with_sources(retrieved_results)
+
+            # * step 3: Generation
+            answer = await self._generate_answer(question, context)
+            self.answer_cache.put(
+                query_vector,
+                chunk_ids,
+                documents=self._source_files(retrieved_results),
+                answer=answer,
+            )
         mock_sources = ["aaa.pdf", "bbb.pdf"]
 
         processing_time = time.time() - start_time
@@ -40,32 +84,122 @@ class ChatService:
             answer=answer, sources=mock_sources, processing_time=processing_time
         )
 
-    def _prepare_context_with_sources(self, retrieved_results: List[Dict]) -> str:
+    async def stream_question(
+        self, question: str, top_k: int = 5
+    ) -> AsyncIterator[ChatStreamEvent]:
+        """
+        * process user question and stream the answer
+        * events: retrieval (chunk metadata) -> token (answer text) -> done
+        """
+        start_time = time.time()
+
+        query_vector, retrieved_results = await self._retrieve(question, top_k)
+        yield ChatStreamEvent(
+            event="retrieval",
+            data=ChatStreamRetrieval(
+                chunks=[
+                    RetrievedSource(
+                        id=retrieved_chunk.id,
+                        score=retrieved_chunk.score,
+                        filename=retrieved_chunk.filename,
+                        page_number=retrieved_chunk.page_number,
+                    )
+                    for retrieved_chunk in retrieved_results
+                ],
+                retrieval_time=time.time() - start_time,
+            ),
+        )
+
+        chunk_ids = [retrieved_chunk.id for retrieved_chunk in retrieved_results]
+        first_token_time = None
+        answer = self.answer_cache.get(query_vector, chunk_ids)
+        if answer is not None:
+            first_token_time = time.time() - start_time
+            yield ChatStreamEvent(event="token", data=ChatStreamToken(text=answer))
+        else:
+            context = self._prepare_context_with_sources(retrieved_results)
+            messages = rag_prompt_template.format(context=context, question=question)
+            answer_parts = []
+            async for message_chunk in self.llm_model.astream(messages):
+                if not message_chunk.content:
+                    continue
+                if first_token_time is None:
+                    first_token_time = time.time() - start_time
+                answer_parts.append(message_chunk.content)
+                yield ChatStreamEvent(
+                    event="token", data=ChatStreamToken(text=message_chunk.content)
+                )
+            answer = "".join(answer_parts)
+            self.answer_cache.put(
+                query_vector,
+                chunk_ids,
+                documents=self._source_files(retrieved_results),
+                answer=answer,
+            )
+
+        yield ChatStreamEvent(
+            event="done",
+            data=ChatStreamDone(
+                sources=self._source_files(retrieved_results),
+                processing_time=time.time() - start_time,
+                time_to_first_token=first_token_time,
+            ),
+        )
+
+    async def _retrieve(
+        self, question: str, top_k: int
+    ) -> Tuple[List[float], List[RetrievedChunk]]:
+        """
+        * embed the question and retrieve the top_k chunks
+        """
+        query_vector = await self.embedding_service.agenerate_embedding(
+            question, task_type="retrieval_query"
+        )
+        retrieved_results = await self.vector_store.aretrieve_by_vector(
+            query_vector, top_k=top_k
+        )
+        return query_vector, retrieved_results
+
+    @staticmethod
+    def _source_files(retrieved_results: List[RetrievedChunk]) -> List[str]:
+        """
+        * distinct source filenames in retrieval order
+        """
+        return list(
+            dict.fromkeys(
+                retrieved_chunk.filename for retrieved_chunk in retrieved_results
+            )
+        )
+
+    def _prepare_context_with_sources(
+        self, retrieved_results: List[RetrievedChunk]
+    ) -> str:
         """
         * prepare context string and integrate source references in the context
+        * neighbouring chunks are stitched and near-duplicates dropped, then
+          compact numbered excerpts ("[1] filename p.3") fill the token budget
         """
-        # convert to only necessary chunk info
-        response_list = []
-        for retrieved_chunk in retrieved_results:
-            data_dict = {}
-            data_dict["vector_id"] = retrieved_chunk["id"]
-            data_dict["relevance_score"] = retrieved_chunk["score"]
-            data_dict["content"] = retrieved_chunk["payload"]["document"]
-            data_dict["filename"] = retrieved_chunk["payload"]["filename"]
-            data_dict["page_number"] = retrieved_chunk["payload"]["page_number"]
-            response_list.append(data_dict)
-
-        # convert to string as context input to prompt template
-        contexts = json.dumps(response_list, ensure_ascii=False, indent=4)
-
-        return contexts
-
-    def _generate_answer(self, question: str, context: str) -> str:
+        excerpts = self.context_merger.merge(retrieved_results)
+        context = self.context_builder.build(excerpts)
+        if (
+            len(excerpts) < len(retrieved_results)
+            or context.chunks_truncated
+            or context.chunks_dropped
+        ):
+            LOGGER.info(
+                f"[Context] {len(retrieved_results)} chunks -> {len(excerpts)} "
+                f"excerpts, {context.tokens} tokens, {context.chunks_used} used "
+                f"({context.chunks_truncated} truncated, "
+                f"{context.chunks_dropped} dropped)"
+            )
+        return context.text
+
+    async def _generate_answer(self, question: str, context: str) -> str:
         """
         * generate answer using llm
         """
         messages = rag_prompt_template.format(context=context, question=question)
-        response = self.llm_model.invoke(messages)
+        response = await self.llm_model.ainvoke(messages)
         return response.content
 
 
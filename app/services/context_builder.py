@@ -0,0 +1,129 @@
+from functools import lru_cache
+from typing import List
+
+from pydantic import BaseModel
+
+from app.schemas.chat import RetrievedChunk
+from app.utils.logger import LOGGER
+
+# * fallback when the tiktoken encoding cannot be loaded (offline): ~4 ascii
+# * chars per token, non-ascii (thai) chars counted as one token each
+CHARS_PER_TOKEN = 4
+
+
+@lru_cache(maxsize=1)
+def _get_encoding():
+    try:
+        import tiktoken
+
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception as e:
+        LOGGER.warning(f"[Context] tiktoken unavailable, estimating tokens: {str(e)}")
+        return None
+
+
+def count_tokens(text: str) -> int:
+    """
+    * prompt tokens of text (cl100k_base - close to gemini's count for budgeting)
+    """
+    encoding = _get_encoding()
+    if encoding is None:
+        return _estimate_tokens(text)
+    return len(encoding.encode(text))
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """
+    * cut text to at most max_tokens, preferring a whitespace boundary
+    """
+    encoding = _get_encoding()
+    if encoding is None:
+        truncated = text[: _estimate_prefix_length(text, max_tokens)]
+    else:
+        truncated = encoding.decode(encoding.encode(text)[:max_tokens])
+    if len(truncated) < len(text) and " " in truncated:
+        truncated = truncated.rsplit(" ", 1)[0]
+    return truncated.rstrip() + " …"
+
+
+def _estimate_tokens(text: str) -> int:
+    non_ascii = sum(1 for char in text if not char.isascii())
+    return non_ascii + -(-(len(text) - non_ascii) // CHARS_PER_TOKEN)
+
+
+def _estimate_prefix_length(text: str, max_tokens: int) -> int:
+    """
+    * longest prefix (in chars) estimated at or below max_tokens
+    """
+    budget = max_tokens * CHARS_PER_TOKEN
+    for i, char in enumerate(text):
+        budget -= 1 if char.isascii() else CHARS_PER_TOKEN
+        if budget < 0:
+            return i
+    return len(text)
+
+
+class BuiltContext(BaseModel):
+    text: str
+    tokens: int
+    chunks_used: int
+    chunks_truncated: int
+    chunks_dropped: int
+
+
+class ContextBuilder:
+    """
+    * compact, token-budgeted context for the rag prompt
+    * chunks are added by relevance score as numbered excerpts:
+        [1] filename p.3
+        chunk text
+    * the lowest ranked chunk that does not fit is truncated to the remaining
+      budget (if at least min_chunk_tokens remain), the rest are dropped
+    """
+
+    def __init__(self, max_tokens: int, min_chunk_tokens: int = 64):
+        self.max_tokens = max_tokens
+        self.min_chunk_tokens = min_chunk_tokens
+
+    def build(self, retrieved_results: List[RetrievedChunk]) -> BuiltContext:
+        ranked = sorted(retrieved_results, key=lambda chunk: chunk.score, reverse=True)
+        excerpts: List[str] = []
+        used_tokens = 0
+        truncated = 0
+
+        for retrieved_chunk in ranked:
+            header = self._header(len(excerpts) + 1, retrieved_chunk)
+            content = retrieved_chunk.document.strip()
+            # * excerpts are joined by a blank line (~1 token)
+            header_tokens = count_tokens(header) + 1
+            content_tokens = count_tokens(content)
+            remaining = self.max_tokens - used_tokens - header_tokens
+
+            if content_tokens > remaining:
+                if remaining < self.min_chunk_tokens:
+                    break
+                content = truncate_to_tokens(content, remaining - 1)
+                content_tokens = count_tokens(content)
+                truncated += 1
+
+            excerpts.append(f"{header}\n{content}")
+            used_tokens += header_tokens + content_tokens
+            if truncated:
+                break
+
+        text = "\n\n".join(excerpts)
+        return BuiltContext(
+            text=text,
+            tokens=count_tokens(text),
+            chunks_used=len(excerpts),
+            chunks_truncated=truncated,
+            chunks_dropped=len(ranked) - len(excerpts),
+        )
+
+    @staticmethod
+    def _header(number: int, chunk: RetrievedChunk) -> str:
+        page = f" p.{chunk.page_number}" if chunk.page_number is not None else ""
+        # * stitched neighbours can span pages
+        if page and chunk.page_end is not None:
+            page += f"-{chunk.page_end}"
+        return f"[{number}] {chunk.filename}{page}"
@@ -0,0 +1,140 @@
+import re
+from itertools import groupby
+from typing import FrozenSet, List, Optional
+
+from app.schemas.chat import RetrievedChunk
+from app.services.embedding_cache import normalize_text
+
+# * shingle size for near-duplicate detection (chars - thai has no word spaces)
+SHINGLE_SIZE = 5
+
+
+def _squash(text: str) -> str:
+    """
+    * text without whitespace - chunk cleaning can reflow whitespace at the edges
+    """
+    return re.sub(r"\s+", "", text)
+
+
+def _shingles(text: str) -> FrozenSet[str]:
+    text = _squash(normalize_text(text))
+    return frozenset(
+        text[i : i + SHINGLE_SIZE] for i in range(max(1, len(text) - SHINGLE_SIZE + 1))
+    )
+
+
+class ContextMerger:
+    """
+    * post-processes retrieved chunks before they are put into the prompt
+    * neighbours of the same file (chunk_index n, n+1, ...) are stitched into one
+      excerpt with the splitter overlap removed
+    * near-identical chunks (also across files) are kept once - the best scored
+    * a merged excerpt keeps the best score of its parts
+    """
+
+    def __init__(
+        self, max_overlap: int, dedup_threshold: float = 0.9, probe_chars: int = 32
+    ):
+        self.max_overlap = max_overlap
+        self.dedup_threshold = dedup_threshold
+        self.probe_chars = probe_chars
+
+    def merge(self, retrieved_results: List[RetrievedChunk]) -> List[RetrievedChunk]:
+        """
+        * stitched and deduplicated chunks, best score first (input is not mutated)
+        """
+        merged = [chunk for chunk in retrieved_results if chunk.chunk_index is None]
+        indexed = [
+            chunk for chunk in retrieved_results if chunk.chunk_index is not None
+        ]
+
+        def by_file(chunk: RetrievedChunk) -> str:
+            return chunk.filename
+
+        for _, file_chunks in groupby(sorted(indexed, key=by_file), key=by_file):
+            run: List[RetrievedChunk] = []
+            for chunk in sorted(file_chunks, key=lambda chunk: chunk.chunk_index):
+                index = chunk.chunk_index
+                last_index = run[-1].chunk_index if run else None
+                if last_index is not None and index == last_index:
+                    continue  # * same chunk retrieved twice
+                if last_index is not None and index != last_index + 1:
+                    merged.append(self._stitch(run))
+                    run = []
+                run.append(chunk)
+            merged.append(self._stitch(run))
+
+        merged.sort(key=lambda chunk: chunk.score, reverse=True)
+        return self._deduplicate(merged)
+
+    def _stitch(self, run: List[RetrievedChunk]) -> RetrievedChunk:
+        """
+        * join consecutive chunks of one file into a single excerpt
+        """
+        first, last = run[0], run[-1]
+        if len(run) == 1:
+            return first
+
+        document = first.document
+        for chunk in run[1:]:
+            document = self._join(document, chunk.document)
+
+        page_end = last.page_number
+        if page_end == first.page_number:
+            page_end = None
+        return first.model_copy(
+            update={
+                "document": document,
+                "score": max(chunk.score for chunk in run),
+                "page_end": page_end,
+            }
+        )
+
+    def _join(self, left: str, right: str) -> str:
+        """
+        * append right to left, dropping the text they share at the seam
+        """
+        overlap_start = self._find_overlap(left, right)
+        if overlap_start is None:
+            return f"{left} {right}"
+        return left[:overlap_start].rstrip() + " " + right.lstrip()
+
+    def _find_overlap(self, left: str, right: str) -> Optional[int]:
+        """
+        * position in left where its tail repeats the start of right (the longest
+          such overlap within max_overlap), ignoring whitespace differences
+        """
+        squashed_right = _squash(right)
+        if not squashed_right:
+            return None
+        # * the probe (start of right) may be spaced differently inside left
+        probe = re.compile(
+            r"\s*".join(map(re.escape, squashed_right[: self.probe_chars]))
+        )
+        # * the splitter overlap is at most max_overlap raw chars - cleaning can
+        # * add a few spaces, so search a wider tail
+        match = probe.search(left, max(0, len(left) - 2 * self.max_overlap))
+        while match is not None:
+            if squashed_right.startswith(_squash(left[match.start() :])):
+                return match.start()
+            match = probe.search(left, match.start() + 1)
+        return None
+
+    def _deduplicate(self, ranked: List[RetrievedChunk]) -> List[RetrievedChunk]:
+        """
+        * drop chunks whose shingle jaccard similarity to a better one is too high
+        """
+        if self.dedup_threshold > 1:
+            return ranked
+        kept: List[RetrievedChunk] = []
+        kept_shingles: List[FrozenSet[str]] = []
+        for chunk in ranked:
+            shingles = _shingles(chunk.document)
+            if any(
+                len(shingles & other) / len(shingles | other) >= self.dedup_threshold
+                for other in kept_shingles
+            ):
+                continue
+            kept.append(chunk)
+            kept_shingles.append(shingles)
+        return kept
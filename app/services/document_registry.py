@@ -0,0 +1,449 @@
+import os
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional
+
+from app.core.config import settings
+from app.core.executors import execution_layer
+from app.schemas.documents import DocumentRecord, DocumentStatus
+from app.utils.logger import LOGGER
+
+# * a failed ingestion only marks documents that have no stored revision as
+# * failed - documents with an ingested revision keep serving it (migrated
+# * legacy revisions may have no content_hash, but always a chunk_count)
+_FAILED_STATUS = (
+    f"CASE WHEN chunk_count IS NULL THEN '{DocumentStatus.failed}' "
+    f"ELSE '{DocumentStatus.ready}' END"
+)
+
+
+class DocumentRegistry(ABC):
+    """
+    * document table - one row per filename, qdrant points reference it by
+      doc_id instead of repeating filename / content type in every payload
+    * async interface: sqlite locally, postgres (asyncpg pool) in production
+    * doc_id -> filename is cached in memory for the retrieval path
+    """
+
+    def __init__(self):
+        self._filenames: Dict[int, str] = {}
+
+    @abstractmethod
+    async def open(self):
+        """create tables (and the connection pool)"""
+
+    @abstractmethod
+    async def close(self):
+        """close connections"""
+
+    @abstractmethod
+    async def register(self, filename: str, content_type: Optional[str] = None) -> int:
+        """doc_id of a filename (created on first ingestion), status processing"""
+
+    @abstractmethod
+    async def mark_ingested(
+        self,
+        doc_id: int,
+        content_hash: Optional[str],
+        chunk_count: int,
+        size: Optional[int] = None,
+        embedding_model: Optional[str] = None,
+    ):
+        """record the revision now stored in the vector store, status ready"""
+
+    @abstractmethod
+    async def mark_failed(self, doc_id: int):
+        """ingestion failed - failed unless an earlier revision is still served"""
+
+    @abstractmethod
+    async def get(self, doc_id: int) -> Optional[DocumentRecord]:
+        """get document by id"""
+
+    @abstractmethod
+    async def get_by_filename(self, filename: str) -> Optional[DocumentRecord]:
+        """get document by filename"""
+
+    @abstractmethod
+    async def list(self, limit: int = 100, offset: int = 0) -> List[DocumentRecord]:
+        """documents, newest first"""
+
+    @abstractmethod
+    async def count(self) -> int:
+        """number of documents"""
+
+    @abstractmethod
+    async def delete(self, doc_id: int) -> bool:
+        """delete a document entry - returns whether it existed"""
+
+    @abstractmethod
+    async def _fetch_filenames(self, doc_ids: List[int]) -> Dict[int, str]:
+        """filenames of doc ids missing from the in-memory cache"""
+
+    async def filenames(self, doc_ids: Iterable[int]) -> Dict[int, str]:
+        """filenames by doc_id - served from memory, unknown ids are looked up"""
+        doc_ids = set(doc_ids)
+        missing = [doc_id for doc_id in doc_ids if doc_id not in self._filenames]
+        if missing:
+            # * registered by another worker since this one started
+            self._filenames.update(await self._fetch_filenames(missing))
+        return self.cached_filenames(doc_ids)
+
+    def cached_filenames(self, doc_ids: Iterable[int]) -> Dict[int, str]:
+        """filenames by doc_id from memory only (sync callers)"""
+        return {
+            doc_id: self._filenames[doc_id]
+            for doc_id in doc_ids
+            if doc_id in self._filenames
+        }
+
+    def _remember(self, record: Optional[DocumentRecord]) -> Optional[DocumentRecord]:
+        if record is not None:
+            self._filenames[record.doc_id] = record.filename
+        return record
+
+
+class SQLiteDocumentRegistry(DocumentRegistry):
+    """
+    * local registry (sqlite, wal) - queries run in the io thread pool
+    """
+
+    def __init__(self, db_path: str):
+        super().__init__()
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    async def open(self):
+        await execution_layer.run_in_thread(self._open)
+
+    def _open(self):
+        # * other workers may hold the write lock briefly
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False, timeout=30)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS documents (
+                    doc_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    filename TEXT NOT NULL UNIQUE,
+                    content_type TEXT,
+                    content_hash TEXT,
+                    created_at TEXT NOT NULL,
+                    updated_at TEXT NOT NULL
+                )
+                """
+            )
+            # * add columns introduced after the table was first created
+            columns = {
+                row["name"]
+                for row in self._conn.execute("PRAGMA table_info(documents)")
+            }
+            for column, definition in (
+                ("size", "INTEGER"),
+                ("chunk_count", "INTEGER"),
+                ("status", f"TEXT NOT NULL DEFAULT '{DocumentStatus.ready}'"),
+                ("embedding_model", "TEXT"),
+            ):
+                if column not in columns:
+                    self._conn.execute(
+                        f"ALTER TABLE documents ADD COLUMN {column} {definition}"
+                    )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_documents_content_hash "
+                "ON documents (content_hash)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_documents_created_at "
+                "ON documents (created_at)"
+            )
+
+    async def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+
+    async def register(self, filename: str, content_type: Optional[str] = None) -> int:
+        record = await self._run(
+            """
+            INSERT INTO documents (
+                filename, content_type, status, created_at, updated_at
+            ) VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT (filename) DO UPDATE SET
+                content_type = COALESCE(excluded.content_type, content_type),
+                status = excluded.status,
+                updated_at = excluded.updated_at
+            RETURNING *
+            """,
+            (filename, content_type, DocumentStatus.processing, *[self._now()] * 2),
+            fetch="one",
+        )
+        return self._remember(record).doc_id
+
+    async def mark_ingested(
+        self,
+        doc_id: int,
+        content_hash: Optional[str],
+        chunk_count: int,
+        size: Optional[int] = None,
+        embedding_model: Optional[str] = None,
+    ):
+        await self._run(
+            """
+            UPDATE documents SET content_hash = ?, chunk_count = ?, size = ?,
+                embedding_model = ?, status = ?, updated_at = ?
+            WHERE doc_id = ?
+            """,
+            (
+                content_hash,
+                chunk_count,
+                size,
+                embedding_model,
+                DocumentStatus.ready,
+                self._now(),
+                doc_id,
+            ),
+        )
+
+    async def mark_failed(self, doc_id: int):
+        await self._run(
+            f"UPDATE documents SET status = {_FAILED_STATUS}, updated_at = ? "
+            f"WHERE doc_id = ?",
+            (self._now(), doc_id),
+        )
+
+    async def get(self, doc_id: int) -> Optional[DocumentRecord]:
+        return self._remember(
+            await self._run(
+                "SELECT * FROM documents WHERE doc_id = ?", (doc_id,), fetch="one"
+            )
+        )
+
+    async def get_by_filename(self, filename: str) -> Optional[DocumentRecord]:
+        return self._remember(
+            await self._run(
+                "SELECT * FROM documents WHERE filename = ?", (filename,), fetch="one"
+            )
+        )
+
+    async def list(self, limit: int = 100, offset: int = 0) -> List[DocumentRecord]:
+        records = await self._run(
+            "SELECT * FROM documents ORDER BY created_at DESC, doc_id DESC "
+            "LIMIT ? OFFSET ?",
+            (limit, offset),
+            fetch="all",
+        )
+        return [self._remember(record) for record in records]
+
+    async def count(self) -> int:
+        return await self._run("SELECT COUNT(*) FROM documents", (), fetch="value")
+
+    async def delete(self, doc_id: int) -> bool:
+        self._filenames.pop(doc_id, None)
+        deleted = await self._run(
+            "DELETE FROM documents WHERE doc_id = ? RETURNING doc_id",
+            (doc_id,),
+            fetch="value",
+        )
+        return deleted is not None
+
+    async def _fetch_filenames(self, doc_ids: List[int]) -> Dict[int, str]:
+        rows = await self._run(
+            f"SELECT * FROM documents "
+            f"WHERE doc_id IN ({','.join('?' * len(doc_ids))})",
+            doc_ids,
+            fetch="all",
+        )
+        return {record.doc_id: record.filename for record in rows}
+
+    async def _run(self, query: str, params, fetch: Optional[str] = None) -> Any:
+        return await execution_layer.run_in_thread(self._execute, query, params, fetch)
+
+    def _execute(self, query: str, params, fetch: Optional[str]) -> Any:
+        with self._lock, self._conn:
+            cursor = self._conn.execute(query, params)
+            if fetch == "one":
+                row = cursor.fetchone()
+                return self._row_to_record(row) if row else None
+            if fetch == "all":
+                return [self._row_to_record(row) for row in cursor.fetchall()]
+            if fetch == "value":
+                row = cursor.fetchone()
+                return row[0] if row else None
+            return None
+
+    @staticmethod
+    def _now() -> str:
+        return datetime.now(timezone.utc).isoformat()
+
+    @staticmethod
+    def _row_to_record(row: sqlite3.Row) -> DocumentRecord:
+        return DocumentRecord(
+            **{
+                **dict(row),
+                "created_at": datetime.fromisoformat(row["created_at"]),
+                "updated_at": datetime.fromisoformat(row["updated_at"]),
+            }
+        )
+
+
+class PostgresDocumentRegistry(DocumentRegistry):
+    """
+    * production registry on the configured postgres (asyncpg connection pool)
+    * asyncpg is optional - imported when the registry is opened
+    """
+
+    def __init__(self, connect_kwargs: Dict[str, Any], min_size: int, max_size: int):
+        super().__init__()
+        self.connect_kwargs = connect_kwargs
+        self.min_size = min_size
+        self.max_size = max_size
+        self._pool = None
+
+    async def open(self):
+        try:
+            import asyncpg
+        except ImportError as e:
+            raise RuntimeError(
+                "postgres document registry requires asyncpg "
+                "(pip install 'sitbrain-backend[postgres]')"
+            ) from e
+
+        self._pool = await asyncpg.create_pool(
+            min_size=self.min_size, max_size=self.max_size, **self.connect_kwargs
+        )
+        async with self._pool.acquire() as conn:
+            await conn.execute(
+                f"""
+                CREATE TABLE IF NOT EXISTS documents (
+                    doc_id BIGSERIAL PRIMARY KEY,
+                    filename TEXT NOT NULL UNIQUE,
+                    content_type TEXT,
+                    content_hash TEXT,
+                    size BIGINT,
+                    chunk_count INTEGER,
+                    status TEXT NOT NULL DEFAULT '{DocumentStatus.processing}',
+                    embedding_model TEXT,
+                    created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+                    updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+                );
+                CREATE INDEX IF NOT EXISTS idx_documents_content_hash
+                    ON documents (content_hash);
+                CREATE INDEX IF NOT EXISTS idx_documents_created_at
+                    ON documents (created_at);
+                """
+            )
+        LOGGER.info(
+            f"[Registry] Postgres pool opened (size {self.min_size}-{self.max_size})"
+        )
+
+    async def close(self):
+        if self._pool is not None:
+            await self._pool.close()
+
+    async def register(self, filename: str, content_type: Optional[str] = None) -> int:
+        row = await self._pool.fetchrow(
+            """
+            INSERT INTO documents (filename, content_type, status)
+            VALUES ($1, $2, $3)
+            ON CONFLICT (filename) DO UPDATE SET
+                content_type = COALESCE(EXCLUDED.content_type, documents.content_type),
+                status = EXCLUDED.status,
+                updated_at = now()
+            RETURNING *
+            """,
+            filename,
+            content_type,
+            DocumentStatus.processing,
+        )
+        return self._remember(DocumentRecord(**dict(row))).doc_id
+
+    async def mark_ingested(
+        self,
+        doc_id: int,
+        content_hash: Optional[str],
+        chunk_count: int,
+        size: Optional[int] = None,
+        embedding_model: Optional[str] = None,
+    ):
+        await self._pool.execute(
+            """
+            UPDATE documents SET content_hash = $1, chunk_count = $2, size = $3,
+                embedding_model = $4, status = $5, updated_at = now()
+            WHERE doc_id = $6
+            """,
+            content_hash,
+            chunk_count,
+            size,
+            embedding_model,
+            DocumentStatus.ready,
+            doc_id,
+        )
+
+    async def mark_failed(self, doc_id: int):
+        await self._pool.execute(
+            f"UPDATE documents SET status = {_FAILED_STATUS}, updated_at = now() "
+            f"WHERE doc_id = $1",
+            doc_id,
+        )
+
+    async def get(self, doc_id: int) -> Optional[DocumentRecord]:
+        row = await self._pool.fetchrow(
+            "SELECT * FROM documents WHERE doc_id = $1", doc_id
+        )
+        return self._remember(DocumentRecord(**dict(row))) if row else None
+
+    async def get_by_filename(self, filename: str) -> Optional[DocumentRecord]:
+        row = await self._pool.fetchrow(
+            "SELECT * FROM documents WHERE filename = $1", filename
+        )
+        return self._remember(DocumentRecord(**dict(row))) if row else None
+
+    async def list(self, limit: int = 100, offset: int = 0) -> List[DocumentRecord]:
+        rows = await self._pool.fetch(
+            "SELECT * FROM documents ORDER BY created_at DESC, doc_id DESC "
+            "LIMIT $1 OFFSET $2",
+            limit,
+            offset,
+        )
+        return [self._remember(DocumentRecord(**dict(row))) for row in rows]
+
+    async def count(self) -> int:
+        return await self._pool.fetchval("SELECT COUNT(*) FROM documents")
+
+    async def delete(self, doc_id: int) -> bool:
+        self._filenames.pop(doc_id, None)
+        deleted = await self._pool.fetchval(
+            "DELETE FROM documents WHERE doc_id = $1 RETURNING doc_id", doc_id
+        )
+        return deleted is not None
+
+    async def _fetch_filenames(self, doc_ids: List[int]) -> Dict[int, str]:
+        rows = await self._pool.fetch(
+            "SELECT doc_id, filename FROM documents WHERE doc_id = ANY($1::bigint[])",
+            doc_ids,
+        )
+        return {row["doc_id"]: row["filename"] for row in rows}
+
+
+def create_document_registry() -> DocumentRegistry:
+    """
+    * registry backend from settings (document_registry_backend)
+    """
+    if settings.document_registry_backend == "postgres":
+        return PostgresDocumentRegistry(
+            connect_kwargs={
+                "host": settings.postgres_server,
+                "port": int(settings.postgres_port),
+                "user": settings.postgres_user,
+                "password": settings.postgres_password,
+                "database": settings.postgres_db,
+            },
+            min_size=settings.postgres_pool_min_size,
+            max_size=settings.postgres_pool_max_size,
+        )
+    return SQLiteDocumentRegistry(
+        os.path.join(settings.data_dir, settings.document_registry_db)
+    )
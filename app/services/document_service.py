@@ -1,19 +1,89 @@
+import asyncio
+import hashlib
 import os
 import re
-from typing import Any, Dict, List, Optional
+from collections import deque
+from functools import partial
+from typing import Any, AsyncIterator, Callable, Deque, Dict, List, Optional, Tuple
 
-from langchain_community.document_loaders import (
-    PyPDFLoader,
-    TextLoader,
-    UnstructuredWordDocumentLoader,
-)
 from langchain_core.documents.base import Document
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 
 from app.core.config import settings
+from app.core.executors import execution_layer
 from app.core.service_manager import service_manager
-from app.schemas.documents import ChunkMetadata, ProcessedDocument
+from app.schemas.documents import (
+    ChunkMetadata,
+    DocumentListResponse,
+    DocumentRecord,
+    ProcessedDocument,
+    UpdatedDocument,
+)
+from app.schemas.jobs import JobStage
+from app.services import extractors
+from app.services.ingestion_pipeline import IngestionPipeline, PipelineStats
 from app.utils.logger import LOGGER
+from app.utils.upload import hash_file
+
+
+async def iter_pdf_pages_in_parallel(
+    file_path: str, pages_per_task: int, total_pages: Optional[int] = None
+) -> AsyncIterator[List[Document]]:
+    """
+    * split pdf into page ranges, parse them in the process pool and yield
+      each range's documents in page order
+    * only a few ranges are in flight at once so parsed pages do not pile up
+      ahead of a slower consumer
+    """
+    if total_pages is None:
+        total_pages = await execution_layer.run_in_process(
+            extractors.count_pdf_pages, file_path
+        )
+    pages_per_task = max(1, pages_per_task)
+    page_ranges = iter(
+        [
+            (start, min(start + pages_per_task, total_pages))
+            for start in range(0, total_pages, pages_per_task)
+        ]
+    )
+    LOGGER.info(f"[Extract] Parsing {total_pages} pdf pages")
+
+    def submit_next(pending: Deque[asyncio.Future]):
+        page_range = next(page_ranges, None)
+        if page_range is not None:
+            pending.append(
+                asyncio.ensure_future(
+                    execution_layer.run_in_process(
+                        extractors.load_pdf_pages, file_path, *page_range
+                    )
+                )
+            )
+
+    pending: Deque[asyncio.Future] = deque()
+    for _ in range(max(1, settings.cpu_workers) * 2):
+        submit_next(pending)
+
+    try:
+        while pending:
+            documents = await pending.popleft()
+            submit_next(pending)
+            yield documents
+    finally:
+        for future in pending:
+            future.cancel()
+
+
+async def extract_pdf_in_parallel(
+    file_path: str, pages_per_task: int
+) -> List[Document]:
+    """
+    * parse all pdf pages in parallel and reassemble them in page order
+    """
+    return [
+        document
+        async for documents in iter_pdf_pages_in_parallel(file_path, pages_per_task)
+        for document in documents
+    ]
 
 
 class DocumentService:
@@ -30,63 +100,109 @@ class DocumentService:
         )
         self.vector_store = service_manager.get_vector_store()
         self.embedding_service = service_manager.get_embedding_service()
+        self.answer_cache = service_manager.get_answer_cache()
+        self.document_registry = service_manager.get_document_registry()
+        self.ingestion_slots = service_manager.get_ingestion_slots()
+        self.content_locks = service_manager.get_content_locks()
 
     async def process_document(
-        self, file_path: str, filename: str, content_type: str
+        self,
+        file_path: str,
+        filename: str,
+        content_type: str,
+        content_hash: Optional[str] = None,
+        progress_callback: Optional[Callable[[JobStage, int, int], None]] = None,
     ) -> ProcessedDocument:
         """
         * process document and create chunks with metadata
+        * content_hash is the sha256 computed while the upload was spooled
+        * progress_callback(stage, done, total) is called as each stage completes
+        * uploads of the same content run one at a time, so a concurrent
+          duplicate sees the first one's points and is skipped
         """
+        if content_hash is None:
+            try:
+                content_hash = await execution_layer.run_in_thread(hash_file, file_path)
+            except Exception as e:
+                LOGGER.exception(
+                    f"[Error] Document processing failed - {filename}: {str(e)}"
+                )
+                return None
+        async with self.content_locks.hold(content_hash), self.ingestion_slots:
+            return await self._process_document(
+                file_path, filename, content_type, content_hash, progress_callback
+            )
+
+    async def _process_document(
+        self,
+        file_path: str,
+        filename: str,
+        content_type: str,
+        content_hash: str,
+        progress_callback: Optional[Callable[[JobStage, int, int], None]],
+    ) -> ProcessedDocument:
+        doc_id = None
         try:
             LOGGER.info(
                 f"[Start] Processing document: {filename} (type={content_type})"
             )
 
-            # * extract content based on file type
-            documents = await self._extract_content(file_path, content_type)
-            LOGGER.info(f"[Extracted] Total raw documents: {len(documents)}")
-
-            if not documents:
-                LOGGER.warning(f"No content extracted from file: {filename}")
-                return None
-
-            # * create chunks with cleaned content: ChunkMetadata data type
-            chunks = await self._create_chunks(documents, content_type)
-            LOGGER.info(f"[Chunked] Total chunks created: {len(chunks)}")
-
-            if not chunks:
-                LOGGER.warning(f"No chunks created from file: {filename}")
-                return None
-
-            # * embeddings
-            chunk_texts = [chunk.document for chunk in chunks]
-            LOGGER.info(
-                f"[Embedding] Generating embeddings for {len(chunk_texts)} chunks"
-            )
-            embeddings = self.embedding_service.generate_embeddings_batch(
-                chunk_texts, batch_size=8
+            # * skip identical uploads before doing any extraction work
+            existing_chunks = await execution_layer.run_in_thread(
+                self.vector_store.count_document_chunks, content_hash
             )
-
-            if not embeddings or len(embeddings) != len(chunks):
-                LOGGER.error(
-                    f"Embedding generation failed or incomplete for file: {filename}"
+            if existing_chunks:
+                LOGGER.info(
+                    f"[Skipped] Identical content already ingested: {filename} "
+                    f"| chunks={existing_chunks}"
+                )
+                return ProcessedDocument(
+                    filename=filename,
+                    chunks_created=existing_chunks,
+                    content_type=content_type,
+                    content_hash=content_hash,
+                    deduplicated=True,
                 )
+
+            # * points reference the registry entry instead of the filename
+            doc_id = await self.document_registry.register(filename, content_type)
+
+            # * stream pages -> chunks -> embeddings -> qdrant
+            stats = await self._run_pipeline(
+                file_path,
+                filename,
+                content_type,
+                content_hash,
+                doc_id,
+                progress_callback=progress_callback,
+            )
+            if not stats.chunks:
+                LOGGER.warning(f"No chunks created from file: {filename}")
+                await self.document_registry.mark_failed(doc_id)
                 return None
 
-            # * upsert to qdrant
-            self.vector_store.upsert_points(
-                embeddings, [dict(chunk) for chunk in chunks]
+            # * a re-upload of a filename keeps its doc_id - drop the points of
+            # * the revision it replaces
+            deleted = await execution_layer.run_in_thread(
+                self.vector_store.delete_stale_points, filename, content_hash, doc_id
             )
+            await self._mark_ingested(doc_id, file_path, content_hash, stats.chunks)
             LOGGER.info(
-                f"[Upserted] Stored embeddings to vector DB for file: {filename}"
+                f"[Upserted] Stored embeddings to vector DB for file: {filename} "
+                f"| stale_deleted={deleted}"
             )
 
             processed_doc = ProcessedDocument(
-                filename=filename, chunks_created=len(chunks), content_type=content_type
+                filename=filename,
+                chunks_created=stats.chunks,
+                content_type=content_type,
+                content_hash=content_hash,
             )
 
+            # * cached answers may quote an earlier version of this file
+            self.answer_cache.invalidate_documents([filename])
             LOGGER.info(
-                f"[Success] Document processed: {filename} | chunks={len(chunks)}"
+                f"[Success] Document processed: {filename} | chunks={stats.chunks}"
             )
             return processed_doc
 
@@ -94,7 +210,205 @@ class DocumentService:
             LOGGER.exception(
                 f"[Error] Document processing failed - {filename}: {str(e)}"
             )
+            if doc_id is not None:
+                await self.document_registry.mark_failed(doc_id)
+            return None
+
+    async def update_document(
+        self,
+        file_path: str,
+        filename: str,
+        content_type: str,
+        content_hash: Optional[str] = None,
+    ) -> Optional[UpdatedDocument]:
+        """
+        * incrementally re-ingest a revised document keyed by filename
+        * only new or changed chunks (by chunk_hash) are embedded, unchanged
+          chunks reuse their stored vectors and stale points are deleted
+          in one filtered operation
+        """
+        async with self.ingestion_slots:
+            doc_id = None
+            try:
+                LOGGER.info(f"[Update] Re-ingesting document: {filename}")
+
+                if content_hash is None:
+                    content_hash = await execution_layer.run_in_thread(
+                        hash_file, file_path
+                    )
+
+                # * unchanged chunks (by chunk_hash) reuse their stored vectors;
+                # * every chunk is re-upserted under the new content_hash
+                record = await self.document_registry.get_by_filename(filename)
+                stored_vectors = await execution_layer.run_in_thread(
+                    self.vector_store.get_chunk_vectors,
+                    filename,
+                    record.doc_id if record else None,
+                )
+                doc_id = await self.document_registry.register(filename, content_type)
+                stats = await self._run_pipeline(
+                    file_path,
+                    filename,
+                    content_type,
+                    content_hash,
+                    doc_id,
+                    known_vectors=stored_vectors,
+                    # * a failed update keeps serving the previous revision -
+                    # * points written for new content are removed so a later
+                    # * upload of it is not skipped as already ingested
+                    cleanup_on_failure=(
+                        record is None or record.content_hash != content_hash
+                    ),
+                )
+                if not stats.chunks:
+                    LOGGER.warning(f"No chunks created from file: {filename}")
+                    await self.document_registry.mark_failed(doc_id)
+                    return None
+
+                deleted = await execution_layer.run_in_thread(
+                    self.vector_store.delete_stale_points,
+                    filename,
+                    content_hash,
+                    doc_id,
+                )
+                await self._mark_ingested(doc_id, file_path, content_hash, stats.chunks)
+
+                self.answer_cache.invalidate_documents([filename])
+                LOGGER.info(
+                    f"[Update] Document updated: {filename} | chunks={stats.chunks} "
+                    f"embedded={stats.embedded} deleted={deleted}"
+                )
+                return UpdatedDocument(
+                    filename=filename,
+                    chunks_created=stats.chunks,
+                    content_type=content_type,
+                    content_hash=content_hash,
+                    chunks_embedded=stats.embedded,
+                    chunks_reused=stats.reused,
+                    chunks_deleted=deleted,
+                )
+
+            except Exception as e:
+                LOGGER.exception(
+                    f"[Error] Document update failed - {filename}: {str(e)}"
+                )
+                if doc_id is not None:
+                    await self.document_registry.mark_failed(doc_id)
+                return None
+
+    async def list_documents(
+        self, limit: int = 100, offset: int = 0
+    ) -> DocumentListResponse:
+        """
+        * registered documents, newest first
+        """
+        return DocumentListResponse(
+            total=await self.document_registry.count(),
+            documents=await self.document_registry.list(limit=limit, offset=offset),
+        )
+
+    async def get_document(self, doc_id: int) -> Optional[DocumentRecord]:
+        """
+        * registry entry of a document
+        """
+        return await self.document_registry.get(doc_id)
+
+    async def delete_document(self, doc_id: int) -> Optional[DocumentRecord]:
+        """
+        * delete a document's points and its registry entry
+        * returns the deleted entry, None for unknown doc ids
+        """
+        record = await self.document_registry.get(doc_id)
+        if record is None:
             return None
+        deleted = await execution_layer.run_in_thread(
+            self.vector_store.delete_document, doc_id, record.filename
+        )
+        if not deleted:
+            raise RuntimeError(f"failed to delete points of document {doc_id}")
+        await self.document_registry.delete(doc_id)
+
+        self.answer_cache.invalidate_documents([record.filename])
+        LOGGER.info(f"[Delete] Document deleted: {record.filename} (id={doc_id})")
+        return record
+
+    async def _mark_ingested(
+        self, doc_id: int, file_path: str, content_hash: str, chunk_count: int
+    ):
+        """
+        * record the stored revision in the document registry
+        """
+        await self.document_registry.mark_ingested(
+            doc_id,
+            content_hash,
+            chunk_count,
+            size=await execution_layer.run_in_thread(os.path.getsize, file_path),
+            embedding_model=settings.embedding_model,
+        )
+
+    async def _run_pipeline(
+        self,
+        file_path: str,
+        filename: str,
+        content_type: str,
+        content_hash: str,
+        doc_id: int,
+        progress_callback: Optional[Callable[[JobStage, int, int], None]] = None,
+        known_vectors: Optional[Dict[str, List[float]]] = None,
+        cleanup_on_failure: bool = True,
+    ) -> PipelineStats:
+        """
+        * run the streaming ingestion pipeline for one file
+        * on failure, points this document already wrote for the content are
+          removed so a retry is not mistaken for a duplicate upload
+        """
+        total_pages, pages = await self._iter_pages(file_path, content_type)
+        pipeline = IngestionPipeline(
+            embedding_service=self.embedding_service,
+            vector_store=self.vector_store,
+            chunk_builder=partial(
+                self._build_chunks,
+                content_type=content_type,
+                filename=filename,
+                content_hash=content_hash,
+                doc_id=doc_id,
+            ),
+            doc_id=doc_id,
+            content_hash=content_hash,
+            batch_size=settings.pipeline_batch_size,
+            queue_size=settings.pipeline_queue_size,
+            confirm_timeout=settings.pipeline_confirm_timeout,
+            known_vectors=known_vectors,
+            progress_callback=progress_callback,
+        )
+        try:
+            return await pipeline.run(pages, total_pages)
+        except BaseException:
+            if cleanup_on_failure and pipeline.stats.upserted:
+                await execution_layer.run_in_thread(
+                    self.vector_store.delete_content_points, content_hash, doc_id
+                )
+            raise
+
+    async def _iter_pages(
+        self, file_path: str, content_type: str
+    ) -> Tuple[int, AsyncIterator[List[Document]]]:
+        """
+        * page source for the pipeline - (total pages, async page batches)
+        """
+        if content_type == "application/pdf":
+            total_pages = await execution_layer.run_in_process(
+                extractors.count_pdf_pages, file_path
+            )
+            return total_pages, iter_pdf_pages_in_parallel(
+                file_path, settings.pdf_pages_per_task, total_pages
+            )
+
+        # * text and docx files are parsed in a single process-pool task
+        async def single_batch():
+            yield await self._extract_content(file_path, content_type)
+
+        return 1, single_batch()
 
     async def _extract_content(
         self, file_path: str, content_type: str
@@ -117,23 +431,22 @@ class DocumentService:
     async def _extract_pdf_content(self, file_path: str) -> List[Document]:
         """
         * extract content from pdf with page information
+        * pages are split into ranges and parsed in parallel in the process pool,
+          then reassembled in page order
         """
-        loader = PyPDFLoader(file_path)
-        return loader.load()
+        return await extract_pdf_in_parallel(file_path, settings.pdf_pages_per_task)
 
     async def _extract_docx_content(self, file_path: str) -> List[Document]:
         """
         * extract content from docx with structure information
         """
-        loader = UnstructuredWordDocumentLoader(file_path, mode="paged")
-        return loader.load()
+        return await execution_layer.run_in_process(extractors.load_docx, file_path)
 
     async def _extract_text_content(self, file_path: str) -> List[Document]:
         """
         * extract content from plain text files
         """
-        loader = TextLoader(file_path, encoding="utf-8")
-        return loader.load()
+        return await execution_layer.run_in_process(extractors.load_text, file_path)
 
     def _clean_content(self, text: str):
         # * remove leading and trailing quotes
@@ -156,17 +469,40 @@ class DocumentService:
         return cleaned.strip()
 
     async def _create_chunks(
-        self, documents: List[Document], content_type: str
+        self,
+        documents: List[Document],
+        content_type: str,
+        filename: Optional[str] = None,
+        content_hash: Optional[str] = None,
     ) -> List[ChunkMetadata]:
         """
         Create document chunks with enhanced metadata
         - "documents" is the Document objects from single file only
         - So, we can directly identify chunk_index through each chunks
+        - "filename" is the original upload name (source is a stored file path)
+        """
+        # * splitting and cleaning is cpu work - keep it off the event loop
+        return await execution_layer.run_in_thread(
+            self._build_chunks, documents, 0, content_type, filename, content_hash
+        )
+
+    def _build_chunks(
+        self,
+        documents: List[Document],
+        start_index: int = 0,
+        content_type: str = "text/plain",
+        filename: Optional[str] = None,
+        content_hash: Optional[str] = None,
+        doc_id: Optional[int] = None,
+    ) -> List[ChunkMetadata]:
+        """
+        * split and clean documents - chunk indexes start at start_index so page
+          batches of one file get consecutive indexes
         """
         chunks = []
         chunk_docs = self.text_splitter.split_documents(documents)
 
-        for i, chunk_doc in enumerate(chunk_docs):
+        for i, chunk_doc in enumerate(chunk_docs, start=start_index):
             # metadata
             metadata = chunk_doc.metadata
             source = metadata.get("source")
@@ -181,9 +517,12 @@ class DocumentService:
             chunk = ChunkMetadata(
                 document=cleaned_content,
                 source=source,
-                filename=os.path.basename(source),
+                filename=filename or os.path.basename(source),
                 page_number=page_number,
                 chunk_index=i,
+                doc_id=doc_id,
+                content_hash=content_hash,
+                chunk_hash=hashlib.sha256(cleaned_content.encode("utf-8")).hexdigest(),
             )
 
             chunks.append(chunk)
@@ -0,0 +1,78 @@
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from app.schemas.metrics import EmbeddingCacheMetrics
+
+CacheKey = Tuple[str, str, str]
+
+
+def normalize_text(text: str) -> str:
+    """
+    * canonical form of a query - unicode, whitespace and case insensitive
+    """
+    return " ".join(unicodedata.normalize("NFKC", text).split()).casefold()
+
+
+class EmbeddingCache:
+    """
+    * in-process lru + ttl cache of embeddings
+    * keyed on (normalized text, model, task_type), vectors kept as float32
+    * safe to share across threads and concurrent requests
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[CacheKey, Tuple[float, np.ndarray]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._metrics = EmbeddingCacheMetrics(max_entries=max_entries)
+
+    @staticmethod
+    def make_key(text: str, model: str, task_type: str) -> CacheKey:
+        return normalize_text(text), model, task_type.upper()
+
+    def get(self, key: CacheKey) -> Optional[List[float]]:
+        """
+        * cached vector or None, refreshing its lru position
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] < time.monotonic():
+                del self._entries[key]
+                self._metrics.expirations += 1
+                entry = None
+            if entry is None:
+                self._metrics.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._metrics.hits += 1
+            return entry[1].tolist()
+
+    def put(self, key: CacheKey, vector: List[float]):
+        """
+        * store a vector, evicting the least recently used entries
+        """
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (
+                time.monotonic() + self.ttl_seconds,
+                np.asarray(vector, dtype=np.float32),
+            )
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._metrics.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def snapshot(self) -> EmbeddingCacheMetrics:
+        with self._lock:
+            return self._metrics.model_copy(update={"entries": len(self._entries)})
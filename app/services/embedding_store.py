@@ -0,0 +1,160 @@
+import hashlib
+import sqlite3
+import threading
+import time
+from typing import Dict, List
+
+import numpy as np
+
+from app.utils.logger import LOGGER
+
+
+def text_hash(text: str) -> str:
+    """sha256 of the exact text that was embedded"""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class PersistentEmbeddingStore:
+    """
+    * durable embedding cache (sqlite, wal) keyed by
+      (embedding_model, task_type, sha256(text))
+    * vectors are float32 blobs; least recently used rows are evicted once the
+      database grows past max_bytes
+    * sqlite file locking makes it safe to share between uvicorn workers
+    """
+
+    def __init__(self, db_path: str, max_bytes: int):
+        self.db_path = db_path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        # * other workers may hold the write lock briefly
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, timeout=30)
+        self._create_tables()
+
+    def _create_tables(self):
+        """create embedding table if not exists"""
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS embeddings (
+                    model TEXT NOT NULL,
+                    task_type TEXT NOT NULL,
+                    text_hash TEXT NOT NULL,
+                    vector BLOB NOT NULL,
+                    last_used REAL NOT NULL,
+                    PRIMARY KEY (model, task_type, text_hash)
+                ) WITHOUT ROWID
+                """
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_embeddings_last_used "
+                "ON embeddings (last_used)"
+            )
+
+    def get_many(
+        self, model: str, task_type: str, texts: List[str]
+    ) -> Dict[int, List[float]]:
+        """stored vectors by position in texts"""
+        hashes = [text_hash(text) for text in texts]
+        found = {}
+        with self._lock, self._conn:
+            # * stay under sqlite's bound-parameter limit
+            for i in range(0, len(hashes), 500):
+                batch = list(set(hashes[i : i + 500]))
+                rows = self._conn.execute(
+                    f"""
+                    SELECT text_hash, vector FROM embeddings
+                    WHERE model = ? AND task_type = ?
+                    AND text_hash IN ({",".join("?" * len(batch))})
+                    """,
+                    (model, task_type.upper(), *batch),
+                ).fetchall()
+                found.update(rows)
+            if found:
+                self._conn.executemany(
+                    """
+                    UPDATE embeddings SET last_used = ?
+                    WHERE model = ? AND task_type = ? AND text_hash = ?
+                    """,
+                    [(time.time(), model, task_type.upper(), hash_) for hash_ in found],
+                )
+        return {
+            i: np.frombuffer(found[hash_], dtype=np.float32).tolist()
+            for i, hash_ in enumerate(hashes)
+            if hash_ in found
+        }
+
+    def put_many(
+        self,
+        model: str,
+        task_type: str,
+        texts: List[str],
+        vectors: List[List[float]],
+    ):
+        """store vectors and evict old rows past the size limit"""
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.executemany(
+                """
+                INSERT OR REPLACE INTO embeddings
+                    (model, task_type, text_hash, vector, last_used)
+                VALUES (?, ?, ?, ?, ?)
+                """,
+                [
+                    (
+                        model,
+                        task_type.upper(),
+                        text_hash(text),
+                        np.asarray(vector, dtype=np.float32).tobytes(),
+                        now,
+                    )
+                    for text, vector in zip(texts, vectors)
+                ],
+            )
+            self._evict()
+
+    def compact(self) -> int:
+        """evict past the size limit and reclaim free pages - returns db bytes"""
+        with self._lock:
+            with self._conn:
+                self._evict()
+            self._conn.execute("VACUUM")
+            self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            return self._used_bytes()
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def _used_bytes(self) -> int:
+        page_size = self._conn.execute("PRAGMA page_size").fetchone()[0]
+        page_count = self._conn.execute("PRAGMA page_count").fetchone()[0]
+        free_pages = self._conn.execute("PRAGMA freelist_count").fetchone()[0]
+        return (page_count - free_pages) * page_size
+
+    def _evict(self):
+        """drop least recently used rows until under 90% of max_bytes"""
+        if self.max_bytes <= 0:
+            return
+        used = self._used_bytes()
+        if used <= self.max_bytes:
+            return
+        total = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+        # * estimate rows to drop from the average row size
+        to_delete = int(total * (1 - 0.9 * self.max_bytes / used)) + 1
+        self._conn.execute(
+            """
+            DELETE FROM embeddings WHERE (model, task_type, text_hash) IN (
+                SELECT model, task_type, text_hash FROM embeddings
+                ORDER BY last_used LIMIT ?
+            )
+            """,
+            (to_delete,),
+        )
+        LOGGER.info(f"[EmbeddingStore] Evicted {to_delete} embeddings")
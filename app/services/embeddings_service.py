@@ -1,33 +1,80 @@
 import asyncio
-from typing import List
+import os
+import time
+from typing import Dict, List, Optional, Union
 
 from google import genai
-from google.genai import types
+from google.genai import errors, types
 
 from app.core.config import settings
+from app.core.executors import execution_layer
+from app.schemas.metrics import EmbeddingCacheMetrics, EmbeddingMetrics
+from app.services.batch_sizer import AdaptiveBatchSizer, is_payload_rejection
+from app.services.embedding_cache import EmbeddingCache
+from app.services.embedding_store import PersistentEmbeddingStore
+from app.services.micro_batcher import MicroBatcher
+from app.services.rate_limiter import (
+    EmbeddingMetricsRecorder,
+    RateLimiter,
+    backoff_delay,
+    estimate_tokens,
+    is_retryable,
+)
+from app.utils.logger import LOGGER
 
 
 class EmbeddingService:
     """
     * embedding generation service
+    * every embed_content call goes through a shared requests/tokens per minute
+      limiter and is retried with backoff on 429/5xx errors
     """
 
-    def __init__(self):
-        self.client = genai.Client()
+    def __init__(self, client: Optional[genai.Client] = None):
+        self.client = client or genai.Client()
         self.model = settings.embedding_model  # model name
+        # * caps embedding requests in flight on the async path
+        self._request_slots = asyncio.Semaphore(settings.embedding_concurrency)
+        self.rate_limiter = RateLimiter(
+            requests_per_minute=settings.embedding_requests_per_minute,
+            tokens_per_minute=settings.embedding_tokens_per_minute,
+        )
+        self.metrics = EmbeddingMetricsRecorder()
+        self.batch_sizer = AdaptiveBatchSizer(
+            initial_size=settings.embedding_batch_size,
+            max_size=settings.embedding_max_batch_size,
+            max_tokens=settings.embedding_max_batch_tokens,
+            target_latency=settings.embedding_target_latency,
+        )
+        # * single-text (query) embeddings are cached in process
+        self.cache = EmbeddingCache(
+            max_entries=settings.query_cache_size,
+            ttl_seconds=settings.query_cache_ttl,
+        )
+        # * micro-batchers for single-text requests, one per task type
+        self._query_batchers: Dict[str, MicroBatcher[str, List[float]]] = {}
+        # * batch embeddings are persisted across restarts and re-ingestions
+        self.store = (
+            PersistentEmbeddingStore(
+                os.path.join(settings.data_dir, settings.embedding_store_db),
+                max_bytes=settings.embedding_store_max_mb * 1024 * 1024,
+            )
+            if settings.embedding_store_db
+            else None
+        )
 
     def generate_embedding(
         self, text: str, task_type: str = "RETRIEVAL_DOCUMENT"
     ) -> List[float]:
         """
-        * generate embedding for single text
+        * generate embedding for single text (cached)
         """
-        response = self.client.models.embed_content(
-            model=self.model,
-            contents=text,
-            config=types.EmbedContentConfig(task_type=task_type),
-        )
-        return response.embeddings[0].values
+        key = self.cache.make_key(text, self.model, task_type)
+        embedding = self.cache.get(key)
+        if embedding is None:
+            embedding = self._embed_content(text, task_type)[0]
+            self.cache.put(key, embedding)
+        return embedding
 
     def generate_embeddings_batch(
         self,
@@ -37,27 +84,233 @@ class EmbeddingService:
     ) -> List[List[float]]:
         """
         * generate embeddings for multiple texts
+        * texts already in the persistent store are not sent to the api
         """
-        # * process in batches to avoid rate limits
-        all_embeddings = []
+        stored = self._get_stored(texts, task_type)
+        missing = [text for i, text in enumerate(texts) if i not in stored]
+
+        # * process in batches - the rate limiter paces the requests
+        new_embeddings = []
+        for i in range(0, len(missing), batch_size):
+            new_embeddings.extend(
+                self._embed_content(missing[i : i + batch_size], task_type)
+            )
+        self._put_stored(missing, new_embeddings, task_type)
 
-        for i in range(0, len(texts), batch_size):
-            batch = texts[i : i + batch_size]
+        return self._merge(len(texts), stored, new_embeddings)
 
-            response = self.client.models.embed_content(
-                model=self.model,
-                contents=batch,
-                config=types.EmbedContentConfig(task_type=task_type),
+    async def agenerate_embedding(
+        self, text: str, task_type: str = "RETRIEVAL_DOCUMENT"
+    ) -> List[float]:
+        """
+        * generate embedding for single text with the async client (cached)
+        """
+        key = self.cache.make_key(text, self.model, task_type)
+        embedding = self.cache.get(key)
+        if embedding is None:
+            # * concurrent cache misses are sent together in one request
+            embedding = await self._query_batcher(task_type).submit(text)
+            self.cache.put(key, embedding)
+        return embedding
+
+    async def agenerate_embeddings_batch(
+        self,
+        texts: List[str],
+        task_type: str = "RETRIEVAL_DOCUMENT",
+        batch_size: Optional[int] = None,
+    ) -> List[List[float]]:
+        """
+        * generate embeddings for multiple texts with the async client
+        * batches are sized adaptively unless batch_size is given, sent
+          concurrently (up to embedding_concurrency in flight) and results keep
+          the input order
+        """
+        stored = await execution_layer.run_in_thread(self._get_stored, texts, task_type)
+        missing = [text for i, text in enumerate(texts) if i not in stored]
+
+        if batch_size is None:
+            batches = self.batch_sizer.split(missing)
+        else:
+            batches = [
+                missing[i : i + batch_size] for i in range(0, len(missing), batch_size)
+            ]
+
+        batch_embeddings = await asyncio.gather(
+            *(self._aembed_batch(batch, task_type) for batch in batches)
+        )
+        new_embeddings = [
+            embedding for batch in batch_embeddings for embedding in batch
+        ]
+        await execution_layer.run_in_thread(
+            self._put_stored, missing, new_embeddings, task_type
+        )
+
+        return self._merge(len(texts), stored, new_embeddings)
+
+    def get_metrics(self) -> EmbeddingMetrics:
+        """
+        * embedding usage and throttling since startup
+        """
+        return self.metrics.snapshot()
+
+    def get_cache_metrics(self) -> EmbeddingCacheMetrics:
+        """
+        * query embedding cache hits, misses and size
+        """
+        return self.cache.snapshot()
+
+    def close(self):
+        """
+        * close the persistent embedding store
+        """
+        if self.store is not None:
+            self.store.close()
+
+    def _get_stored(self, texts: List[str], task_type: str) -> Dict[int, List[float]]:
+        if self.store is None or not texts:
+            return {}
+        stored = self.store.get_many(self.model, task_type, texts)
+        self.metrics.record(store_hits=len(stored))
+        return stored
+
+    def _put_stored(
+        self, texts: List[str], embeddings: List[List[float]], task_type: str
+    ):
+        if self.store is not None and texts:
+            self.store.put_many(self.model, task_type, texts, embeddings)
+
+    @staticmethod
+    def _merge(
+        total: int, stored: Dict[int, List[float]], new_embeddings: List[List[float]]
+    ) -> List[List[float]]:
+        """
+        * stored vectors by position + new vectors in order of the missing texts
+        """
+        new_iter = iter(new_embeddings)
+        return [stored[i] if i in stored else next(new_iter) for i in range(total)]
+
+    def _query_batcher(self, task_type: str) -> MicroBatcher[str, List[float]]:
+        task_type = task_type.upper()
+        if task_type not in self._query_batchers:
+
+            async def embed_queries(texts: List[str]) -> List[List[float]]:
+                # * identical concurrent queries are embedded once
+                unique = list(dict.fromkeys(texts))
+                embeddings = await self._aembed_content(unique, task_type)
+                by_text = dict(zip(unique, embeddings))
+                return [by_text[text] for text in texts]
+
+            self._query_batchers[task_type] = MicroBatcher(
+                embed_queries,
+                max_batch=min(
+                    settings.query_batch_max_size, settings.embedding_max_batch_size
+                ),
+                max_wait_ms=settings.query_batch_max_wait_ms,
+            )
+        return self._query_batchers[task_type]
+
+    async def _aembed_batch(
+        self, batch: List[str], task_type: str
+    ) -> List[List[float]]:
+        """
+        * embed one batch, splitting it in half if rejected as too large
+        """
+        try:
+            return await self._aembed_content(batch, task_type)
+        except errors.ClientError as e:
+            if not is_payload_rejection(e) or len(batch) == 1:
+                raise
+            self.batch_sizer.record_rejection(len(batch))
+            LOGGER.warning(
+                f"[Embedding] Batch of {len(batch)} rejected as too large, "
+                f"splitting (batch size now {self.batch_sizer.size})"
             )
+            half = len(batch) // 2
+            first, second = await asyncio.gather(
+                self._aembed_batch(batch[:half], task_type),
+                self._aembed_batch(batch[half:], task_type),
+            )
+            return first + second
+
+    def _embed_content(
+        self, contents: Union[str, List[str]], task_type: str
+    ) -> List[List[float]]:
+        tokens = estimate_tokens(contents)
+        for attempt in range(settings.embedding_max_retries + 1):
+            self.metrics.record(throttled_seconds=self.rate_limiter.acquire(tokens))
+            started = time.perf_counter()
+            try:
+                response = self.client.models.embed_content(
+                    model=self.model,
+                    contents=contents,
+                    config=types.EmbedContentConfig(task_type=task_type),
+                )
+            except Exception as e:
+                self.metrics.record(embedding_seconds=time.perf_counter() - started)
+                delay = self._retry_delay(e, attempt)
+                time.sleep(delay)
+                self.metrics.record(throttled_seconds=delay)
+                continue
+            return self._record_success(response, started, tokens)
 
-            batch_embeddings = [embedding.values for embedding in response.embeddings]
-            all_embeddings.extend(batch_embeddings)
+    async def _aembed_content(
+        self, contents: Union[str, List[str]], task_type: str
+    ) -> List[List[float]]:
+        tokens = estimate_tokens(contents)
+        for attempt in range(settings.embedding_max_retries + 1):
+            async with self._request_slots:
+                self.metrics.record(
+                    throttled_seconds=await self.rate_limiter.aacquire(tokens)
+                )
+                started = time.perf_counter()
+                try:
+                    response = await self.client.aio.models.embed_content(
+                        model=self.model,
+                        contents=contents,
+                        config=types.EmbedContentConfig(task_type=task_type),
+                    )
+                except Exception as e:
+                    self.metrics.record(embedding_seconds=time.perf_counter() - started)
+                    delay = self._retry_delay(e, attempt)
+                else:
+                    return self._record_success(response, started, tokens)
+            # * back off outside the slot so other requests can proceed
+            await asyncio.sleep(delay)
+            self.metrics.record(throttled_seconds=delay)
 
-            # * small delay between batches
-            if i + batch_size < len(texts):
-                asyncio.sleep(0.1)
+    def _retry_delay(self, error: Exception, attempt: int) -> float:
+        """
+        * backoff delay for a retryable error, re-raise anything else
+        """
+        if not is_retryable(error) or attempt >= settings.embedding_max_retries:
+            self.metrics.record(failures=1)
+            raise error
+        self.batch_sizer.record_error()
+        delay = backoff_delay(
+            attempt,
+            settings.embedding_retry_base_delay,
+            settings.embedding_retry_max_delay,
+        )
+        self.metrics.record(retries=1)
+        LOGGER.warning(
+            f"[Embedding] {error.code} from embedding api, retry {attempt + 1} "
+            f"in {delay:.2f}s"
+        )
+        return delay
 
-        return all_embeddings
+    def _record_success(
+        self, response, started: float, tokens: int
+    ) -> List[List[float]]:
+        latency = time.perf_counter() - started
+        embeddings = [embedding.values for embedding in response.embeddings]
+        self.metrics.record(
+            requests=1,
+            texts=len(embeddings),
+            estimated_tokens=tokens,
+            embedding_seconds=latency,
+        )
+        self.batch_sizer.record_success(len(embeddings), latency)
+        return embeddings
 
 
 # def main():
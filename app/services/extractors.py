@@ -0,0 +1,77 @@
+# * document loaders run inside the process pool
+# * kept as module-level functions (picklable) with light imports only
+
+from typing import Any, Dict, List
+
+from langchain_community.document_loaders import (
+    PyPDFLoader,
+    TextLoader,
+    UnstructuredWordDocumentLoader,
+)
+from langchain_core.documents.base import Document
+from pypdf import PdfReader
+
+
+def load_pdf(file_path: str) -> List[Document]:
+    """
+    * extract content from pdf with page information
+    """
+    loader = PyPDFLoader(file_path)
+    return loader.load()
+
+
+def count_pdf_pages(file_path: str) -> int:
+    """
+    * get number of pages without extracting any text
+    """
+    return len(PdfReader(file_path).pages)
+
+
+def load_pdf_pages(file_path: str, start: int, end: int) -> List[Document]:
+    """
+    * extract pages [start, end) from pdf with the same metadata as PyPDFLoader
+    """
+    reader = PdfReader(file_path)
+    doc_metadata = _pdf_metadata(reader, file_path)
+    # * page_labels rebuilds the label list for the whole file on every access
+    page_labels = reader.page_labels
+
+    documents = []
+    for page_number in range(start, end):
+        text = reader.pages[page_number].extract_text(extraction_mode="plain")
+        documents.append(
+            Document(
+                page_content=text.strip(),
+                metadata=doc_metadata
+                | {
+                    "page": page_number,
+                    "page_label": page_labels[page_number],
+                },
+            )
+        )
+    return documents
+
+
+def _pdf_metadata(reader: PdfReader, file_path: str) -> Dict[str, Any]:
+    metadata = {"producer": "PyPDF", "creator": "PyPDF", "creationdate": ""}
+    for key, value in (reader.metadata or {}).items():
+        metadata[key.lstrip("/").lower()] = str(value)
+    metadata["source"] = file_path
+    metadata["total_pages"] = len(reader.pages)
+    return metadata
+
+
+def load_docx(file_path: str) -> List[Document]:
+    """
+    * extract content from docx with structure information
+    """
+    loader = UnstructuredWordDocumentLoader(file_path, mode="paged")
+    return loader.load()
+
+
+def load_text(file_path: str) -> List[Document]:
+    """
+    * extract content from plain text files
+    """
+    loader = TextLoader(file_path, encoding="utf-8")
+    return loader.load()
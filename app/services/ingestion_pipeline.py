@@ -0,0 +1,229 @@
+import asyncio
+import time
+from typing import AsyncIterator, Callable, Dict, List, Optional
+
+from langchain_core.documents.base import Document
+from pydantic import BaseModel
+
+from app.core.executors import execution_layer
+from app.schemas.documents import ChunkMetadata
+from app.schemas.jobs import JobStage
+from app.services.embeddings_service import EmbeddingService
+from app.services.qdrant_vector_store import QdrantVectorStore, chunk_point_id
+from app.utils.logger import LOGGER
+
+# * end-of-stream marker passed between stages
+_DONE = object()
+
+
+class PipelineStats(BaseModel):
+    pages: int = 0
+    chunks: int = 0
+    embedded: int = 0  # chunks sent to the embedding api
+    reused: int = 0  # chunks that kept a known vector
+    upserted: int = 0
+    embed_seconds: float = 0.0  # time spent waiting on the embedding api
+    upsert_seconds: float = 0.0  # time spent waiting on qdrant
+
+
+class IngestionPipeline:
+    """
+    * streaming page -> chunk -> embed -> upsert ingestion pipeline
+    * stages run concurrently and are connected by bounded queues, so only a
+      few batches are held in memory and points reach qdrant as they are ready
+    """
+
+    def __init__(
+        self,
+        embedding_service: EmbeddingService,
+        vector_store: QdrantVectorStore,
+        chunk_builder: Callable[[List[Document], int], List[ChunkMetadata]],
+        doc_id: int,
+        content_hash: str,
+        batch_size: int = 32,
+        queue_size: int = 4,
+        known_vectors: Optional[Dict[str, List[float]]] = None,
+        progress_callback: Optional[Callable[[JobStage, int, int], None]] = None,
+        confirm_timeout: float = 60.0,
+    ):
+        self.embedding_service = embedding_service
+        self.vector_store = vector_store
+        self.chunk_builder = chunk_builder
+        self.doc_id = doc_id
+        self.content_hash = content_hash
+        self.batch_size = max(1, batch_size)
+        self.queue_size = max(1, queue_size)
+        # * vectors by chunk_hash that can be reused without embedding
+        self.known_vectors = known_vectors or {}
+        self.progress_callback = progress_callback
+        # * seconds to wait for qdrant to apply the acknowledged upserts
+        self.confirm_timeout = confirm_timeout
+        self.stats = PipelineStats()
+
+    async def run(
+        self, pages: AsyncIterator[List[Document]], total_pages: int
+    ) -> PipelineStats:
+        """
+        * run every stage until the page stream is exhausted
+        """
+        started = time.perf_counter()
+        embed_queue = asyncio.Queue(maxsize=self.queue_size)
+        upsert_queue = asyncio.Queue(maxsize=self.queue_size)
+
+        try:
+            async with asyncio.TaskGroup() as task_group:
+                task_group.create_task(
+                    self._chunk_stage(pages, total_pages, embed_queue)
+                )
+                task_group.create_task(self._embed_stage(embed_queue, upsert_queue))
+                task_group.create_task(self._upsert_stage(upsert_queue))
+        except ExceptionGroup as eg:
+            # * surface the first stage failure to the caller
+            raise eg.exceptions[0]
+
+        LOGGER.info(
+            f"[Pipeline] {self.stats.upserted} chunks | "
+            f"embed={self.stats.embed_seconds:.2f}s "
+            f"upsert={self.stats.upsert_seconds:.2f}s "
+            f"wall={time.perf_counter() - started:.2f}s"
+        )
+        return self.stats
+
+    def _report(self, stage: JobStage, done: int, total: int):
+        if self.progress_callback is not None:
+            self.progress_callback(stage, done, total)
+
+    async def _chunk_stage(
+        self,
+        pages: AsyncIterator[List[Document]],
+        total_pages: int,
+        embed_queue: asyncio.Queue,
+    ):
+        batch: List[ChunkMetadata] = []
+        try:
+            async for documents in pages:
+                self.stats.pages += len(documents)
+                self._report(JobStage.extracting, self.stats.pages, total_pages)
+
+                # * chunk indexes continue across page batches
+                chunks = await execution_layer.run_in_thread(
+                    self.chunk_builder, documents, self.stats.chunks
+                )
+                self.stats.chunks += len(chunks)
+                self._report(JobStage.chunking, self.stats.pages, total_pages)
+
+                batch.extend(chunks)
+                while len(batch) >= self.batch_size:
+                    await embed_queue.put(batch[: self.batch_size])
+                    batch = batch[self.batch_size :]
+        finally:
+            # * stop page parsing still in flight when a later stage fails
+            if hasattr(pages, "aclose"):
+                await pages.aclose()
+
+        if batch:
+            await embed_queue.put(batch)
+        await embed_queue.put(_DONE)
+
+    async def _embed_stage(
+        self, embed_queue: asyncio.Queue, upsert_queue: asyncio.Queue
+    ):
+        while (batch := await embed_queue.get()) is not _DONE:
+            new_chunks = [
+                chunk for chunk in batch if chunk.chunk_hash not in self.known_vectors
+            ]
+            new_vectors = {}
+            if new_chunks:
+                started = time.perf_counter()
+                # * the service splits the batch into adaptively sized
+                # * concurrent api requests
+                embeddings = await self.embedding_service.agenerate_embeddings_batch(
+                    [chunk.document for chunk in new_chunks]
+                )
+                self.stats.embed_seconds += time.perf_counter() - started
+                if not embeddings or len(embeddings) != len(new_chunks):
+                    raise ValueError("embedding generation failed or incomplete")
+                new_vectors = {
+                    chunk.chunk_index: embedding
+                    for chunk, embedding in zip(new_chunks, embeddings)
+                }
+
+            vectors = [
+                new_vectors.get(chunk.chunk_index)
+                or self.known_vectors[chunk.chunk_hash]
+                for chunk in batch
+            ]
+            self.stats.embedded += len(new_chunks)
+            self.stats.reused += len(batch) - len(new_chunks)
+            self._report(
+                JobStage.embedding,
+                self.stats.embedded + self.stats.reused,
+                self.stats.chunks,
+            )
+            await upsert_queue.put((batch, vectors))
+
+        await upsert_queue.put(_DONE)
+
+    async def _upsert_stage(self, upsert_queue: asyncio.Queue):
+        """
+        * batches are sent with wait=False so the next embedding request is not
+          held back by qdrant indexing
+        * an acknowledged operation is not applied yet - the stage ends on a
+          barrier until every upserted chunk is counted for this document's
+          content hash
+        """
+        operation_ids: List[Optional[int]] = []
+        while (item := await upsert_queue.get()) is not _DONE:
+            operation_ids.append(await self._upsert(*item))
+            self.stats.upserted += len(item[0])
+            self._report(JobStage.upserting, self.stats.upserted, self.stats.chunks)
+            LOGGER.debug(
+                f"[Pipeline] Upserted {self.stats.upserted}/{self.stats.chunks} chunks"
+            )
+
+        if operation_ids:
+            await self._confirm_upserts(operation_ids)
+
+    async def _upsert(
+        self, batch: List[ChunkMetadata], vectors: List[List[float]]
+    ) -> Optional[int]:
+        started = time.perf_counter()
+        # * deterministic ids make retries and re-ingests overwrite
+        operation_id = await execution_layer.run_in_thread(
+            self.vector_store.upsert_points,
+            vectors,
+            [chunk.to_payload() for chunk in batch],
+            [
+                chunk_point_id(self.doc_id, self.content_hash, chunk.chunk_index)
+                for chunk in batch
+            ],
+            wait=False,
+        )
+        self.stats.upsert_seconds += time.perf_counter() - started
+        return operation_id
+
+    async def _confirm_upserts(self, operation_ids: List[Optional[int]]):
+        """
+        * wait until qdrant applied the acknowledged operations - an exact count
+          is answered by every shard, so it holds across shards and replicas
+        """
+        started = time.perf_counter()
+        deadline = started + self.confirm_timeout
+        delay = 0.05
+        while True:
+            stored = await execution_layer.run_in_thread(
+                self.vector_store.count_document_chunks,
+                self.content_hash,
+                self.doc_id,
+            )
+            if stored >= self.stats.upserted:
+                break
+            if time.perf_counter() >= deadline:
+                raise RuntimeError(
+                    f"qdrant applied {stored}/{self.stats.upserted} chunks of "
+                    f"operations {operation_ids[0]}..{operation_ids[-1]} "
+                    f"within {self.confirm_timeout}s"
+                )
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 1.0)
+        self.stats.upsert_seconds += time.perf_counter() - started
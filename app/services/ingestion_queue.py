@@ -0,0 +1,204 @@
+import asyncio
+import os
+import uuid
+from typing import Callable, List, Optional
+
+from app.core.executors import execution_layer
+from app.schemas.jobs import IngestionJob, JobStage, JobStatus
+from app.services.job_store import IngestionJobStore
+from app.utils.logger import LOGGER
+
+
+class QueueFullError(Exception):
+    """raised when the ingestion queue cannot accept more jobs"""
+
+
+class IngestionQueue:
+    """
+    * asyncio ingestion job queue with a bounded worker pool
+    * jobs are persisted in the job store so queued work survives a restart
+    * job store (sqlite) calls run in the io thread pool, off the event loop
+    """
+
+    def __init__(
+        self,
+        job_store: IngestionJobStore,
+        num_workers: int = 2,
+        max_queue_size: int = 100,
+        processor_factory: Optional[Callable] = None,
+    ):
+        self.job_store = job_store
+        self.num_workers = num_workers
+        self.max_queue_size = max_queue_size
+        self._processor_factory = processor_factory
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+
+    async def start(self):
+        """
+        * requeue unfinished jobs from the job store and start workers
+        """
+        self._queue = asyncio.Queue()
+
+        # * jobs left running by a previous process are restarted from scratch
+        recovered = await self._store(self.job_store.list_unfinished_jobs)
+        for job in recovered:
+            await self._store(
+                self.job_store.update_job, job.id, status=JobStatus.queued
+            )
+            self._queue.put_nowait(job.id)
+        if recovered:
+            LOGGER.info(f"[Jobs] Recovered {len(recovered)} unfinished jobs")
+
+        self._workers = [
+            asyncio.create_task(self._worker(i), name=f"ingestion-worker-{i}")
+            for i in range(self.num_workers)
+        ]
+        LOGGER.info(f"[Jobs] Started {self.num_workers} ingestion workers")
+
+    async def shutdown(self):
+        """
+        * stop workers - interrupted jobs stay in the job store for recovery
+        """
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    async def submit(
+        self,
+        file_path: str,
+        filename: str,
+        content_type: str,
+        content_hash: Optional[str] = None,
+    ) -> IngestionJob:
+        """
+        * persist a new job and enqueue it for processing
+        """
+        if self._queue is None:
+            raise RuntimeError("ingestion queue not started - call start() first")
+        if self._queue.qsize() >= self.max_queue_size:
+            raise QueueFullError("ingestion queue is full")
+
+        job = IngestionJob(
+            id=uuid.uuid4().hex,
+            filename=filename,
+            content_type=content_type,
+            file_path=file_path,
+            content_hash=content_hash,
+        )
+        await self._store(self.job_store.create_job, job)
+        self._queue.put_nowait(job.id)
+        LOGGER.info(f"[Jobs] Queued job {job.id} for file: {filename}")
+        return job
+
+    async def get_job(self, job_id: str) -> Optional[IngestionJob]:
+        """
+        * get job status from the job store
+        """
+        return await self._store(self.job_store.get_job, job_id)
+
+    async def join(self):
+        """
+        * wait until every queued job has been processed
+        """
+        await self._queue.join()
+
+    async def _worker(self, worker_index: int):
+        while True:
+            job_id = await self._queue.get()
+            try:
+                await self._run_job(job_id)
+            except Exception as e:
+                LOGGER.exception(f"[Jobs] Worker {worker_index} failed: {str(e)}")
+            finally:
+                self._queue.task_done()
+
+    async def _run_job(self, job_id: str):
+        job = await self.get_job(job_id)
+        if job is None:
+            LOGGER.warning(f"[Jobs] Skipping unknown job: {job_id}")
+            return
+
+        await self._store(self.job_store.update_job, job.id, status=JobStatus.running)
+
+        # * the pipeline reports progress synchronously on every batch - writes
+        # * are chained so they reach the job store in order
+        last_write: Optional[asyncio.Task] = None
+
+        def report_progress(stage: JobStage, done: int, total: int):
+            nonlocal last_write
+            last_write = asyncio.create_task(
+                self._write_progress(last_write, job.id, stage, done, total)
+            )
+
+        try:
+            processor = self._get_processor()
+            processed_doc = await processor.process_document(
+                file_path=job.file_path,
+                filename=job.filename,
+                content_type=job.content_type,
+                content_hash=job.content_hash,
+                progress_callback=report_progress,
+            )
+
+            if last_write is not None:
+                await last_write
+            if processed_doc is None:
+                await self._store(
+                    self.job_store.update_job,
+                    job.id,
+                    status=JobStatus.failed,
+                    error="document could not be processed",
+                )
+            else:
+                await self._store(
+                    self.job_store.update_job,
+                    job.id,
+                    status=JobStatus.completed,
+                    chunks_created=processed_doc.chunks_created,
+                )
+                LOGGER.info(f"[Jobs] Completed job {job.id}: {job.filename}")
+
+        except Exception as e:
+            LOGGER.exception(f"[Jobs] Job {job.id} failed: {str(e)}")
+            if last_write is not None:
+                await last_write
+            await self._store(
+                self.job_store.update_job, job.id, status=JobStatus.failed, error=str(e)
+            )
+
+        # * stored upload is no longer needed once the job is finished
+        # * (a cancelled job keeps its file so it can be recovered on restart)
+        if os.path.exists(job.file_path):
+            os.unlink(job.file_path)
+
+    async def _write_progress(
+        self,
+        previous: Optional[asyncio.Task],
+        job_id: str,
+        stage: JobStage,
+        done: int,
+        total: int,
+    ):
+        if previous is not None:
+            await previous
+        try:
+            await self._store(
+                self.job_store.update_progress, job_id, stage, done, total
+            )
+        except Exception as e:
+            LOGGER.warning(f"[Jobs] Progress update failed for job {job_id}: {str(e)}")
+
+    async def _store(self, func, *args, **kwargs):
+        """run a blocking job store call in the io thread pool"""
+        return await execution_layer.run_in_thread(func, *args, **kwargs)
+
+    def _get_processor(self):
+        if self._processor_factory is not None:
+            return self._processor_factory()
+
+        # * local import - document service depends on the service manager
+        from app.services.document_service import DocumentService
+
+        return DocumentService()
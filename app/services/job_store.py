@@ -0,0 +1,176 @@
+import json
+import sqlite3
+import threading
+from datetime import datetime
+from typing import List, Optional
+
+from app.schemas.jobs import IngestionJob, JobStage, JobStatus, StageProgress
+from app.utils.logger import LOGGER
+
+
+class IngestionJobStore:
+    """
+    * durable local job table (sqlite) for background ingestion jobs
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._create_tables()
+
+    def _create_tables(self):
+        """create job table if not exists"""
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS ingestion_jobs (
+                    id TEXT PRIMARY KEY,
+                    filename TEXT NOT NULL,
+                    content_type TEXT NOT NULL,
+                    file_path TEXT NOT NULL,
+                    content_hash TEXT,
+                    status TEXT NOT NULL,
+                    stage TEXT,
+                    progress TEXT NOT NULL DEFAULT '{}',
+                    chunks_created INTEGER,
+                    error TEXT,
+                    created_at TEXT NOT NULL,
+                    updated_at TEXT NOT NULL
+                )
+                """
+            )
+            # * add columns introduced after the table was first created
+            columns = {
+                row["name"]
+                for row in self._conn.execute("PRAGMA table_info(ingestion_jobs)")
+            }
+            if "content_hash" not in columns:
+                self._conn.execute(
+                    "ALTER TABLE ingestion_jobs ADD COLUMN content_hash TEXT"
+                )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_ingestion_jobs_status "
+                "ON ingestion_jobs (status, created_at)"
+            )
+
+    def create_job(self, job: IngestionJob) -> IngestionJob:
+        """insert a new job"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                """
+                INSERT INTO ingestion_jobs (
+                    id, filename, content_type, file_path, content_hash, status,
+                    stage, progress, chunks_created, error, created_at, updated_at
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    job.id,
+                    job.filename,
+                    job.content_type,
+                    job.file_path,
+                    job.content_hash,
+                    job.status,
+                    job.stage,
+                    self._dump_progress(job),
+                    job.chunks_created,
+                    job.error,
+                    job.created_at.isoformat(),
+                    job.updated_at.isoformat(),
+                ),
+            )
+        return job
+
+    def get_job(self, job_id: str) -> Optional[IngestionJob]:
+        """get job by id"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM ingestion_jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+        return self._row_to_job(row) if row else None
+
+    def list_unfinished_jobs(self) -> List[IngestionJob]:
+        """list queued or interrupted jobs in submission order"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM ingestion_jobs WHERE status IN (?, ?) "
+                "ORDER BY created_at",
+                (JobStatus.queued, JobStatus.running),
+            ).fetchall()
+        return [self._row_to_job(row) for row in rows]
+
+    def update_job(
+        self,
+        job_id: str,
+        status: Optional[JobStatus] = None,
+        stage: Optional[JobStage] = None,
+        chunks_created: Optional[int] = None,
+        error: Optional[str] = None,
+    ):
+        """update job status fields"""
+        fields = {"updated_at": datetime.now().isoformat()}
+        if status is not None:
+            fields["status"] = status
+        if stage is not None:
+            fields["stage"] = stage
+        if chunks_created is not None:
+            fields["chunks_created"] = chunks_created
+        if error is not None:
+            fields["error"] = error
+
+        assignments = ", ".join(f"{key} = ?" for key in fields)
+        with self._lock, self._conn:
+            self._conn.execute(
+                f"UPDATE ingestion_jobs SET {assignments} WHERE id = ?",
+                (*fields.values(), job_id),
+            )
+
+    def update_progress(self, job_id: str, stage: JobStage, done: int, total: int):
+        """record progress of a single stage"""
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT progress FROM ingestion_jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+            if row is None:
+                LOGGER.warning(f"[Jobs] Progress update for unknown job: {job_id}")
+                return
+
+            progress = json.loads(row["progress"])
+            progress[stage] = {"done": done, "total": total}
+            self._conn.execute(
+                "UPDATE ingestion_jobs SET stage = ?, progress = ?, updated_at = ? "
+                "WHERE id = ?",
+                (stage, json.dumps(progress), datetime.now().isoformat(), job_id),
+            )
+
+    def close(self):
+        """close database connection"""
+        with self._lock:
+            self._conn.close()
+
+    def _dump_progress(self, job: IngestionJob) -> str:
+        return json.dumps(
+            {stage: progress.model_dump() for stage, progress in job.progress.items()}
+        )
+
+    def _row_to_job(self, row: sqlite3.Row) -> IngestionJob:
+        progress = {
+            stage: StageProgress(**value)
+            for stage, value in json.loads(row["progress"]).items()
+        }
+        return IngestionJob(
+            id=row["id"],
+            filename=row["filename"],
+            content_type=row["content_type"],
+            file_path=row["file_path"],
+            content_hash=row["content_hash"],
+            status=row["status"],
+            stage=row["stage"],
+            progress=progress,
+            chunks_created=row["chunks_created"],
+            error=row["error"],
+            created_at=datetime.fromisoformat(row["created_at"]),
+            updated_at=datetime.fromisoformat(row["updated_at"]),
+        )
@@ -0,0 +1,66 @@
+import asyncio
+from typing import Awaitable, Callable, Generic, List, Optional, Set, Tuple, TypeVar
+
+ItemT = TypeVar("ItemT")
+ResultT = TypeVar("ResultT")
+
+
+class MicroBatcher(Generic[ItemT, ResultT]):
+    """
+    * collects concurrent single-item requests for up to max_wait_ms (or until
+      max_batch items are waiting) and resolves them with one batched call
+    * batch_fn must return one result per item, in order
+    """
+
+    def __init__(
+        self,
+        batch_fn: Callable[[List[ItemT]], Awaitable[List[ResultT]]],
+        max_batch: int,
+        max_wait_ms: float,
+    ):
+        self.batch_fn = batch_fn
+        self.max_batch = max(1, max_batch)
+        self.max_wait = max(0.0, max_wait_ms) / 1000
+        self._pending: List[Tuple[ItemT, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        # * keep references so running batches are not garbage collected
+        self._running: Set[asyncio.Task] = set()
+
+    async def submit(self, item: ItemT) -> ResultT:
+        """
+        * queue one item and wait for its result
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((item, future))
+
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._flush)
+
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.create_task(self._run(batch))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+
+    async def _run(self, batch: List[Tuple[ItemT, asyncio.Future]]):
+        try:
+            results = await self.batch_fn([item for item, _ in batch])
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), result in zip(batch, results):
+            # * callers that gave up (cancelled) are skipped
+            if not future.done():
+                future.set_result(result)
@@ -1,33 +1,137 @@
+import hashlib
+import mimetypes
+import time
 import uuid
+from datetime import datetime
 from typing import Any, Dict, List, Optional
 
-from qdrant_client import QdrantClient
-from qdrant_client.models import Distance, PointStruct, VectorParams
+from qdrant_client import AsyncQdrantClient, QdrantClient
+from qdrant_client.models import (
+    Distance,
+    FieldCondition,
+    Filter,
+    FilterSelector,
+    MatchValue,
+    OverwritePayloadOperation,
+    PayloadSchemaType,
+    PointStruct,
+    SetPayload,
+    VectorParams,
+)
 
 from app.core.config import settings
+from app.core.executors import execution_layer
+from app.schemas.chat import RetrievedChunk
+from app.schemas.documents import CHUNK_PAYLOAD_VERSION, ChunkPayload
+from app.services.document_registry import DocumentRegistry
 from app.services.embeddings_service import EmbeddingService
 from app.utils.logger import LOGGER
 
+# * namespace for deterministic chunk point ids
+POINT_ID_NAMESPACE = uuid.uuid5(uuid.NAMESPACE_URL, "sitbrain-backend/chunks")
+
+
+def chunk_point_id(doc_id: int, content_hash: str, chunk_index: int) -> str:
+    """
+    * deterministic point id - re-ingesting the same content overwrites its points
+    * scoped to the document, so identical files never share (or steal) points
+    """
+    return str(uuid.uuid5(POINT_ID_NAMESPACE, f"{doc_id}:{content_hash}:{chunk_index}"))
+
+
+# * payload fields used by filters (document lookups, dedup, stale and
+# * document deletes) - indexed so filtered calls are not full scans
+PAYLOAD_INDEXES = {
+    "doc_id": PayloadSchemaType.INTEGER,
+    "filename": PayloadSchemaType.KEYWORD,
+    "content_hash": PayloadSchemaType.KEYWORD,
+}
+
+# * payload fields returned by retrieval (RetrievedChunk) - compact payload
+# * fields plus their legacy names for points that were not migrated yet
+RETRIEVAL_PAYLOAD_FIELDS = [
+    "doc_id",
+    "text",
+    "page",
+    "chunk",
+    "document",
+    "filename",
+    "page_number",
+    "chunk_index",
+]
+
+
+def to_retrieved_chunk(point, filenames: Dict[int, str]) -> RetrievedChunk:
+    """
+    * typed retrieval result from a qdrant scored point
+    * filenames maps doc_id to the registered filename
+    """
+    payload = point.payload or {}
+    if "doc_id" not in payload:
+        # * legacy payload - dict(ChunkMetadata)
+        return RetrievedChunk(id=str(point.id), score=point.score, **payload)
+    doc_id = payload["doc_id"]
+    return RetrievedChunk(
+        id=str(point.id),
+        score=point.score,
+        document=payload["text"],
+        filename=filenames.get(doc_id, f"document-{doc_id}"),
+        page_number=payload.get("page"),
+        chunk_index=payload.get("chunk"),
+    )
+
+
+def legacy_to_payload(payload: Dict[str, Any], doc_id: int) -> Dict[str, Any]:
+    """
+    * compact payload for a legacy dict(ChunkMetadata) payload
+    """
+    created_at = payload.get("created_at")
+    return ChunkPayload(
+        doc_id=doc_id,
+        text=payload["document"],
+        page=payload.get("page_number"),
+        chunk=payload.get("chunk_index") or 0,
+        content_hash=payload.get("content_hash"),
+        chunk_hash=payload.get("chunk_hash")
+        or hashlib.sha256(payload["document"].encode("utf-8")).hexdigest(),
+        ts=(
+            int(datetime.fromisoformat(created_at).timestamp())
+            if created_at
+            else int(time.time())
+        ),
+    ).model_dump()
+
 
 class QdrantVectorStore:
-    def __init__(self, embedding_service: EmbeddingService):
+    def __init__(
+        self,
+        embedding_service: EmbeddingService,
+        document_registry: DocumentRegistry,
+    ):
         # * qdrant client configuration
         self.client = QdrantClient(
             url=settings.qdrant_url,
         )
+        # * non-blocking client for the request path (chat retrieval)
+        self.async_client = AsyncQdrantClient(
+            url=settings.qdrant_url,
+        )
         self.collection_name = settings.qdrant_collection_name
 
         # * embedding model
         self.embedding_service = embedding_service
+        # * doc_id <-> filename for compact payloads
+        self.document_registry = document_registry
         self.vector_size = settings.embedding_size
 
         # * create collection if not exists
         self._create_collection()
 
     def _create_collection(self):
-        """create qdrant collection"""
+        """create qdrant collection and the payload indexes filters rely on"""
         try:
-            self.client.get_collection(self.collection_name)
+            collection = self.client.get_collection(self.collection_name)
+            indexed = set(collection.payload_schema or {})
         except Exception:
             self.client.create_collection(
                 collection_name=self.collection_name,
@@ -35,6 +139,17 @@ class QdrantVectorStore:
                     size=self.vector_size, distance=Distance.COSINE
                 ),
             )
+            indexed = set()
+
+        # * existing collections get missing indexes on startup
+        for field_name, field_schema in PAYLOAD_INDEXES.items():
+            if field_name not in indexed:
+                LOGGER.info(f"[Collection] Creating payload index: {field_name}")
+                self.client.create_payload_index(
+                    collection_name=self.collection_name,
+                    field_name=field_name,
+                    field_schema=field_schema,
+                )
 
     def upsert_point(
         self, embedding: List[float], payload: Dict[str, Any] = None
@@ -58,14 +173,20 @@ class QdrantVectorStore:
             raise
 
     def upsert_points(
-        self, embeddings: List[List[float]], payloads: List[Dict[str, Any]] = None
-    ):
-        """Add multiple documents to vector store"""
+        self,
+        embeddings: List[List[float]],
+        payloads: List[Dict[str, Any]] = None,
+        point_ids: List[str] = None,
+        wait: bool = True,
+    ) -> Optional[int]:
+        """Add multiple documents to vector store (random ids unless point_ids given)
+        * wait=False returns once qdrant acknowledged the operation - returns its id
+        """
         points = []
 
         try:
             for i, embedding in enumerate(embeddings):
-                point_id = str(uuid.uuid4())
+                point_id = point_ids[i] if point_ids else str(uuid.uuid4())
                 payload = payloads[i] if payloads else None
                 point = PointStruct(
                     id=point_id,
@@ -80,12 +201,111 @@ class QdrantVectorStore:
             LOGGER.info(
                 f"[Upsert] Inserting {len(points)} points into collection: {self.collection_name}"
             )
-            self.client.upsert(collection_name=self.collection_name, points=points)
+            result = self.client.upsert(
+                collection_name=self.collection_name, points=points, wait=wait
+            )
+            return result.operation_id
 
         except Exception as e:
             LOGGER.exception(f"[Error] Failed to upsert multiple points: {str(e)}")
             raise
 
+    def count_document_chunks(
+        self, content_hash: str, doc_id: Optional[int] = None
+    ) -> int:
+        """count points already stored for a content hash (of one document)"""
+        result = self.client.count(
+            collection_name=self.collection_name,
+            count_filter=self._content_filter(content_hash, doc_id),
+            exact=True,
+        )
+        return result.count
+
+    @staticmethod
+    def _content_filter(content_hash: str, doc_id: Optional[int] = None) -> Filter:
+        """points of a content hash - in any document unless doc_id is given"""
+        conditions = [
+            FieldCondition(key="content_hash", match=MatchValue(value=content_hash))
+        ]
+        if doc_id is not None:
+            conditions.append(
+                FieldCondition(key="doc_id", match=MatchValue(value=doc_id))
+            )
+        return Filter(must=conditions)
+
+    def count_doc_points(self, doc_id: int) -> int:
+        """count compact points stored for a registry doc_id"""
+        result = self.client.count(
+            collection_name=self.collection_name,
+            count_filter=Filter(
+                must=[FieldCondition(key="doc_id", match=MatchValue(value=doc_id))]
+            ),
+            exact=True,
+        )
+        return result.count
+
+    def _document_filter(self, filename: str, doc_id: Optional[int] = None) -> Filter:
+        """points of a document - by registry doc_id, or filename on legacy points"""
+        conditions = [FieldCondition(key="filename", match=MatchValue(value=filename))]
+        if doc_id is not None:
+            conditions.append(
+                FieldCondition(key="doc_id", match=MatchValue(value=doc_id))
+            )
+        return Filter(should=conditions)
+
+    def get_chunk_vectors(
+        self, filename: str, doc_id: Optional[int] = None
+    ) -> Dict[str, List[float]]:
+        """get stored vectors of a document keyed by chunk_hash"""
+        vectors = {}
+        offset = None
+        while True:
+            points, offset = self.client.scroll(
+                collection_name=self.collection_name,
+                scroll_filter=self._document_filter(filename, doc_id),
+                with_payload=["chunk_hash"],
+                with_vectors=True,
+                limit=256,
+                offset=offset,
+            )
+            for point in points:
+                chunk_hash = (point.payload or {}).get("chunk_hash")
+                if chunk_hash:
+                    vectors[chunk_hash] = point.vector
+            if offset is None:
+                return vectors
+
+    def delete_stale_points(
+        self, filename: str, content_hash: str, doc_id: Optional[int] = None
+    ) -> int:
+        """delete points of a document that belong to an older content_hash"""
+        stale_filter = Filter(
+            must=[self._document_filter(filename, doc_id)],
+            must_not=[
+                FieldCondition(key="content_hash", match=MatchValue(value=content_hash))
+            ],
+        )
+        stale_count = self.client.count(
+            collection_name=self.collection_name, count_filter=stale_filter, exact=True
+        ).count
+        if stale_count:
+            self.client.delete(
+                collection_name=self.collection_name,
+                points_selector=FilterSelector(filter=stale_filter),
+            )
+        return stale_count
+
+    def delete_content_points(self, content_hash: str, doc_id: int):
+        """delete the points a document holds for a content hash
+        * other documents with the same bytes keep theirs
+        """
+        self.client.delete(
+            collection_name=self.collection_name,
+            points_selector=FilterSelector(
+                filter=self._content_filter(content_hash, doc_id)
+            ),
+        )
+
     def update_document(
         self, doc_id: int, content: str, metadata: Dict[str, Any] = None
     ) -> Optional[str]:
@@ -95,27 +315,26 @@ class QdrantVectorStore:
         # * add new point
         return self.add_document(doc_id, content, metadata)
 
-    def delete_document(self, doc_id: int) -> bool:
-        """delete document from vector store"""
+    def delete_document(self, doc_id: int, filename: Optional[str] = None) -> bool:
+        """delete every point of a document in one filtered server-side call
+        * legacy points of the registered filename are removed as well
+        """
+        document_filter = (
+            self._document_filter(filename, doc_id)
+            if filename
+            else Filter(
+                must=[FieldCondition(key="doc_id", match=MatchValue(value=doc_id))]
+            )
+        )
         try:
-            # * search for points with this doc_id
-            search_result = self.client.scroll(
+            self.client.delete(
                 collection_name=self.collection_name,
-                scroll_filter={"must": [{"key": "doc_id", "match": {"value": doc_id}}]},
-                limit=1000,
+                points_selector=FilterSelector(filter=document_filter),
+                wait=True,
             )
-
-            # * delete all points
-            if search_result[0]:
-                point_ids = [point.id for point in search_result[0]]
-                self.client.delete(
-                    collection_name=self.collection_name,
-                    points_selector={"points": point_ids},
-                )
-
             return True
         except Exception as e:
-            print(f"Error deleting document: {e}")
+            LOGGER.exception(f"[Error] Failed to delete document {doc_id}: {str(e)}")
             return False
 
     def delete_collection(self, collection_name: str = "demo_collection") -> None:
@@ -124,14 +343,136 @@ class QdrantVectorStore:
             collection_name=collection_name,
         )
 
-    def retrieve_contexts(self, query: str, top_k: int = 5) -> List[Dict]:
+    def retrieve_contexts(self, query: str, top_k: int = 5) -> List[RetrievedChunk]:
         """retrieve contexts from vector store -- (retrieved points from qdrant)"""
-        hits = self.client.query_points(
-            collection_name=self.collection_name,
-            query=self.embedding_service.generate_embedding(
+        return self.retrieve_by_vector(
+            self.embedding_service.generate_embedding(
                 text=query, task_type="retrieval_query"
             ),
+            top_k=top_k,
+        )
+
+    def retrieve_by_vector(
+        self, query_vector: List[float], top_k: int = 5
+    ) -> List[RetrievedChunk]:
+        """retrieve contexts for an already embedded query"""
+        hits = self.client.query_points(
+            collection_name=self.collection_name,
+            query=query_vector,
             limit=top_k,
+            with_payload=RETRIEVAL_PAYLOAD_FIELDS,
+            with_vectors=False,
+        )
+        # * sync path - filenames from the registry's memory cache only
+        filenames = self.document_registry.cached_filenames(self._doc_ids(hits.points))
+        return [to_retrieved_chunk(point, filenames) for point in hits.points]
+
+    async def aretrieve_contexts(
+        self, query: str, top_k: int = 5
+    ) -> List[RetrievedChunk]:
+        """retrieve contexts with the async embedding and qdrant clients"""
+        query_vector = await self.embedding_service.agenerate_embedding(
+            text=query, task_type="retrieval_query"
         )
-        retrieved_results = [dict(item) for item in hits.points]
-        return retrieved_results
+        return await self.aretrieve_by_vector(query_vector, top_k=top_k)
+
+    async def aretrieve_by_vector(
+        self, query_vector: List[float], top_k: int = 5
+    ) -> List[RetrievedChunk]:
+        """retrieve contexts for an already embedded query (async client)"""
+        hits = await self.async_client.query_points(
+            collection_name=self.collection_name,
+            query=query_vector,
+            limit=top_k,
+            with_payload=RETRIEVAL_PAYLOAD_FIELDS,
+            with_vectors=False,
+        )
+        filenames = await self.document_registry.filenames(self._doc_ids(hits.points))
+        return [to_retrieved_chunk(point, filenames) for point in hits.points]
+
+    @staticmethod
+    def _doc_ids(points) -> List[int]:
+        """doc ids referenced by compact payloads"""
+        return [
+            point.payload["doc_id"]
+            for point in points
+            if point.payload and "doc_id" in point.payload
+        ]
+
+    async def migrate_payloads(self, batch_size: int = 256) -> int:
+        """rewrite legacy point payloads in place as compact payloads
+        * documents are registered by filename; vectors and point ids are kept
+        * returns the number of migrated points
+        """
+        legacy_filter = Filter(
+            must_not=[
+                FieldCondition(key="v", match=MatchValue(value=CHUNK_PAYLOAD_VERSION))
+            ]
+        )
+        doc_ids: Dict[str, int] = {}
+        # * pre-series points carry no content_hash - their documents are
+        # * still recorded, with the chunk count of the migrated points
+        content_hashes: Dict[int, Optional[str]] = {}
+        migrated = 0
+        offset = None
+        while True:
+            points, offset = await execution_layer.run_in_thread(
+                self.client.scroll,
+                collection_name=self.collection_name,
+                scroll_filter=legacy_filter,
+                with_payload=True,
+                with_vectors=False,
+                limit=batch_size,
+                offset=offset,
+            )
+            operations = []
+            for point in points:
+                payload = point.payload or {}
+                filename = payload.get("filename")
+                if filename is None or "document" not in payload:
+                    LOGGER.warning(f"[Migrate] Skipping point {point.id}: no document")
+                    continue
+                if filename not in doc_ids:
+                    doc_ids[filename] = await self.document_registry.register(
+                        filename, mimetypes.guess_type(filename)[0]
+                    )
+                if (
+                    payload.get("content_hash")
+                    or doc_ids[filename] not in content_hashes
+                ):
+                    content_hashes[doc_ids[filename]] = payload.get("content_hash")
+                operations.append(
+                    OverwritePayloadOperation(
+                        overwrite_payload=SetPayload(
+                            payload=legacy_to_payload(payload, doc_ids[filename]),
+                            points=[point.id],
+                        )
+                    )
+                )
+
+            if operations:
+                await execution_layer.run_in_thread(
+                    self.client.batch_update_points,
+                    collection_name=self.collection_name,
+                    update_operations=operations,
+                    wait=True,
+                )
+                migrated += len(operations)
+                LOGGER.info(f"[Migrate] Rewrote {migrated} point payloads")
+            if offset is None:
+                break
+
+        # * registry entries describe the revision the migrated points belong to
+        for doc_id, content_hash in content_hashes.items():
+            chunk_count = await execution_layer.run_in_thread(
+                self.count_doc_points, doc_id
+            )
+            await self.document_registry.mark_ingested(
+                doc_id, content_hash, chunk_count
+            )
+        return migrated
+
+    async def aclose(self):
+        """close qdrant connections"""
+        await self.async_client.close()
+        self.client.close()
@@ -0,0 +1,130 @@
+import asyncio
+import random
+import threading
+import time
+from typing import Optional
+
+from google.genai import errors
+
+from app.schemas.metrics import EmbeddingMetrics
+
+
+class TokenBucket:
+    """
+    * token bucket refilled continuously at rate_per_minute
+    * reservations may overdraw the bucket - the caller then waits until the
+      debt is refilled, which keeps waiting callers in arrival order
+    """
+
+    def __init__(self, rate_per_minute: float):
+        self.capacity = rate_per_minute
+        self.rate = rate_per_minute / 60.0  # * tokens per second
+        self.tokens = rate_per_minute
+        self.updated_at = time.monotonic()
+
+    def reserve(self, amount: float) -> float:
+        """
+        * take amount tokens and return seconds until they are available
+        """
+        now = time.monotonic()
+        self.tokens = min(
+            self.capacity, self.tokens + (now - self.updated_at) * self.rate
+        )
+        self.updated_at = now
+        # * a single request larger than the bucket waits for a full bucket
+        self.tokens -= min(amount, self.capacity)
+        return max(0.0, -self.tokens / self.rate)
+
+
+class RateLimiter:
+    """
+    * shared requests/min and tokens/min limiter for the embedding api
+    * usable from both the sync sdk path (threads) and the async path
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: Optional[float],
+        tokens_per_minute: Optional[float],
+    ):
+        # * a limit of 0/None disables that bucket
+        self._request_bucket = (
+            TokenBucket(requests_per_minute) if requests_per_minute else None
+        )
+        self._token_bucket = (
+            TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        )
+        self._lock = threading.Lock()
+
+    def reserve(self, tokens: int) -> float:
+        """
+        * reserve one request and tokens - returns seconds to wait
+        """
+        with self._lock:
+            delays = [0.0]
+            if self._request_bucket is not None:
+                delays.append(self._request_bucket.reserve(1))
+            if self._token_bucket is not None:
+                delays.append(self._token_bucket.reserve(tokens))
+            return max(delays)
+
+    def acquire(self, tokens: int) -> float:
+        """
+        * block until the request is allowed - returns seconds throttled
+        """
+        delay = self.reserve(tokens)
+        if delay:
+            time.sleep(delay)
+        return delay
+
+    async def aacquire(self, tokens: int) -> float:
+        """
+        * wait until the request is allowed - returns seconds throttled
+        """
+        delay = self.reserve(tokens)
+        if delay:
+            await asyncio.sleep(delay)
+        return delay
+
+
+class EmbeddingMetricsRecorder:
+    """
+    * thread-safe counters for embedding throughput and throttling
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics = EmbeddingMetrics()
+
+    def record(self, **increments: float):
+        with self._lock:
+            for name, value in increments.items():
+                setattr(self._metrics, name, getattr(self._metrics, name) + value)
+
+    def snapshot(self) -> EmbeddingMetrics:
+        with self._lock:
+            return self._metrics.model_copy()
+
+
+def estimate_tokens(contents) -> int:
+    """
+    * rough token count for quota accounting (~4 characters per token)
+    """
+    texts = [contents] if isinstance(contents, str) else contents
+    return sum(max(1, len(text) // 4) for text in texts)
+
+
+def is_retryable(error: Exception) -> bool:
+    """
+    * quota (429) and server (5xx) errors are worth retrying
+    """
+    return isinstance(error, errors.APIError) and (
+        error.code == 429 or error.code >= 500
+    )
+
+
+def backoff_delay(attempt: int, base_delay: float, max_delay: float) -> float:
+    """
+    * exponential backoff with full jitter
+    """
+    return random.uniform(0, min(max_delay, base_delay * 2**attempt))
@@ -0,0 +1,67 @@
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Hashable
+
+from app.schemas.metrics import SingleFlightMetrics
+
+
+class SingleFlight:
+    """
+    * coalesces concurrent calls with the same key - the first caller runs the
+      coroutine, the others await and share its result (or error)
+    * nothing is cached: once the call finishes, the next caller runs again
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, asyncio.Future] = {}
+        self._metrics = SingleFlightMetrics()
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        * run func once for all concurrent callers with this key
+        """
+        self._metrics.requests += 1
+        call = self._calls.get(key)
+        if call is not None:
+            self._metrics.coalesced += 1
+            # * shield - a waiter that disconnects must not cancel the leader
+            return await asyncio.shield(call)
+
+        # * runs as its own task so the leader disconnecting does not cancel it
+        call = self._calls[key] = asyncio.ensure_future(func())
+        call.add_done_callback(lambda _: self._calls.pop(key, None))
+        return await asyncio.shield(call)
+
+    def snapshot(self) -> SingleFlightMetrics:
+        return self._metrics.model_copy(update={"in_flight": len(self._calls)})
+
+
+class KeyedLock:
+    """
+    * serializes callers with the same key - unlike SingleFlight every caller
+      runs, one after the other
+    * a key's lock is dropped once nobody holds or awaits it
+    """
+
+    def __init__(self):
+        self._locks: Dict[Hashable, asyncio.Lock] = {}
+        self._waiters: Dict[Hashable, int] = {}
+
+    @asynccontextmanager
+    async def hold(self, key: Hashable) -> AsyncIterator[None]:
+        """
+        * hold the lock of key for the body of the async with block
+        """
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        self._waiters[key] = self._waiters.get(key, 0) + 1
+        try:
+            async with lock:
+                yield
+        finally:
+            self._waiters[key] -= 1
+            if not self._waiters[key]:
+                del self._waiters[key]
+                del self._locks[key]
+
+    def __len__(self) -> int:
+        return len(self._locks)
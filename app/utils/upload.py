@@ -0,0 +1,176 @@
+import hashlib
+import json
+import os
+
+import aiofiles
+from fastapi import HTTPException, UploadFile, status
+from pydantic import BaseModel
+
+
+class FileTooLargeError(Exception):
+    """raised when an upload exceeds the configured maximum size"""
+
+
+FILE_TOO_LARGE_DETAIL = "file size exceeds maximum allowed size"
+INVALID_CONTENT_LENGTH_DETAIL = "invalid content-length header"
+
+
+class _BodyTooLarge(HTTPException):
+    """
+    * raised inside receive once a request body crosses its limit - fastapi
+      re-raises http exceptions from body parsing, so this becomes a 413
+    """
+
+    def __init__(self):
+        super().__init__(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=FILE_TOO_LARGE_DETAIL,
+        )
+
+
+class UploadSizeLimitMiddleware:
+    """
+    * asgi middleware that rejects oversized multipart uploads with 413 before
+      the form is parsed - starlette spools the whole multipart body to disk
+      before an endpoint (and spool_upload) runs
+    * a declared content-length is checked up front (400 unless it is a
+      non-negative integer); bodies without one are counted while they are
+      received and cut off once the limit is crossed
+    * limit per request: max_file_size per allowed file plus multipart overhead
+    """
+
+    def __init__(
+        self,
+        app,
+        max_file_size: int,
+        max_files: int = 1,
+        bulk_path_suffix: str = "/upload-multiple",
+        overhead_per_file: int = 64 * 1024,
+    ):
+        self.app = app
+        self.max_file_size = max_file_size
+        self.max_files = max_files
+        self.bulk_path_suffix = bulk_path_suffix
+        self.overhead_per_file = overhead_per_file
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self._is_multipart(scope):
+            await self.app(scope, receive, send)
+            return
+
+        files = self.max_files if scope["path"].endswith(self.bulk_path_suffix) else 1
+        max_body = files * (self.max_file_size + self.overhead_per_file)
+        content_length = dict(scope["headers"]).get(b"content-length")
+        if content_length is not None:
+            if not content_length.isdigit():
+                await self._reject(
+                    send, status.HTTP_400_BAD_REQUEST, INVALID_CONTENT_LENGTH_DETAIL
+                )
+                return
+            if int(content_length) > max_body:
+                await self._reject(send)
+                return
+
+        received = 0
+        response_started = False
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > max_body:
+                    raise _BodyTooLarge()
+            return message
+
+        async def tracking_send(message):
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, tracking_send)
+        except _BodyTooLarge:
+            if not response_started:
+                await self._reject(send)
+
+    def _is_multipart(self, scope) -> bool:
+        content_type = dict(scope["headers"]).get(b"content-type", b"")
+        return content_type.startswith(b"multipart/form-data")
+
+    async def _reject(
+        self,
+        send,
+        status_code: int = status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail: str = FILE_TOO_LARGE_DETAIL,
+    ):
+        body = json.dumps({"detail": detail})
+        await send(
+            {
+                "type": "http.response.start",
+                "status": status_code,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                    (b"connection", b"close"),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": body.encode()})
+
+
+class SpooledUpload(BaseModel):
+    """
+    * upload copied to disk with its size and sha256 content hash
+    """
+
+    path: str
+    size: int
+    content_hash: str
+
+
+async def spool_upload(
+    file: UploadFile, dest_path: str, max_size: int, chunk_size: int = 1024 * 1024
+) -> SpooledUpload:
+    """
+    * stream an upload to disk in fixed-size chunks
+    * the size limit is enforced while streaming and the content is hashed
+      on the fly, so the file is never held in memory as a whole
+    """
+    sha256 = hashlib.sha256()
+    size = 0
+    try:
+        # * reject early when the multipart parser already knows the size
+        if file.size is not None and file.size > max_size:
+            raise FileTooLargeError(
+                f"file size exceeds maximum allowed size: {max_size}"
+            )
+
+        async with aiofiles.open(dest_path, "wb") as f:
+            while chunk := await file.read(chunk_size):
+                size += len(chunk)
+                if size > max_size:
+                    raise FileTooLargeError(
+                        f"file size exceeds maximum allowed size: {max_size}"
+                    )
+                sha256.update(chunk)
+                await f.write(chunk)
+    except BaseException:
+        # * never leave a partial file behind
+        if os.path.exists(dest_path):
+            os.unlink(dest_path)
+        raise
+
+    return SpooledUpload(path=dest_path, size=size, content_hash=sha256.hexdigest())
+
+
+def hash_file(file_path: str, chunk_size: int = 1024 * 1024) -> str:
+    """
+    * sha256 of a file already on disk (read in fixed-size chunks)
+    """
+    sha256 = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        while chunk := f.read(chunk_size):
+            sha256.update(chunk)
+    return sha256.hexdigest()
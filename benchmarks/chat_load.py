@@ -0,0 +1,182 @@
+# * load test: legacy sync /chat (threadpool) vs async /chat
+# * embedding, qdrant and llm calls are simulated with fixed latencies so the
+# * result shows request capacity of the server, not of the providers
+# * usage: python -m benchmarks.chat_load [--requests 200] [--llm-latency 1.0]
+
+import argparse
+import asyncio
+import random
+import statistics
+import time
+from types import SimpleNamespace
+
+import httpx
+from fastapi import FastAPI
+
+from app.core.config import settings
+from app.core.prompts import rag_prompt_template
+from app.core.service_manager import service_manager
+from app.main import app
+from app.schemas.chat import ChatRequest, ChatResponse, RetrievedChunk
+from app.services.answer_cache import SemanticAnswerCache
+from app.services.embeddings_service import EmbeddingService
+from app.services.single_flight import SingleFlight
+
+
+def random_embedding():
+    return SimpleNamespace(values=[random.random() for _ in range(8)])
+
+
+class SimulatedEmbeddingApi:
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    def embed_content(self, model, contents, config):
+        time.sleep(self.latency)
+        texts = [contents] if isinstance(contents, str) else contents
+        return SimpleNamespace(embeddings=[random_embedding() for _ in texts])
+
+
+class AsyncSimulatedEmbeddingApi(SimulatedEmbeddingApi):
+    async def embed_content(self, model, contents, config):
+        await asyncio.sleep(self.latency)
+        texts = [contents] if isinstance(contents, str) else contents
+        return SimpleNamespace(embeddings=[random_embedding() for _ in texts])
+
+
+class SimulatedVectorStore:
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.points = [
+            RetrievedChunk(
+                id=f"chunk-{i}",
+                score=0.9,
+                document="text",
+                filename="a.pdf",
+                page_number=i,
+                chunk_index=i * 2,
+            )
+            for i in range(5)
+        ]
+
+    def retrieve_by_vector(self, query_vector, top_k=5):
+        time.sleep(self.latency)
+        return self.points[:top_k]
+
+    async def aretrieve_by_vector(self, query_vector, top_k=5):
+        await asyncio.sleep(self.latency)
+        return self.points[:top_k]
+
+
+class SimulatedChatModel:
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    def invoke(self, messages):
+        time.sleep(self.latency)
+        return SimpleNamespace(content="answer")
+
+    async def ainvoke(self, messages):
+        await asyncio.sleep(self.latency)
+        return SimpleNamespace(content="answer")
+
+
+def legacy_app(embedding_service, vector_store, chat_model) -> FastAPI:
+    """
+    * the previous sync endpoint - every request holds a threadpool thread
+    """
+    legacy = FastAPI()
+
+    @legacy.post("/api/v1/chat/", response_model=ChatResponse)
+    def rag_endpoint(request: ChatRequest):
+        start_time = time.time()
+        query_vector = embedding_service.generate_embedding(
+            request.question, task_type="retrieval_query"
+        )
+        retrieved = vector_store.retrieve_by_vector(
+            query_vector, settings.top_k_results
+        )
+        messages = rag_prompt_template.format(
+            context=str(retrieved), question=request.question
+        )
+        answer = chat_model.invoke(messages).content
+        return ChatResponse(answer=answer, processing_time=time.time() - start_time)
+
+    return legacy
+
+
+async def load(target_app: FastAPI, num_requests: int):
+    transport = httpx.ASGITransport(app=target_app)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://test", timeout=None
+    ) as client:
+
+        async def ask(i: int) -> float:
+            start = time.perf_counter()
+            response = await client.post(
+                "/api/v1/chat/", json={"question": f"question {i}"}
+            )
+            response.raise_for_status()
+            return time.perf_counter() - start
+
+        start = time.perf_counter()
+        latencies = await asyncio.gather(*(ask(i) for i in range(num_requests)))
+        return time.perf_counter() - start, sorted(latencies)
+
+
+def report(label: str, num_requests: int, wall: float, latencies):
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+    print(
+        f"{label:6} {num_requests / wall:7.1f} req/s  wall {wall:6.2f}s  "
+        f"p50 {statistics.median(latencies):5.2f}s  p95 {p95:5.2f}s"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="load test the /chat endpoint")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--embedding-latency", type=float, default=0.05)
+    parser.add_argument("--qdrant-latency", type=float, default=0.02)
+    parser.add_argument("--llm-latency", type=float, default=1.0)
+    args = parser.parse_args()
+
+    # * providers are simulated - no quota, stored embeddings or answer cache
+    settings.embedding_requests_per_minute = 0
+    settings.embedding_tokens_per_minute = 0
+    settings.embedding_store_db = ""
+
+    embedding_api = SimulatedEmbeddingApi(args.embedding_latency)
+    async_embedding_api = AsyncSimulatedEmbeddingApi(args.embedding_latency)
+    embedding_service = EmbeddingService(
+        client=SimpleNamespace(
+            models=embedding_api, aio=SimpleNamespace(models=async_embedding_api)
+        )
+    )
+    vector_store = SimulatedVectorStore(args.qdrant_latency)
+    chat_model = SimulatedChatModel(args.llm_latency)
+
+    print(
+        f"{args.requests} concurrent requests | embed {args.embedding_latency}s "
+        f"qdrant {args.qdrant_latency}s llm {args.llm_latency}s"
+    )
+    wall, latencies = asyncio.run(
+        load(legacy_app(embedding_service, vector_store, chat_model), args.requests)
+    )
+    report("sync", args.requests, wall, latencies)
+
+    service_manager.embedding_service = embedding_service
+    service_manager.vector_store = vector_store
+    service_manager.llm_service = SimpleNamespace(get_chat_model=lambda: chat_model)
+    service_manager.chat_single_flight = SingleFlight()
+    service_manager.answer_cache = SemanticAnswerCache(
+        max_entries=0, ttl_seconds=0, threshold=1.0
+    )
+    service_manager._initialized = True
+    embedding_service.cache.clear()
+
+    wall, latencies = asyncio.run(load(app, args.requests))
+    report("async", args.requests, wall, latencies)
+
+
+if __name__ == "__main__":
+    main()
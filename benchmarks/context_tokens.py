@@ -0,0 +1,106 @@
+# * benchmark: prompt tokens per request - json.dumps context vs compact context
+# * vs compact context of stitched / deduplicated chunks
+# * replays the retrieved chunks recorded in benchmarks/fixtures/retrieved_chunks.json
+# * usage: python -m benchmarks.context_tokens [--max-tokens 3000]
+
+import argparse
+import json
+import statistics
+from pathlib import Path
+from typing import List
+
+from app.core.config import settings
+from app.core.prompts import rag_prompt_template
+from app.schemas.chat import RetrievedChunk
+from app.services.context_builder import ContextBuilder, _get_encoding, count_tokens
+from app.services.context_merger import ContextMerger
+
+FIXTURE = Path(__file__).parent / "fixtures" / "retrieved_chunks.json"
+
+
+def load_fixture() -> List[dict]:
+    """
+    * recorded retrievals - qdrant points as {"id", "score", "payload"}
+    """
+    fixture = json.loads(FIXTURE.read_text(encoding="utf-8"))
+    for request in fixture:
+        request["retrieved"] = [
+            RetrievedChunk(id=point["id"], score=point["score"], **point["payload"])
+            for point in request["retrieved"]
+        ]
+    return fixture
+
+
+def json_context(retrieved_results: List[RetrievedChunk]) -> str:
+    """
+    * the previous context format (json.dumps, indent=4)
+    """
+    return json.dumps(
+        [
+            {
+                "vector_id": retrieved_chunk.id,
+                "relevance_score": retrieved_chunk.score,
+                "content": retrieved_chunk.document,
+                "filename": retrieved_chunk.filename,
+                "page_number": retrieved_chunk.page_number,
+            }
+            for retrieved_chunk in retrieved_results
+        ],
+        ensure_ascii=False,
+        indent=4,
+    )
+
+
+def prompt_tokens(context: str, question: str) -> int:
+    return count_tokens(rag_prompt_template.format(context=context, question=question))
+
+
+def report(label: str, tokens: List[int]):
+    print(
+        f"{label:8} mean {statistics.mean(tokens):7.0f}  "
+        f"min {min(tokens):6}  max {max(tokens):6} tokens/request"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="prompt tokens per rag request")
+    parser.add_argument("--max-tokens", type=int, default=settings.context_max_tokens)
+    parser.add_argument(
+        "--min-chunk-tokens", type=int, default=settings.context_min_chunk_tokens
+    )
+    args = parser.parse_args()
+
+    fixture = load_fixture()
+    builder = ContextBuilder(args.max_tokens, args.min_chunk_tokens)
+    merger = ContextMerger(settings.chunk_overlap, settings.context_dedup_threshold)
+    tokenizer = "cl100k_base" if _get_encoding() is not None else "estimate"
+
+    before, compact, merged, dropped, excerpts = [], [], [], 0, 0
+    for request in fixture:
+        question, retrieved = request["question"], request["retrieved"]
+        before.append(prompt_tokens(json_context(retrieved), question))
+        context = builder.build(retrieved)
+        compact.append(prompt_tokens(context.text, question))
+        merged_chunks = merger.merge(retrieved)
+        excerpts += len(merged_chunks)
+        context = builder.build(merged_chunks)
+        merged.append(prompt_tokens(context.text, question))
+        dropped += context.chunks_dropped
+
+    print(
+        f"{len(fixture)} requests, top_k {len(fixture[0]['retrieved'])} | "
+        f"budget {args.max_tokens} | tokenizer {tokenizer}"
+    )
+    report("json", before)
+    report("compact", compact)
+    report("merged", merged)
+    chunks = sum(len(request["retrieved"]) for request in fixture)
+    print(
+        f"compact saved {1 - sum(compact) / sum(before):.1%}, merged saved "
+        f"{1 - sum(merged) / sum(before):.1%} prompt tokens | {chunks} chunks -> "
+        f"{excerpts} excerpts, {dropped} dropped by budget"
+    )
+
+
+if __name__ == "__main__":
+    main()
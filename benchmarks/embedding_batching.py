@@ -0,0 +1,89 @@
+# * benchmark: fixed batch size 8 vs adaptive embedding batch sizing
+# * uses a simulated embedding api (per-request overhead + per-text cost,
+# * provider limit of 100 texts per request) - no api key or quota needed
+# * usage: python -m benchmarks.embedding_batching [--chunks 2000]
+
+import argparse
+import asyncio
+import time
+from types import SimpleNamespace
+
+from google.genai import errors
+
+from app.core.config import settings
+from app.services.embeddings_service import EmbeddingService
+
+
+class SimulatedEmbeddingApi:
+    """
+    * stand-in for client.aio.models with a realistic latency shape
+    """
+
+    def __init__(self, request_latency: float, text_latency: float, max_texts: int):
+        self.request_latency = request_latency
+        self.text_latency = text_latency
+        self.max_texts = max_texts
+        self.round_trips = 0
+
+    async def embed_content(self, model, contents, config):
+        self.round_trips += 1
+        await asyncio.sleep(self.request_latency)
+        if len(contents) > self.max_texts:
+            raise errors.ClientError(
+                400,
+                {
+                    "error": {
+                        "message": f"At most {self.max_texts} requests can be in "
+                        "one batch."
+                    }
+                },
+            )
+        await asyncio.sleep(self.text_latency * len(contents))
+        return SimpleNamespace(
+            embeddings=[SimpleNamespace(values=[0.0]) for _ in contents]
+        )
+
+
+def run(texts, batch_size, args):
+    api = SimulatedEmbeddingApi(args.request_latency, args.text_latency, 100)
+    service = EmbeddingService(client=SimpleNamespace(aio=SimpleNamespace(models=api)))
+
+    async def ingest():
+        # * the pipeline hands the service one pipeline batch at a time
+        for i in range(0, len(texts), settings.pipeline_batch_size):
+            await service.agenerate_embeddings_batch(
+                texts[i : i + settings.pipeline_batch_size], batch_size=batch_size
+            )
+
+    start = time.perf_counter()
+    asyncio.run(ingest())
+    return api.round_trips, time.perf_counter() - start, service.batch_sizer.size
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="compare fixed and adaptive embedding batch sizes"
+    )
+    parser.add_argument("--chunks", type=int, default=2000)
+    parser.add_argument("--chunk-chars", type=int, default=1000)
+    parser.add_argument("--request-latency", type=float, default=0.25)
+    parser.add_argument("--text-latency", type=float, default=0.002)
+    args = parser.parse_args()
+
+    # * measure batching only - no quota throttling or stored embeddings
+    settings.embedding_requests_per_minute = 0
+    settings.embedding_tokens_per_minute = 0
+    settings.embedding_store_db = ""
+
+    texts = ["x" * args.chunk_chars] * args.chunks
+    print(f"chunks: {args.chunks} ({args.chunk_chars} chars each)")
+    for label, batch_size in (("fixed (8)", 8), ("adaptive", None)):
+        round_trips, wall, final_size = run(texts, batch_size, args)
+        print(
+            f"{label:10} round trips: {round_trips:5d}  wall: {wall:6.2f}s  "
+            f"final batch size: {batch_size or final_size}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+# * benchmark: qdrant query_points response size and client-side decode time
+# * full payload (+ vectors) converted with dict(point) vs selected payload fields
+# * converted to RetrievedChunk
+# * the REST response body is rebuilt from an in-memory qdrant so no server is
+# * needed; decode = what the http client does (json -> models) + conversion
+# * usage: python -m benchmarks.retrieval_payload [--top-k 50] [--points 2000]
+
+import argparse
+import json
+import random
+import time
+from datetime import datetime
+
+from qdrant_client import QdrantClient
+from qdrant_client.http.models import InlineResponse20022
+from qdrant_client.models import Distance, PointStruct, VectorParams
+
+from app.core.config import settings
+from app.services.qdrant_vector_store import (
+    RETRIEVAL_PAYLOAD_FIELDS,
+    chunk_point_id,
+    to_retrieved_chunk,
+)
+
+COLLECTION = "retrieval_payload_benchmark"
+
+
+def random_vector(dim: int):
+    return [random.uniform(-1, 1) for _ in range(dim)]
+
+
+def build_collection(num_points: int, dim: int) -> QdrantClient:
+    client = QdrantClient(":memory:")
+    client.create_collection(
+        COLLECTION, vectors_config=VectorParams(size=dim, distance=Distance.COSINE)
+    )
+    words = "registration credit course semester student scholarship".split()
+    points = []
+    for i in range(num_points):
+        content_hash = f"{i // 100:064x}"
+        points.append(
+            PointStruct(
+                id=chunk_point_id(content_hash, i % 100),
+                vector=random_vector(dim),
+                # * legacy payload - dict(ChunkMetadata)
+                payload={
+                    "document": " ".join(random.choices(words, k=160)),
+                    "source": f"/app/data/uploads/tmp{i // 100:08x}/handbook.pdf",
+                    "filename": f"handbook_{i // 100}.pdf",
+                    "page_number": i % 100 // 3 + 1,
+                    "chunk_index": i % 100,
+                    "content_hash": content_hash,
+                    "chunk_hash": f"{i:064x}",
+                    "created_at": datetime.now().isoformat(),
+                },
+            )
+        )
+    client.upsert(COLLECTION, points=points)
+    return client
+
+
+def response_body(client: QdrantClient, query, top_k: int, **options) -> bytes:
+    """
+    * json body qdrant's rest api would send for this query
+    """
+    hits = client.query_points(COLLECTION, query=query, limit=top_k, **options)
+    return json.dumps(
+        {"status": "ok", "time": 0.001, "result": hits.model_dump(mode="json")}
+    ).encode()
+
+
+def decode_time(body: bytes, convert, rounds: int) -> float:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        points = InlineResponse20022.model_validate_json(body).result.points
+        convert(points)
+    return (time.perf_counter() - start) / rounds
+
+
+def main():
+    parser = argparse.ArgumentParser(description="retrieval response payload size")
+    parser.add_argument("--top-k", type=int, default=50)
+    parser.add_argument("--points", type=int, default=2000)
+    parser.add_argument("--rounds", type=int, default=200)
+    args = parser.parse_args()
+
+    random.seed(22)
+    dim = settings.embedding_size
+    client = build_collection(args.points, dim)
+    query = random_vector(dim)
+
+    cases = [
+        (
+            "payload+vectors",
+            {"with_payload": True, "with_vectors": True},
+            lambda points: [dict(point) for point in points],
+        ),
+        (
+            "full payload",
+            {"with_payload": True, "with_vectors": False},
+            lambda points: [dict(point) for point in points],
+        ),
+        (
+            "selected fields",
+            {"with_payload": RETRIEVAL_PAYLOAD_FIELDS, "with_vectors": False},
+            lambda points: [to_retrieved_chunk(point, {}) for point in points],
+        ),
+    ]
+
+    print(f"top_k {args.top_k} | {args.points} points | {dim}-d vectors")
+    for label, options, convert in cases:
+        body = response_body(client, query, args.top_k, **options)
+        seconds = decode_time(body, convert, args.rounds)
+        print(
+            f"{label:16} {len(body) / 1024:8.1f} KiB  decode {seconds * 1000:6.2f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,44 +1,69 @@
+import json
+
 import gradio as gr
 import requests
 
 # * api endpoint configuration
 API_BASE_URL = "http://localhost:8080"
 CHAT_ENDPOINT = f"{API_BASE_URL}/api/v1/chat"
+CHAT_STREAM_ENDPOINT = f"{API_BASE_URL}/api/v1/chat/stream"
+
+
+def iter_sse_events(response):
+    """
+    * parse server-sent events into (event, data) pairs
+    """
+    event, data = None, []
+    for line in response.iter_lines(decode_unicode=True):
+        if line.startswith("event:"):
+            event = line[len("event:") :].strip()
+        elif line.startswith("data:"):
+            data.append(line[len("data:") :].strip())
+        elif not line and event:
+            yield event, json.loads("\n".join(data))
+            event, data = None, []
 
 
 def chat_with_api(question):
     """
-    * send question to chat api and return response
+    * send question to streaming chat api and yield the answer as it arrives
     """
     try:
         # * prepare request payload
         payload = {"question": question}
 
-        # * send post request to chat endpoint
-        response = requests.post(
-            CHAT_ENDPOINT, json=payload, headers={"Content-Type": "application/json"}
-        )
-
-        if response.status_code == 200:
-            data = response.json()
-            answer = data.get("answer", "No answer received")
-            sources = None
-            processing_time = data.get("processing_time", 0)
-
-            # * format response with sources and timing
-            result = f"{answer}\n\n"
-            if sources:
-                result += f"**Sources:** {', '.join(sources)}\n"
-            result += f"**Processing time:** {processing_time:.2f}s"
-
-            return result
-        else:
-            return f"Error: {response.status_code} - {response.text}"
+        # * send post request to streaming chat endpoint
+        with requests.post(
+            CHAT_STREAM_ENDPOINT,
+            json=payload,
+            headers={"Content-Type": "application/json"},
+            stream=True,
+        ) as response:
+            if response.status_code != 200:
+                yield f"Error: {response.status_code} - {response.text}"
+                return
+
+            answer = ""
+            for event, data in iter_sse_events(response):
+                if event == "retrieval":
+                    yield "Generating answer..."
+                elif event == "token":
+                    answer += data["text"]
+                    yield answer
+                elif event == "done":
+                    # * format response with sources and timing
+                    result = f"{answer}\n\n"
+                    if data["sources"]:
+                        result += f"**Sources:** {', '.join(data['sources'])}\n"
+                    result += f"**Processing time:** {data['processing_time']:.2f}s"
+                    yield result
+                elif event == "error":
+                    yield f"Error: {data['detail']}"
 
     except requests.exceptions.ConnectionError:
-        return "Error: Cannot connect to API. Make sure the server is running on http://localhost:8080"
+        yield "Error: Cannot connect to API. Make sure the server is running on http://localhost:8080"
     except Exception as e:
-        return f"Error: {str(e)}"
+        yield f"Error: {str(e)}"
 
 
 # * create gradio interface
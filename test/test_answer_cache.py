@@ -0,0 +1,67 @@
+from unittest.mock import patch
+
+import pytest
+
+from app.services.answer_cache import SemanticAnswerCache
+
+
+class TestSemanticAnswerCache:
+    """
+    * test suite for the semantic answer cache
+    """
+
+    @pytest.fixture
+    def clock(self):
+        """
+        * controllable monotonic clock
+        """
+        now = [1000.0]
+        with patch("app.services.answer_cache.time.monotonic", lambda: now[0]):
+            yield now
+
+    @pytest.fixture
+    def cache(self, clock):
+        cache = SemanticAnswerCache(max_entries=2, ttl_seconds=60, threshold=0.95)
+        cache.put([1.0, 0.0, 0.0], ["c1", "c2"], ["a.pdf"], "answer a")
+        return cache
+
+    def test_near_duplicate_question_with_same_context_hits(self, cache):
+        """
+        * test a paraphrase (cosine above threshold) over the same chunks hits
+        """
+        assert cache.get([0.99, 0.05, 0.0], ["c2", "c1"]) == "answer a"
+        assert cache.snapshot().hits == 1
+
+    def test_different_question_or_context_misses(self, cache):
+        """
+        * test dissimilar questions and changed chunk sets miss
+        """
+        assert cache.get([0.0, 1.0, 0.0], ["c1", "c2"]) is None
+        assert cache.get([1.0, 0.0, 0.0], ["c1", "c3"]) is None
+        assert cache.snapshot().misses == 2
+
+    def test_ttl_and_lru(self, cache, clock):
+        """
+        * test entries expire and the least recently used one is evicted
+        """
+        cache.put([0.0, 1.0, 0.0], ["c3"], ["b.pdf"], "answer b")
+        cache.get([1.0, 0.0, 0.0], ["c1", "c2"])
+        cache.put([0.0, 0.0, 1.0], ["c4"], ["c.pdf"], "answer c")
+
+        assert cache.get([0.0, 1.0, 0.0], ["c3"]) is None
+        assert cache.get([1.0, 0.0, 0.0], ["c1", "c2"]) == "answer a"
+
+        clock[0] += 61
+        assert cache.get([0.0, 0.0, 1.0], ["c4"]) is None
+        metrics = cache.snapshot()
+        assert (metrics.evictions, metrics.expirations) == (1, 1)
+
+    def test_invalidate_by_document(self, cache):
+        """
+        * test answers from a re-ingested document are dropped
+        """
+        cache.put([0.0, 1.0, 0.0], ["c3"], ["b.pdf"], "answer b")
+
+        assert cache.invalidate_documents(["a.pdf"]) == 1
+        assert cache.get([1.0, 0.0, 0.0], ["c1", "c2"]) is None
+        assert cache.get([0.0, 1.0, 0.0], ["c3"]) == "answer b"
@@ -0,0 +1,62 @@
+import pytest
+from google.genai import errors
+
+from app.services.batch_sizer import AdaptiveBatchSizer, is_payload_rejection
+
+
+class TestAdaptiveBatchSizer:
+    """
+    * test suite for adaptive embedding batch sizing
+    """
+
+    @pytest.fixture
+    def sizer(self):
+        return AdaptiveBatchSizer(
+            initial_size=8, max_size=100, max_tokens=1000, target_latency=1.0
+        )
+
+    def test_split_respects_item_and_token_limits(self, sizer):
+        """
+        * test batches are capped by both chunk count and estimated tokens
+        """
+        short_texts = ["a" * 40] * 20  # * 10 tokens each
+        assert [len(batch) for batch in sizer.split(short_texts)] == [8, 8, 4]
+
+        long_texts = ["a" * 1600] * 5  # * 400 tokens each
+        assert [len(batch) for batch in sizer.split(long_texts)] == [2, 2, 1]
+
+    def test_grows_while_healthy_up_to_max(self, sizer):
+        """
+        * test full batches with low latency grow the size to the provider cap
+        """
+        for _ in range(20):
+            sizer.record_success(sizer.size, latency=0.2)
+
+        assert sizer.size == 100
+
+    def test_shrinks_on_slow_responses_errors_and_rejections(self, sizer):
+        """
+        * test slow responses, errors and rejections shrink the size
+        """
+        sizer.size = 64
+        sizer.record_success(64, latency=5.0)
+        assert sizer.size == 48
+
+        sizer.record_error()
+        assert sizer.size == 24
+
+        sizer.record_rejection(20)
+        assert sizer.size == 10
+
+    def test_payload_rejection_detection(self):
+        """
+        * test size rejections are told apart from other client errors
+        """
+        too_many = errors.ClientError(
+            400, {"error": {"message": "At most 100 requests can be in one batch."}}
+        )
+        bad_key = errors.ClientError(400, {"error": {"message": "API key not valid"}})
+
+        assert is_payload_rejection(too_many)
+        assert not is_payload_rejection(bad_key)
+        assert not is_payload_rejection(ValueError("batch"))
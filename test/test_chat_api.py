@@ -0,0 +1,131 @@
+import asyncio
+import json
+import time
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, Mock
+
+import httpx
+import pytest
+
+from app.core.service_manager import service_manager
+from app.main import app
+from app.schemas.chat import RetrievedChunk
+from app.services.answer_cache import SemanticAnswerCache
+from app.services.single_flight import SingleFlight
+
+
+async def stream_answer(messages):
+    # * async llm token stream stand-in
+    for token in ["Hello", "", " world"]:
+        await asyncio.sleep(0.05)
+        yield SimpleNamespace(content=token)
+
+
+async def slow_answer(messages):
+    # * async llm call stand-in
+    await asyncio.sleep(0.3)
+    return SimpleNamespace(content="answer")
+
+
+class TestChatAPI:
+    """
+    * test suite for the async chat endpoint
+    """
+
+    @pytest.fixture
+    def services(self):
+        """
+        * register async service stand-ins in the service manager
+        """
+        embedding_service = Mock()
+        embedding_service.agenerate_embedding = AsyncMock(
+            side_effect=lambda text, task_type: [float(len(text)), 1.0]
+        )
+        vector_store = Mock()
+        vector_store.aretrieve_by_vector = AsyncMock(
+            return_value=[
+                RetrievedChunk(
+                    id="chunk-1",
+                    score=0.9,
+                    document="text",
+                    filename="a.pdf",
+                    page_number=1,
+                )
+            ]
+        )
+        chat_model = Mock()
+        chat_model.ainvoke = AsyncMock(side_effect=slow_answer)
+        chat_model.astream = stream_answer
+
+        service_manager.embedding_service = embedding_service
+        service_manager.vector_store = vector_store
+        service_manager.llm_service = Mock(get_chat_model=Mock(return_value=chat_model))
+        service_manager.chat_single_flight = SingleFlight()
+        service_manager.answer_cache = SemanticAnswerCache(
+            max_entries=0, ttl_seconds=0, threshold=1.0
+        )
+        service_manager._initialized = True
+
+        yield chat_model
+
+        service_manager._initialized = False
+        service_manager.embedding_service = None
+        service_manager.vector_store = None
+        service_manager.llm_service = None
+        service_manager.chat_single_flight = None
+        service_manager.answer_cache = None
+
+    @pytest.mark.asyncio
+    async def test_concurrent_requests_do_not_queue_on_threads(self, services):
+        """
+        * test many concurrent questions finish in about one llm latency
+        """
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://test"
+        ) as client:
+            start = time.perf_counter()
+            responses = await asyncio.gather(
+                *(
+                    client.post("/api/v1/chat/", json={"question": f"question {i}"})
+                    for i in range(100)
+                )
+            )
+            elapsed = time.perf_counter() - start
+
+        assert all(response.status_code == 200 for response in responses)
+        assert responses[0].json()["answer"] == "answer"
+        assert services.ainvoke.await_count == 100
+        # * a 40-thread pool would need at least 3 rounds of 0.3s
+        assert elapsed < 0.9
+
+    @pytest.mark.asyncio
+    async def test_stream_sends_retrieval_tokens_and_done(self, services):
+        """
+        * test the sse stream order: retrieval first, then tokens, then done
+        """
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://test"
+        ) as client:
+            response = await client.post(
+                "/api/v1/chat/stream", json={"question": "question"}
+            )
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        events = [
+            (
+                block.split("\n")[0][len("event: ") :],
+                json.loads(block.split("\n")[1][6:]),
+            )
+            for block in response.text.strip().split("\n\n")
+        ]
+        assert [event for event, _ in events] == ["retrieval", "token", "token", "done"]
+        assert events[0][1]["chunks"][0]["filename"] == "a.pdf"
+        assert "".join(data["text"] for event, data in events if event == "token") == (
+            "Hello world"
+        )
+        done = events[-1][1]
+        assert done["sources"] == ["a.pdf"]
+        assert 0 < done["time_to_first_token"] < done["processing_time"]
@@ -0,0 +1,70 @@
+import pytest
+
+from app.schemas.chat import RetrievedChunk
+from app.services.context_builder import ContextBuilder, count_tokens
+
+
+def retrieved_chunk(chunk_id: str, score: float, document: str, page_number=1):
+    return RetrievedChunk(
+        id=chunk_id,
+        score=score,
+        document=document,
+        filename=f"{chunk_id}.pdf",
+        page_number=page_number,
+    )
+
+
+class TestContextBuilder:
+    """
+    * test suite for the token-budgeted context builder
+    """
+
+    @pytest.fixture
+    def retrieved_results(self):
+        return [
+            retrieved_chunk("low", 0.5, "low relevance " * 100, page_number=9),
+            retrieved_chunk("high", 0.9, "high relevance text", page_number=3),
+            retrieved_chunk("mid", 0.7, "mid relevance " * 100, page_number=5),
+        ]
+
+    def test_compact_format_ordered_by_score(self, retrieved_results):
+        """
+        * test chunks are numbered excerpts with filename and page, best first
+        """
+        context = ContextBuilder(max_tokens=10_000).build(retrieved_results)
+
+        assert context.text.startswith("[1] high.pdf p.3\nhigh relevance text\n\n")
+        assert context.text.index("[2] mid.pdf p.5") < context.text.index(
+            "[3] low.pdf p.9"
+        )
+        assert context.chunks_used == 3
+        assert "relevance_score" not in context.text
+
+    def test_budget_truncates_then_drops_low_score_chunks(self, retrieved_results):
+        """
+        * test the chunk crossing the budget is truncated and the rest dropped
+        """
+        budget = count_tokens("[1] high.pdf p.3\nhigh relevance text") + 80
+        context = ContextBuilder(max_tokens=budget, min_chunk_tokens=32).build(
+            retrieved_results
+        )
+
+        assert context.tokens <= budget
+        assert context.chunks_used == 2
+        assert context.chunks_truncated == 1
+        assert context.chunks_dropped == 1
+        assert context.text.endswith(" …")
+        assert "low.pdf" not in context.text
+
+    def test_remaining_budget_below_minimum_drops_chunk(self, retrieved_results):
+        """
+        * test a truncated chunk smaller than min_chunk_tokens is not kept
+        """
+        budget = count_tokens("[1] high.pdf p.3\nhigh relevance text") + 20
+        context = ContextBuilder(max_tokens=budget, min_chunk_tokens=64).build(
+            retrieved_results
+        )
+
+        assert context.chunks_used == 1
+        assert context.chunks_truncated == 0
+        assert context.chunks_dropped == 2
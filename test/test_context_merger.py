@@ -0,0 +1,76 @@
+import pytest
+
+from app.schemas.chat import RetrievedChunk
+from app.services.context_merger import ContextMerger
+
+
+def retrieved_chunk(chunk_id, score, filename, chunk_index, document, page=1):
+    return RetrievedChunk(
+        id=chunk_id,
+        score=score,
+        document=document,
+        filename=filename,
+        page_number=page,
+        chunk_index=chunk_index,
+    )
+
+
+class TestContextMerger:
+    """
+    * test suite for stitching and deduplicating retrieved chunks
+    """
+
+    @pytest.fixture
+    def merger(self):
+        return ContextMerger(max_overlap=40, dedup_threshold=0.9, probe_chars=8)
+
+    def test_adjacent_chunks_are_stitched_without_overlap(self, merger):
+        """
+        * test neighbours of one file become one excerpt with the seam removed
+        """
+        merged = merger.merge(
+            [
+                retrieved_chunk(
+                    "b", 0.7, "a.pdf", 13, "shared overlap text. second part", 2
+                ),
+                retrieved_chunk(
+                    "a", 0.9, "a.pdf", 12, "first part. shared  overlap text.", 1
+                ),
+            ]
+        )
+
+        assert len(merged) == 1
+        assert merged[0].id == "a"
+        assert merged[0].score == 0.9
+        assert merged[0].document == ("first part. shared overlap text. second part")
+        assert merged[0].page_end == 2
+
+    def test_non_adjacent_and_other_file_chunks_stay_separate(self, merger):
+        """
+        * test a gap in chunk_index or a different file is not stitched
+        """
+        merged = merger.merge(
+            [
+                retrieved_chunk("a", 0.9, "a.pdf", 1, "alpha beta gamma delta"),
+                retrieved_chunk("b", 0.8, "a.pdf", 3, "epsilon zeta eta theta"),
+                retrieved_chunk("c", 0.7, "b.pdf", 2, "iota kappa lambda mu"),
+            ]
+        )
+
+        assert [chunk.id for chunk in merged] == ["a", "b", "c"]
+        assert merged[0].document == "alpha beta gamma delta"
+
+    def test_near_duplicates_across_files_are_kept_once(self, merger):
+        """
+        * test a near-identical chunk from another file is dropped (best score wins)
+        """
+        text = "registration must be completed within the announced period " * 5
+        merged = merger.merge(
+            [
+                retrieved_chunk("old", 0.8, "handbook_2566.pdf", 4, text),
+                retrieved_chunk("new", 0.85, "handbook_2567.pdf", 4, text + "2567"),
+                retrieved_chunk("other", 0.6, "coop.pdf", 1, "placement is 16 weeks"),
+            ]
+        )
+
+        assert [chunk.id for chunk in merged] == ["new", "other"]
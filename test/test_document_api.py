@@ -1,11 +1,28 @@
+import asyncio
+import hashlib
 import io
+import os
+from datetime import datetime
 from unittest.mock import AsyncMock, Mock, patch
 
 import pytest
 from fastapi.testclient import TestClient
 
-from app.api.v1.routes.document import router
-from app.schemas.documents import ProcessedDocument
+from app.api.v1.routes.document import (
+    get_document_service,
+    get_ingestion_queue,
+    router,
+)
+from app.core.config import settings
+from app.schemas.documents import (
+    DocumentListResponse,
+    DocumentRecord,
+    DocumentStatus,
+    ProcessedDocument,
+)
+from app.schemas.jobs import IngestionJob
+from app.services.ingestion_queue import QueueFullError
+from app.utils.upload import UploadSizeLimitMiddleware
 
 
 @pytest.fixture
@@ -26,16 +43,36 @@ def mock_document_service():
     * mock document service for testing
     """
     mock_service = Mock()
-    mock_processed_doc = Mock(spec=ProcessedDocument)
-    mock_processed_doc.filename = "test.txt"
-    mock_processed_doc.chunks_created = 5
-    mock_processed_doc.content_type = "text/plain"
-    mock_processed_doc.created_at = None
+    mock_processed_doc = ProcessedDocument(
+        filename="test.txt", chunks_created=5, content_type="text/plain"
+    )
 
     mock_service.process_document = AsyncMock(return_value=mock_processed_doc)
     return mock_service
 
 
+@pytest.fixture
+def mock_ingestion_queue(client):
+    """
+    * mock ingestion queue injected into the upload endpoint
+    """
+    mock_queue = Mock()
+
+    async def submit(file_path, filename, content_type, content_hash=None):
+        return IngestionJob(
+            id="job-123",
+            filename=filename,
+            content_type=content_type,
+            file_path=file_path,
+            content_hash=content_hash,
+        )
+
+    mock_queue.submit = AsyncMock(side_effect=submit)
+    mock_queue.get_job = AsyncMock(return_value=None)
+    client.app.dependency_overrides[get_ingestion_queue] = lambda: mock_queue
+    return mock_queue
+
+
 @pytest.fixture
 def sample_text_file():
     """
@@ -73,73 +110,64 @@ class TestDocumentAPI:
     """
 
     def test_upload_document_success(
-        self, client, sample_text_file, mock_document_service
+        self, client, sample_text_file, mock_ingestion_queue
     ):
         """
-        * test successful single document upload
+        * test single document upload is queued and returns a job id
         """
         filename, file_content, content_type = sample_text_file
 
-        with patch(
-            "app.api.document.get_document_service", return_value=mock_document_service
-        ):
-            response = client.post(
-                "/documents/upload",
-                files={"file": (filename, file_content, content_type)},
-            )
+        response = client.post(
+            "/documents/upload",
+            files={"file": (filename, file_content, content_type)},
+        )
 
-            assert response.status_code == 201
-            data = response.json()
-            assert data["status"] == "success"
-            assert data["data"]["filename"] == "test.txt"
-            assert data["data"]["chunks_created"] == 5
-            assert data["data"]["content_type"] == "text/plain"
+        assert response.status_code == 202
+        data = response.json()
+        assert data["status"] == "accepted"
+        assert data["data"]["job_id"] == "job-123"
+        assert data["data"]["filename"] == "test.txt"
+        assert data["data"]["content_type"] == "text/plain"
+        assert data["data"]["job_status"] == "queued"
+        mock_ingestion_queue.submit.assert_awaited_once()
 
     def test_upload_document_pdf_success(
-        self, client, sample_pdf_file, mock_document_service
+        self, client, sample_pdf_file, mock_ingestion_queue
     ):
         """
-        * test successful pdf document upload
+        * test pdf document upload is queued
         """
         filename, file_content, content_type = sample_pdf_file
 
-        with patch(
-            "app.api.v1.routes.document.get_document_service",
-            return_value=mock_document_service,
-        ):
-            response = client.post(
-                "/documents/upload",
-                files={"file": (filename, file_content, content_type)},
-            )
+        response = client.post(
+            "/documents/upload",
+            files={"file": (filename, file_content, content_type)},
+        )
 
-            assert response.status_code == 201
-            data = response.json()
-            assert data["status"] == "success"
+        assert response.status_code == 202
+        data = response.json()
+        assert data["status"] == "accepted"
 
     def test_upload_document_docx_success(
-        self, client, sample_docx_file, mock_document_service
+        self, client, sample_docx_file, mock_ingestion_queue
     ):
         """
-        * test successful docx document upload
+        * test docx document upload is queued
         """
         filename, file_content, content_type = sample_docx_file
 
-        with patch(
-            "app.api.v1.routes.document.get_document_service",
-            return_value=mock_document_service,
-        ):
-            response = client.post(
-                "/documents/upload",
-                files={"file": (filename, file_content, content_type)},
-            )
+        response = client.post(
+            "/documents/upload",
+            files={"file": (filename, file_content, content_type)},
+        )
 
-            assert response.status_code == 201
-            data = response.json()
-            assert data["status"] == "success"
+        assert response.status_code == 202
+        data = response.json()
+        assert data["status"] == "accepted"
 
-    def test_upload_document_unsupported_type(self, client):
+    def test_upload_document_unsupported_type(self, client, mock_ingestion_queue):
         """
-        * test upload with unsupported file type
+        * test upload with unsupported file type is rejected before queueing
         """
         filename = "test.xyz"
         content = io.BytesIO(b"unsupported content")
@@ -152,45 +180,141 @@ class TestDocumentAPI:
         assert response.status_code == 400
         data = response.json()
         assert "unsupported file type" in data["detail"]
+        mock_ingestion_queue.submit.assert_not_awaited()
 
-    @patch("app.api.document.settings")
     def test_upload_document_file_too_large(
-        self, mock_settings, client, sample_text_file
+        self, client, sample_text_file, mock_ingestion_queue
     ):
         """
         * test upload with file size exceeding limit
         """
-        mock_settings.max_file_size = 10  # * very small limit
         filename, file_content, content_type = sample_text_file
 
-        response = client.post(
-            "/documents/upload", files={"file": (filename, file_content, content_type)}
-        )
+        with patch.object(settings, "max_file_size", 10):  # * very small limit
+            response = client.post(
+                "/documents/upload",
+                files={"file": (filename, file_content, content_type)},
+            )
 
         assert response.status_code == 413
         data = response.json()
         assert "file size exceeds" in data["detail"]
+        mock_ingestion_queue.submit.assert_not_called()
 
-    def test_upload_document_processing_error(self, client, sample_text_file):
+    def test_upload_document_queue_full(
+        self, client, sample_text_file, mock_ingestion_queue
+    ):
         """
-        * test upload when document processing fails
+        * test upload when the ingestion queue is full
         """
         filename, file_content, content_type = sample_text_file
+        mock_ingestion_queue.submit = AsyncMock(
+            side_effect=QueueFullError("ingestion queue is full")
+        )
 
-        mock_service = Mock()
-        mock_service.process_document = AsyncMock(
-            side_effect=Exception("Processing failed")
+        response = client.post(
+            "/documents/upload",
+            files={"file": (filename, file_content, content_type)},
         )
 
-        with patch("app.api.document.get_document_service", return_value=mock_service):
-            response = client.post(
-                "/documents/upload",
-                files={"file": (filename, file_content, content_type)},
-            )
+        assert response.status_code == 503
+        data = response.json()
+        assert "queue is full" in data["detail"]
+
+    def test_get_ingestion_job(self, client, mock_ingestion_queue):
+        """
+        * test job status endpoint returns per-stage progress
+        """
+        mock_ingestion_queue.get_job.return_value = IngestionJob(
+            id="job-123",
+            filename="test.pdf",
+            content_type="application/pdf",
+            file_path="/tmp/job-123.pdf",
+            status="running",
+            stage="embedding",
+            progress={
+                "extracting": {"done": 1, "total": 1},
+                "embedding": {"done": 8, "total": 20},
+            },
+        )
+
+        response = client.get("/documents/jobs/job-123")
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["status"] == "running"
+        assert data["stage"] == "embedding"
+        assert data["progress"]["embedding"] == {"done": 8, "total": 20}
+        # * the server-side upload path is not exposed
+        assert "file_path" not in data
+
+    def test_get_ingestion_job_not_found(self, client, mock_ingestion_queue):
+        """
+        * test job status endpoint with unknown job id
+        """
+        response = client.get("/documents/jobs/missing")
+
+        assert response.status_code == 404
+
+    def test_list_and_get_documents(self, client, mock_document_service):
+        """
+        * test registry-backed document listing and lookup by id
+        """
+        record = DocumentRecord(
+            doc_id=7,
+            filename="manual.pdf",
+            content_hash="hash-v1",
+            size=2048,
+            chunk_count=12,
+            status=DocumentStatus.ready,
+            created_at=datetime(2025, 1, 1),
+            updated_at=datetime(2025, 1, 1),
+        )
+        mock_document_service.list_documents = AsyncMock(
+            return_value=DocumentListResponse(total=1, documents=[record])
+        )
+        mock_document_service.get_document = AsyncMock(
+            side_effect=lambda doc_id: record if doc_id == 7 else None
+        )
+        client.app.dependency_overrides[get_document_service] = (
+            lambda: mock_document_service
+        )
+
+        listed = client.get("/documents/", params={"limit": 10})
+        found = client.get("/documents/7")
+        missing = client.get("/documents/8")
+
+        assert listed.status_code == 200
+        assert listed.json()["total"] == 1
+        assert listed.json()["documents"][0]["chunk_count"] == 12
+        mock_document_service.list_documents.assert_awaited_once_with(
+            limit=10, offset=0
+        )
+        assert found.json()["status"] == "ready"
+        assert missing.status_code == 404
+
+    def test_delete_document(self, client, mock_document_service):
+        """
+        * test deleting a document by id, unknown ids return 404
+        """
+        record = DocumentRecord(
+            doc_id=7,
+            filename="manual.pdf",
+            created_at=datetime(2025, 1, 1),
+            updated_at=datetime(2025, 1, 1),
+        )
+        mock_document_service.delete_document = AsyncMock(
+            side_effect=lambda doc_id: record if doc_id == 7 else None
+        )
+        client.app.dependency_overrides[get_document_service] = (
+            lambda: mock_document_service
+        )
+
+        response = client.delete("/documents/7")
 
-            assert response.status_code == 500
-            data = response.json()
-            assert data["detail"] == "document processing failed"
+        assert response.status_code == 200
+        assert response.json()["data"] == {"doc_id": 7, "filename": "manual.pdf"}
+        assert client.delete("/documents/8").status_code == 404
 
     def test_upload_multiple_documents_success(self, client, mock_document_service):
         """
@@ -201,21 +325,20 @@ class TestDocumentAPI:
             ("test2.txt", io.BytesIO(b"content 2"), "text/plain"),
         ]
 
-        with patch(
-            "app.api.document.get_document_service", return_value=mock_document_service
-        ):
-            response = client.post(
-                "/documents/upload-multiple",
-                files=[
-                    ("files", (name, content, ctype)) for name, content, ctype in files
-                ],
-            )
+        client.app.dependency_overrides[get_document_service] = (
+            lambda: mock_document_service
+        )
 
-            assert response.status_code == 201
-            data = response.json()
-            assert data["status"] == "completed"
-            assert data["data"]["successful_count"] == 2
-            assert data["data"]["failed_count"] == 0
+        response = client.post(
+            "/documents/upload-multiple",
+            files=[("files", (name, content, ctype)) for name, content, ctype in files],
+        )
+
+        assert response.status_code == 201
+        data = response.json()
+        assert data["status"] == "completed"
+        assert data["data"]["summary"]["successful_count"] == 2
+        assert data["data"]["summary"]["failed_count"] == 0
 
     def test_upload_multiple_documents_mixed_results(self, client):
         """
@@ -227,48 +350,52 @@ class TestDocumentAPI:
         ]
 
         mock_service = Mock()
-        mock_processed_doc = Mock(spec=ProcessedDocument)
-        mock_processed_doc.filename = "test1.txt"
-        mock_processed_doc.chunks_created = 3
-        mock_processed_doc.content_type = "text/plain"
+        mock_processed_doc = ProcessedDocument(
+            filename="test1.txt", chunks_created=3, content_type="text/plain"
+        )
         mock_service.process_document = AsyncMock(return_value=mock_processed_doc)
 
-        with patch("app.api.document.get_document_service", return_value=mock_service):
-            response = client.post(
-                "/documents/upload-multiple",
-                files=[
-                    ("files", (name, content, ctype)) for name, content, ctype in files
-                ],
-            )
+        client.app.dependency_overrides[get_document_service] = lambda: mock_service
 
-            assert response.status_code == 201
-            data = response.json()
-            assert data["data"]["successful_count"] == 1
-            assert data["data"]["failed_count"] == 1
-            assert len(data["data"]["successful"]) == 1
-            assert len(data["data"]["failed"]) == 1
+        response = client.post(
+            "/documents/upload-multiple",
+            files=[("files", (name, content, ctype)) for name, content, ctype in files],
+        )
+
+        assert response.status_code == 201
+        data = response.json()
+        assert data["data"]["summary"]["successful_count"] == 1
+        assert data["data"]["summary"]["failed_count"] == 1
+        assert len(data["data"]["successful"]) == 1
+        assert data["data"]["failed"][0]["filename"] == "test2.xyz"
 
-    @patch("app.api.document.settings")
-    def test_upload_multiple_documents_too_many_files(self, mock_settings, client):
+    def test_upload_multiple_documents_too_many_files(
+        self, client, mock_document_service
+    ):
         """
         * test multiple upload with too many files
         """
-        mock_settings.max_bulk_upload_count = 2
-
+        client.app.dependency_overrides[get_document_service] = (
+            lambda: mock_document_service
+        )
         files = [
             ("test1.txt", io.BytesIO(b"content 1"), "text/plain"),
             ("test2.txt", io.BytesIO(b"content 2"), "text/plain"),
             ("test3.txt", io.BytesIO(b"content 3"), "text/plain"),  # * exceeds limit
         ]
 
-        response = client.post(
-            "/documents/upload-multiple",
-            files=[("files", (name, content, ctype)) for name, content, ctype in files],
-        )
+        with patch.object(settings, "max_bulk_upload_count", 2):
+            response = client.post(
+                "/documents/upload-multiple",
+                files=[
+                    ("files", (name, content, ctype)) for name, content, ctype in files
+                ],
+            )
 
         assert response.status_code == 400
         data = response.json()
         assert "too many files" in data["detail"]
+        mock_document_service.process_document.assert_not_awaited()
 
     def test_upload_multiple_documents_processing_error(self, client):
         """
@@ -281,77 +408,116 @@ class TestDocumentAPI:
 
         mock_service = Mock()
         # * first call succeeds, second fails
-        mock_processed_doc = Mock(spec=ProcessedDocument)
-        mock_processed_doc.filename = "test1.txt"
-        mock_processed_doc.chunks_created = 3
-        mock_processed_doc.content_type = "text/plain"
+        mock_processed_doc = ProcessedDocument(
+            filename="test1.txt", chunks_created=3, content_type="text/plain"
+        )
 
         mock_service.process_document = AsyncMock(
             side_effect=[mock_processed_doc, Exception("Processing failed for file 2")]
         )
 
-        with patch("app.api.document.get_document_service", return_value=mock_service):
-            response = client.post(
-                "/documents/upload-multiple",
-                files=[
-                    ("files", (name, content, ctype)) for name, content, ctype in files
-                ],
+        client.app.dependency_overrides[get_document_service] = lambda: mock_service
+
+        response = client.post(
+            "/documents/upload-multiple",
+            files=[("files", (name, content, ctype)) for name, content, ctype in files],
+        )
+
+        assert response.status_code == 201
+        data = response.json()
+        assert data["data"]["summary"]["successful_count"] == 1
+        assert data["data"]["summary"]["failed_count"] == 1
+        assert "Processing failed for file 2" in data["data"]["failed"][0]["error"]
+
+    def test_upload_multiple_documents_concurrent(self, client):
+        """
+        * test bulk upload processes files concurrently under the configured bound
+        """
+        in_flight = 0
+        peak_in_flight = 0
+
+        async def process_document(file_path, filename, content_type, content_hash):
+            nonlocal in_flight, peak_in_flight
+            in_flight += 1
+            peak_in_flight = max(peak_in_flight, in_flight)
+            await asyncio.sleep(0.05)
+            in_flight -= 1
+            return ProcessedDocument(
+                filename=filename, chunks_created=2, content_type=content_type
             )
 
-            assert response.status_code == 201
-            data = response.json()
-            assert data["data"]["successful_count"] == 1
-            assert data["data"]["failed_count"] == 1
+        mock_service = Mock()
+        mock_service.process_document = AsyncMock(side_effect=process_document)
+        client.app.dependency_overrides[get_document_service] = lambda: mock_service
 
-    def test_upload_document_file_cleanup(
-        self, client, sample_text_file, mock_document_service
+        files = [
+            ("files", (f"test{i}.txt", io.BytesIO(b"content"), "text/plain"))
+            for i in range(6)
+        ]
+        with patch.object(settings, "bulk_upload_concurrency", 3):
+            response = client.post("/documents/upload-multiple", files=files)
+
+        assert response.status_code == 201
+        data = response.json()["data"]
+        assert data["summary"]["successful_count"] == 6
+        assert [item["filename"] for item in data["successful"]] == [
+            f"test{i}.txt" for i in range(6)
+        ]
+        assert peak_in_flight == 3
+
+    def test_upload_document_file_stored_for_job(
+        self, client, sample_text_file, mock_ingestion_queue
     ):
         """
-        * test that temporary files are cleaned up after processing
+        * test that the upload is stored on disk for the queued job
         """
         filename, file_content, content_type = sample_text_file
 
-        with (
-            patch(
-                "app.api.document.get_document_service",
-                return_value=mock_document_service,
-            ),
-            patch("app.api.document.os.path.exists", return_value=True) as mock_exists,
-            patch("app.api.document.os.unlink") as mock_unlink,
-        ):
-            response = client.post(
-                "/documents/upload",
-                files={"file": (filename, file_content, content_type)},
-            )
-
-            assert response.status_code == 201
-            # * verify cleanup was attempted
-            mock_exists.assert_called()
-            mock_unlink.assert_called()
+        response = client.post(
+            "/documents/upload",
+            files={"file": (filename, file_content, content_type)},
+        )
 
-    def test_upload_document_file_cleanup_on_error(self, client, sample_text_file):
+        assert response.status_code == 202
+        submit_kwargs = mock_ingestion_queue.submit.call_args.kwargs
+        stored_path = submit_kwargs["file_path"]
+        expected_hash = hashlib.sha256(
+            b"This is a test document content for upload testing."
+        ).hexdigest()
+        try:
+            assert submit_kwargs["content_hash"] == expected_hash
+            assert stored_path.endswith(".txt")
+            with open(stored_path, "rb") as f:
+                assert (
+                    f.read() == b"This is a test document content for upload testing."
+                )
+        finally:
+            os.unlink(stored_path)
+
+    def test_upload_document_file_cleanup_on_error(
+        self, client, sample_text_file, mock_ingestion_queue
+    ):
         """
-        * test that temporary files are cleaned up even when processing fails
+        * test that the stored file is cleaned up when the job cannot be queued
         """
         filename, file_content, content_type = sample_text_file
-
-        mock_service = Mock()
-        mock_service.process_document = AsyncMock(
-            side_effect=Exception("Processing failed")
+        mock_ingestion_queue.submit = AsyncMock(
+            side_effect=QueueFullError("ingestion queue is full")
         )
 
         with (
-            patch("app.api.document.get_document_service", return_value=mock_service),
-            patch("app.api.document.os.path.exists", return_value=True) as mock_exists,
-            patch("app.api.document.os.unlink") as mock_unlink,
+            patch(
+                "app.api.v1.routes.document.os.path.exists", return_value=True
+            ) as mock_exists,
+            patch("app.api.v1.routes.document.os.unlink") as mock_unlink,
         ):
             response = client.post(
                 "/documents/upload",
                 files={"file": (filename, file_content, content_type)},
             )
 
-            assert response.status_code == 500
-            # * verify cleanup was attempted even on error
+            assert response.status_code == 503
+            # * verify cleanup was attempted on error
             mock_exists.assert_called()
             mock_unlink.assert_called()
 
@@ -359,13 +525,134 @@ class TestDocumentAPI:
         """
         * test that dependency injection works properly
         """
-        with patch("app.api.document.DocumentService") as mock_service_class:
+        with patch("app.api.v1.routes.document.DocumentService") as mock_service_class:
             mock_instance = Mock()
             mock_service_class.return_value = mock_instance
 
-            from app.api.document import get_document_service
-
             service = get_document_service()
 
             assert service == mock_instance
             mock_service_class.assert_called_once()
+
+
+class TestUploadSizeLimit:
+    """
+    * test oversized uploads are rejected before the multipart body is parsed
+    """
+
+    @pytest.fixture
+    def limited_client(self, mock_ingestion_queue, client):
+        """
+        * upload routes behind the size limit middleware (1 KiB per file)
+        """
+        client.app.add_middleware(
+            UploadSizeLimitMiddleware,
+            max_file_size=1024,
+            max_files=2,
+            overhead_per_file=256,
+        )
+        return client
+
+    def test_declared_content_length_rejected_up_front(
+        self, limited_client, mock_ingestion_queue
+    ):
+        """
+        * test a content-length over the limit gets 413 without reaching the route
+        """
+        with patch("app.api.v1.routes.document.spool_upload") as mock_spool:
+            response = limited_client.post(
+                "/documents/upload",
+                files={"file": ("big.txt", io.BytesIO(b"x" * 4096), "text/plain")},
+            )
+
+        assert response.status_code == 413
+        assert "file size exceeds" in response.json()["detail"]
+        mock_spool.assert_not_called()
+        mock_ingestion_queue.submit.assert_not_called()
+
+    def test_bulk_upload_limit_scales_with_file_count(self, limited_client):
+        """
+        * test bulk uploads may carry up to max_files files of max_file_size
+        """
+        files = [
+            ("files", (f"test{i}.txt", io.BytesIO(b"x" * 1000), "text/plain"))
+            for i in range(2)
+        ]
+        with patch(
+            "app.api.v1.routes.document.DocumentService",
+            return_value=Mock(process_document=AsyncMock(return_value=None)),
+        ):
+            accepted = limited_client.post("/documents/upload-multiple", files=files)
+        rejected = limited_client.post(
+            "/documents/upload",
+            files=[("file", ("test.txt", io.BytesIO(b"x" * 2000), "text/plain"))],
+        )
+
+        assert accepted.status_code == 201
+        assert rejected.status_code == 413
+
+    @pytest.mark.asyncio
+    async def test_body_without_content_length_is_cut_off(self):
+        """
+        * test a streamed body stops being read once it crosses the limit
+        """
+        received_chunks = 0
+        sent = []
+
+        async def receive():
+            nonlocal received_chunks
+            received_chunks += 1
+            return {"type": "http.request", "body": b"x" * 1024, "more_body": True}
+
+        async def send(message):
+            sent.append(message)
+
+        async def app(scope, receive, send):
+            while (await receive())["more_body"]:
+                pass
+
+        middleware = UploadSizeLimitMiddleware(
+            app, max_file_size=4096, overhead_per_file=0
+        )
+        await middleware(
+            {
+                "type": "http",
+                "path": "/documents/upload",
+                "headers": [(b"content-type", b"multipart/form-data; boundary=x")],
+            },
+            receive,
+            send,
+        )
+
+        assert received_chunks == 5
+        assert sent[0]["status"] == 413
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("content_length", [b"abc", b"-1", b""])
+    async def test_malformed_content_length_is_rejected(self, content_length):
+        """
+        * test an unparsable content-length gets 400 instead of a server error
+        """
+        sent = []
+        app = AsyncMock()
+
+        async def send(message):
+            sent.append(message)
+
+        middleware = UploadSizeLimitMiddleware(app, max_file_size=4096)
+        await middleware(
+            {
+                "type": "http",
+                "path": "/documents/upload",
+                "headers": [
+                    (b"content-type", b"multipart/form-data; boundary=x"),
+                    (b"content-length", content_length),
+                ],
+            },
+            AsyncMock(),
+            send,
+        )
+
+        app.assert_not_awaited()
+        assert sent[0]["status"] == 400
+        assert b"content-length" in sent[1]["body"]
@@ -0,0 +1,93 @@
+import pytest
+
+from app.schemas.documents import DocumentStatus
+from app.services.document_registry import SQLiteDocumentRegistry
+
+
+class TestDocumentRegistry:
+    """
+    * test suite for the sqlite document registry
+    """
+
+    @pytest.fixture
+    def db_path(self, tmp_path):
+        return str(tmp_path / "documents.db")
+
+    @pytest.mark.asyncio
+    async def test_register_is_stable_per_filename(self, db_path):
+        """
+        * test a filename keeps its doc_id across re-ingestion
+        """
+        registry = SQLiteDocumentRegistry(db_path)
+        await registry.open()
+        doc_id = await registry.register("manual.pdf", "application/pdf")
+        assert (await registry.get(doc_id)).status == DocumentStatus.processing
+        await registry.mark_ingested(
+            doc_id, "hash-v1", 12, size=2048, embedding_model="text-embedding-004"
+        )
+
+        assert await registry.register("manual.pdf") == doc_id
+        assert await registry.register("other.pdf") != doc_id
+        record = await registry.get_by_filename("manual.pdf")
+        assert (record.content_type, record.content_hash, record.chunk_count) == (
+            "application/pdf",
+            "hash-v1",
+            12,
+        )
+        await registry.close()
+
+    @pytest.mark.asyncio
+    async def test_failed_ingestion_keeps_ingested_revision_ready(self, db_path):
+        """
+        * test a failed re-ingestion does not mark a served document failed
+        """
+        registry = SQLiteDocumentRegistry(db_path)
+        await registry.open()
+        new_id = await registry.register("new.pdf")
+        served_id = await registry.register("served.pdf")
+        await registry.mark_ingested(served_id, "hash-v1", 3)
+        await registry.register("served.pdf")
+
+        await registry.mark_failed(new_id)
+        await registry.mark_failed(served_id)
+
+        assert (await registry.get(new_id)).status == DocumentStatus.failed
+        assert (await registry.get(served_id)).status == DocumentStatus.ready
+        await registry.close()
+
+    @pytest.mark.asyncio
+    async def test_list_count_and_delete(self, db_path):
+        """
+        * test paging newest first and deleting an entry
+        """
+        registry = SQLiteDocumentRegistry(db_path)
+        await registry.open()
+        doc_ids = [await registry.register(f"doc-{i}.pdf") for i in range(3)]
+
+        assert await registry.count() == 3
+        assert [record.doc_id for record in await registry.list(limit=2)] == [
+            doc_ids[2],
+            doc_ids[1],
+        ]
+        assert await registry.delete(doc_ids[0])
+        assert not await registry.delete(doc_ids[0])
+        assert await registry.get(doc_ids[0]) is None
+        assert await registry.count() == 2
+        await registry.close()
+
+    @pytest.mark.asyncio
+    async def test_filenames_sees_other_workers(self, db_path):
+        """
+        * test doc ids registered through another connection are resolved
+        """
+        writer = SQLiteDocumentRegistry(db_path)
+        reader = SQLiteDocumentRegistry(db_path)
+        await writer.open()
+        await reader.open()
+        doc_id = await writer.register("manual.pdf")
+
+        assert reader.cached_filenames([doc_id]) == {}
+        assert await reader.filenames([doc_id, 999]) == {doc_id: "manual.pdf"}
+        assert reader.cached_filenames([doc_id]) == {doc_id: "manual.pdf"}
+        await writer.close()
+        await reader.close()
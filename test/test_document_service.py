@@ -1,12 +1,20 @@
+import asyncio
 import os
 import tempfile
 from unittest.mock import AsyncMock, Mock, patch
 
 import pytest
 from langchain_core.documents.base import Document
+from qdrant_client import QdrantClient
 
+from app.core.config import settings
+from app.core.executors import execution_layer
+from app.core.service_manager import service_manager
 from app.schemas.documents import ChunkMetadata
+from app.services.document_registry import SQLiteDocumentRegistry
 from app.services.document_service import DocumentService
+from app.services.qdrant_vector_store import QdrantVectorStore
+from app.services.single_flight import KeyedLock
 
 
 class TestDocumentService:
@@ -338,3 +346,187 @@ class TestDocumentService:
             # * only the valid chunk should remain
             assert len(chunks) == 1
             assert "Valid content" in chunks[0].content
+
+
+class TestDocumentRevisions:
+    """
+    * test suite for re-ingesting a filename (in-memory qdrant, sqlite registry)
+    """
+
+    @pytest.fixture
+    def services(self, tmp_path):
+        """
+        * register a real vector store and registry in the service manager
+        """
+
+        async def embeddings(texts):
+            return [[0.1, 0.2, 0.3, 0.4]] * len(texts)
+
+        embedding_service = Mock()
+        embedding_service.agenerate_embeddings_batch = AsyncMock(side_effect=embeddings)
+        registry = SQLiteDocumentRegistry(str(tmp_path / "documents.db"))
+        asyncio.run(registry.open())
+        with (
+            patch(
+                "app.services.qdrant_vector_store.QdrantClient",
+                return_value=QdrantClient(":memory:"),
+            ),
+            patch.object(settings, "embedding_size", 4),
+        ):
+            service_manager.vector_store = QdrantVectorStore(
+                embedding_service=embedding_service, document_registry=registry
+            )
+        service_manager.embedding_service = embedding_service
+        service_manager.answer_cache = Mock()
+        service_manager.document_registry = registry
+        service_manager.ingestion_slots = asyncio.Semaphore(2)
+        service_manager.content_locks = KeyedLock()
+        service_manager._initialized = True
+        execution_layer.start()
+
+        yield service_manager
+
+        execution_layer.shutdown()
+        asyncio.run(registry.close())
+        service_manager._initialized = False
+        service_manager.ingestion_slots = None
+        service_manager.content_locks = None
+        service_manager.vector_store = None
+        service_manager.embedding_service = None
+        service_manager.answer_cache = None
+        service_manager.document_registry = None
+
+    def _write(self, tmp_path, name: str, text: str) -> str:
+        path = tmp_path / name
+        path.write_text(text)
+        return str(path)
+
+    def _points(self, services, doc_id: int):
+        points, _ = services.vector_store.client.scroll(
+            collection_name=services.vector_store.collection_name,
+            scroll_filter=services.vector_store._document_filter("notes.txt", doc_id),
+            with_payload=True,
+            limit=100,
+        )
+        return points
+
+    @pytest.mark.asyncio
+    async def test_reupload_replaces_previous_revision(self, services, tmp_path):
+        """
+        * test uploading new content under a known filename drops the old points
+        """
+        service = DocumentService()
+        first = await service.process_document(
+            self._write(tmp_path, "v1.txt", "first revision"), "notes.txt", "text/plain"
+        )
+        second = await service.process_document(
+            self._write(tmp_path, "v2.txt", "second revision"),
+            "notes.txt",
+            "text/plain",
+        )
+
+        record = await services.document_registry.get_by_filename("notes.txt")
+        assert first.content_hash != second.content_hash
+        assert record.content_hash == second.content_hash
+        assert {
+            point.payload["content_hash"]
+            for point in self._points(services, record.doc_id)
+        } == {second.content_hash}
+
+    @pytest.mark.asyncio
+    async def test_failed_update_removes_only_new_revision(self, services, tmp_path):
+        """
+        * test a failed update keeps the served revision and forgets the new one
+        """
+        service = DocumentService()
+        vector_store = services.vector_store
+        first = await service.process_document(
+            self._write(tmp_path, "v1.txt", "first revision"), "notes.txt", "text/plain"
+        )
+        new_file = self._write(tmp_path, "v2.txt", "second revision")
+
+        # * upserts are never confirmed, the pipeline fails after writing points
+        with (
+            patch.object(settings, "pipeline_confirm_timeout", 0.1),
+            patch.object(vector_store, "count_document_chunks", return_value=0),
+        ):
+            assert (
+                await service.update_document(new_file, "notes.txt", "text/plain")
+                is None
+            )
+            assert (
+                await service.update_document(
+                    self._write(tmp_path, "v1-again.txt", "first revision"),
+                    "notes.txt",
+                    "text/plain",
+                )
+                is None
+            )
+
+        record = await services.document_registry.get_by_filename("notes.txt")
+        assert (record.content_hash, record.status) == (first.content_hash, "ready")
+        assert {
+            point.payload["content_hash"]
+            for point in self._points(services, record.doc_id)
+        } == {first.content_hash}
+
+        second = await service.process_document(new_file, "notes.txt", "text/plain")
+        assert not second.deduplicated
+
+    @pytest.mark.asyncio
+    async def test_concurrent_identical_uploads_keep_their_points(
+        self, services, tmp_path
+    ):
+        """
+        * test two filenames uploaded at once with the same bytes
+        """
+        service = DocumentService()
+        results = await asyncio.gather(
+            service.process_document(
+                self._write(tmp_path, "a.txt", "same content"), "a.txt", "text/plain"
+            ),
+            service.process_document(
+                self._write(tmp_path, "b.txt", "same content"), "b.txt", "text/plain"
+            ),
+        )
+
+        # * the second upload waits for the first and is skipped as a duplicate
+        assert sorted(result.deduplicated for result in results) == [False, True]
+        (ingested,) = [result for result in results if not result.deduplicated]
+        record = await services.document_registry.get_by_filename(ingested.filename)
+        assert record.status == "ready"
+        assert services.vector_store.count_doc_points(record.doc_id) == 1
+        assert record.chunk_count == 1
+
+    @pytest.mark.asyncio
+    async def test_update_with_other_documents_content(self, services, tmp_path):
+        """
+        * test updating a file to another file's bytes leaves that file intact
+        """
+        service = DocumentService()
+        vector_store = services.vector_store
+        registry = services.document_registry
+        shared = self._write(tmp_path, "shared.txt", "shared content")
+        await service.process_document(shared, "a.txt", "text/plain")
+        await service.process_document(
+            self._write(tmp_path, "b-v1.txt", "b content"), "b.txt", "text/plain"
+        )
+        a_id = (await registry.get_by_filename("a.txt")).doc_id
+
+        # * a failed update only removes the points b wrote
+        with (
+            patch.object(settings, "pipeline_confirm_timeout", 0.1),
+            patch.object(vector_store, "count_document_chunks", return_value=0),
+        ):
+            assert await service.update_document(shared, "b.txt", "text/plain") is None
+        assert vector_store.count_doc_points(a_id) == 1
+
+        updated = await service.update_document(shared, "b.txt", "text/plain")
+        b_id = (await registry.get_by_filename("b.txt")).doc_id
+        assert updated.chunks_created == 1
+        assert vector_store.count_doc_points(a_id) == 1
+        assert vector_store.count_doc_points(b_id) == 1
+
+        await service.delete_document(b_id)
+        assert vector_store.count_doc_points(a_id) == 1
+        assert vector_store.count_document_chunks(updated.content_hash) == 1
@@ -0,0 +1,78 @@
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+
+from app.services.embedding_cache import EmbeddingCache
+
+
+class TestEmbeddingCache:
+    """
+    * test suite for the query embedding cache
+    """
+
+    @pytest.fixture
+    def clock(self):
+        """
+        * controllable monotonic clock
+        """
+        now = [1000.0]
+        with patch("app.services.embedding_cache.time.monotonic", lambda: now[0]):
+            yield now
+
+    def test_key_is_normalized(self):
+        """
+        * test whitespace and case variants share one key
+        """
+        key = EmbeddingCache.make_key("What is  RAG?", "model", "retrieval_query")
+
+        assert key == EmbeddingCache.make_key(
+            "  what is rag? ", "model", "RETRIEVAL_QUERY"
+        )
+        assert key != EmbeddingCache.make_key(
+            "What is RAG?", "other", "retrieval_query"
+        )
+
+    def test_lru_eviction(self, clock):
+        """
+        * test the least recently used entry is evicted when full
+        """
+        cache = EmbeddingCache(max_entries=2, ttl_seconds=60)
+        cache.put("a", [1.0])
+        cache.put("b", [2.0])
+        cache.get("a")
+        cache.put("c", [3.0])
+
+        assert cache.get("b") is None
+        assert cache.get("a") == [1.0]
+        assert cache.get("c") == [3.0]
+        metrics = cache.snapshot()
+        assert metrics.evictions == 1
+        assert metrics.entries == 2
+
+    def test_ttl_expiry(self, clock):
+        """
+        * test entries expire after the ttl
+        """
+        cache = EmbeddingCache(max_entries=10, ttl_seconds=60)
+        cache.put("a", [1.0])
+
+        clock[0] += 30
+        assert cache.get("a") == [1.0]
+        clock[0] += 31
+        assert cache.get("a") is None
+
+        metrics = cache.snapshot()
+        assert (metrics.hits, metrics.misses, metrics.expirations) == (1, 1, 1)
+
+    def test_vectors_stored_as_float32(self):
+        """
+        * test vectors are kept compactly
+        """
+        cache = EmbeddingCache(max_entries=10, ttl_seconds=60)
+        cache.put("a", [0.1] * 768)
+
+        stored = cache._entries["a"][1]
+        assert stored.dtype == np.float32
+        assert stored.nbytes == 768 * 4
+        assert cache.get("a") == pytest.approx([0.1] * 768)
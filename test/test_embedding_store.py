@@ -0,0 +1,59 @@
+import pytest
+
+from app.services.embedding_store import PersistentEmbeddingStore
+
+
+class TestPersistentEmbeddingStore:
+    """
+    * test suite for the persistent embedding store
+    """
+
+    @pytest.fixture
+    def db_path(self, tmp_path):
+        return str(tmp_path / "embeddings.db")
+
+    def test_round_trip_keyed_by_model_and_task_type(self, db_path):
+        """
+        * test vectors are found only for the same model and task type
+        """
+        store = PersistentEmbeddingStore(db_path, max_bytes=0)
+        store.put_many("model-a", "retrieval_document", ["x", "y"], [[0.5], [1.5]])
+
+        assert store.get_many("model-a", "RETRIEVAL_DOCUMENT", ["y", "z", "x"]) == {
+            0: [1.5],
+            2: [0.5],
+        }
+        assert store.get_many("model-b", "retrieval_document", ["x"]) == {}
+        assert store.get_many("model-a", "retrieval_query", ["x"]) == {}
+        store.close()
+
+    def test_shared_between_connections(self, db_path):
+        """
+        * test a second connection (another worker) sees stored vectors
+        """
+        writer = PersistentEmbeddingStore(db_path, max_bytes=0)
+        reader = PersistentEmbeddingStore(db_path, max_bytes=0)
+
+        writer.put_many("model", "retrieval_document", ["x"], [[0.25]])
+
+        assert reader.get_many("model", "retrieval_document", ["x"]) == {0: [0.25]}
+        writer.close()
+        reader.close()
+
+    def test_size_based_eviction_and_compaction(self, db_path):
+        """
+        * test old rows are evicted past the size limit and compaction shrinks
+        """
+        store = PersistentEmbeddingStore(db_path, max_bytes=0)
+        texts = [f"text {i}" for i in range(2000)]
+        store.put_many("model", "retrieval_document", texts, [[0.1] * 768] * 2000)
+
+        store.max_bytes = 1024 * 1024
+        # * touching the last text keeps it recently used
+        store.get_many("model", "retrieval_document", [texts[-1]])
+        used = store.compact()
+
+        assert used <= store.max_bytes
+        assert 0 < store.count() < 2000
+        assert store.get_many("model", "retrieval_document", [texts[-1]])
+        store.close()
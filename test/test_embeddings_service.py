@@ -0,0 +1,192 @@
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import Mock, patch
+
+import pytest
+from google.genai import errors
+
+from app.core.config import settings
+from app.services.embedding_store import PersistentEmbeddingStore
+from app.services.embeddings_service import EmbeddingService
+
+
+class TestEmbeddingService:
+    """
+    * test suite for the async embedding path
+    """
+
+    @pytest.fixture
+    def embedding_service(self):
+        """
+        * embedding service with a fake async genai client
+        """
+        in_flight = {"now": 0, "peak": 0}
+
+        async def embed_content(model, contents, config):
+            in_flight["now"] += 1
+            in_flight["peak"] = max(in_flight["peak"], in_flight["now"])
+            # * later batches finish first to check ordering
+            await asyncio.sleep(0.05 / (1 + int(contents[0])))
+            in_flight["now"] -= 1
+            return SimpleNamespace(
+                embeddings=[SimpleNamespace(values=[float(text)]) for text in contents]
+            )
+
+        with patch("app.services.embeddings_service.genai.Client") as mock_client:
+            mock_client.return_value.aio.models.embed_content = Mock(
+                side_effect=embed_content
+            )
+            with (
+                patch.object(settings, "embedding_concurrency", 2),
+                patch.object(settings, "embedding_store_db", ""),
+            ):
+                service = EmbeddingService()
+            service.in_flight = in_flight
+            yield service
+
+    @pytest.mark.asyncio
+    async def test_batches_keep_input_order(self, embedding_service):
+        """
+        * test concurrent batches are reassembled in input order
+        """
+        texts = [str(i) for i in range(20)]
+
+        embeddings = await embedding_service.agenerate_embeddings_batch(
+            texts, batch_size=3
+        )
+
+        assert embeddings == [[float(i)] for i in range(20)]
+
+    @pytest.mark.asyncio
+    async def test_concurrency_is_limited(self, embedding_service):
+        """
+        * test batches run concurrently up to embedding_concurrency
+        """
+        texts = [str(i) for i in range(20)]
+
+        await embedding_service.agenerate_embeddings_batch(texts, batch_size=2)
+
+        assert embedding_service.in_flight["peak"] == 2
+
+    @pytest.mark.asyncio
+    async def test_retries_rate_limited_requests(self, embedding_service):
+        """
+        * test 429 responses are retried with backoff and counted in metrics
+        """
+        responses = [
+            errors.ClientError(429, {"error": {"message": "quota exceeded"}}),
+            errors.ServerError(503, {"error": {"message": "unavailable"}}),
+            SimpleNamespace(embeddings=[SimpleNamespace(values=[1.0])]),
+        ]
+
+        async def embed_content(model, contents, config):
+            response = responses.pop(0)
+            if isinstance(response, Exception):
+                raise response
+            return response
+
+        embedding_service.client.aio.models.embed_content = Mock(
+            side_effect=embed_content
+        )
+        with patch.object(settings, "embedding_retry_base_delay", 0.01):
+            embedding = await embedding_service.agenerate_embedding("1")
+
+        assert embedding == [1.0]
+        metrics = embedding_service.get_metrics()
+        assert metrics.requests == 1
+        assert metrics.retries == 2
+        assert metrics.failures == 0
+
+    @pytest.mark.asyncio
+    async def test_client_errors_are_not_retried(self, embedding_service):
+        """
+        * test non-retryable errors are raised immediately
+        """
+        embedding_service.client.aio.models.embed_content = Mock(
+            side_effect=errors.ClientError(400, {"error": {"message": "bad"}})
+        )
+
+        with pytest.raises(errors.ClientError):
+            await embedding_service.agenerate_embedding("1")
+
+        metrics = embedding_service.get_metrics()
+        assert metrics.retries == 0
+        assert metrics.failures == 1
+
+    @pytest.mark.asyncio
+    async def test_rejected_batches_are_split(self, embedding_service):
+        """
+        * test batches over the provider limit are split and the size shrinks
+        """
+
+        async def embed_content(model, contents, config):
+            if len(contents) > 4:
+                raise errors.ClientError(
+                    400, {"error": {"message": "At most 4 requests in one batch."}}
+                )
+            return SimpleNamespace(
+                embeddings=[SimpleNamespace(values=[float(text)]) for text in contents]
+            )
+
+        embedding_service.client.aio.models.embed_content = Mock(
+            side_effect=embed_content
+        )
+        embedding_service.batch_sizer.size = 16
+        texts = [str(i) for i in range(16)]
+
+        embeddings = await embedding_service.agenerate_embeddings_batch(texts)
+
+        assert embeddings == [[float(i)] for i in range(16)]
+        assert embedding_service.batch_sizer.size <= 8
+
+    @pytest.mark.asyncio
+    async def test_query_embeddings_are_cached(self, embedding_service):
+        """
+        * test repeated queries are served from the cache
+        """
+        first = await embedding_service.agenerate_embedding("1", "retrieval_query")
+        second = await embedding_service.agenerate_embedding(" 1 ", "RETRIEVAL_QUERY")
+
+        assert first == second == [1.0]
+        assert embedding_service.client.aio.models.embed_content.call_count == 1
+        cache_metrics = embedding_service.get_cache_metrics()
+        assert (cache_metrics.hits, cache_metrics.misses) == (1, 1)
+
+    @pytest.mark.asyncio
+    async def test_stored_embeddings_skip_the_api(self, embedding_service, tmp_path):
+        """
+        * test texts already in the persistent store are not re-embedded
+        """
+        embedding_service.store = PersistentEmbeddingStore(
+            str(tmp_path / "embeddings.db"), max_bytes=0
+        )
+        embed_content = embedding_service.client.aio.models.embed_content
+
+        first = await embedding_service.agenerate_embeddings_batch(["1", "2", "3"])
+        second = await embedding_service.agenerate_embeddings_batch(["2", "4", "3"])
+
+        assert first == [[1.0], [2.0], [3.0]]
+        assert second == [[2.0], [4.0], [3.0]]
+        sent = [
+            text for c in embed_content.call_args_list for text in c.kwargs["contents"]
+        ]
+        assert sent == ["1", "2", "3", "4"]
+        assert embedding_service.get_metrics().store_hits == 2
+        embedding_service.close()
+
+    @pytest.mark.asyncio
+    async def test_concurrent_queries_are_micro_batched(self, embedding_service):
+        """
+        * test concurrent query embeddings go out as one request
+        """
+        embeddings = await asyncio.gather(
+            *(
+                embedding_service.agenerate_embedding(str(i), "retrieval_query")
+                for i in range(5)
+            )
+        )
+
+        assert embeddings == [[float(i)] for i in range(5)]
+        embed_content = embedding_service.client.aio.models.embed_content
+        assert embed_content.call_count == 1
+        assert embed_content.call_args.kwargs["contents"] == ["0", "1", "2", "3", "4"]
@@ -0,0 +1,166 @@
+import asyncio
+import time
+from unittest.mock import AsyncMock, Mock
+
+import httpx
+import pytest
+
+from app.core.executors import execution_layer
+from app.core.service_manager import service_manager
+from app.main import app
+from app.services.document_service import DocumentService
+from app.services.single_flight import KeyedLock
+
+
+def write_text_pdf(path, num_pages: int, lines_per_page: int = 40):
+    """
+    * write a minimal multi-page text pdf (no pdf writer dependency needed)
+    """
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        None,  # * pages tree, filled in once page ids are known
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    page_ids = []
+    for page in range(num_pages):
+        lines = [
+            f"({page + 1}.{line + 1} regulation text for ingestion latency test) Tj T*"
+            for line in range(lines_per_page)
+        ]
+        stream = f"BT /F1 10 Tf 12 TL 40 760 Td {' '.join(lines)} ET".encode()
+        objects.append(
+            b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream)
+        )
+        content_id = len(objects)
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % content_id
+        )
+        page_ids.append(len(objects))
+    kids = b" ".join(b"%d 0 R" % page_id for page_id in page_ids)
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, num_pages)
+
+    body = b"%PDF-1.4\n"
+    offsets = []
+    for i, obj in enumerate(objects, start=1):
+        offsets.append(len(body))
+        body += b"%d 0 obj\n%s\nendobj\n" % (i, obj)
+    xref_offset = len(body)
+    body += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    body += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    body += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (
+        len(objects) + 1,
+        xref_offset,
+    )
+    path.write_bytes(body)
+
+
+async def slow_embeddings(texts, task_type="RETRIEVAL_DOCUMENT", batch_size=8):
+    # * async sdk call stand-in
+    await asyncio.sleep(0.5)
+    return [[0.1, 0.2, 0.3]] * len(texts)
+
+
+def slow_upsert(embeddings, payloads=None, point_ids=None, wait=True):
+    # * blocking sync qdrant call stand-in
+    time.sleep(0.5)
+
+
+class TestHealthLatency:
+    """
+    * /health must stay responsive while a large pdf is ingested
+    """
+
+    @pytest.fixture
+    def services(self):
+        """
+        * register blocking service stand-ins in the service manager
+        """
+        embedding_service = Mock()
+        embedding_service.agenerate_embeddings_batch = AsyncMock(
+            side_effect=slow_embeddings
+        )
+        vector_store = Mock()
+        upserted = []
+
+        def upsert_points(embeddings, payloads=None, point_ids=None, wait=True):
+            slow_upsert(embeddings, payloads, point_ids, wait)
+            upserted.extend(point_ids)
+
+        vector_store.count_document_chunks = Mock(side_effect=lambda *_: len(upserted))
+        vector_store.upsert_points = Mock(side_effect=upsert_points)
+
+        service_manager.embedding_service = embedding_service
+        service_manager.vector_store = vector_store
+        service_manager.llm_service = Mock()
+        service_manager.answer_cache = Mock()
+        service_manager.document_registry = AsyncMock()
+        service_manager.document_registry.register.return_value = 1
+        service_manager.ingestion_slots = asyncio.Semaphore(2)
+        service_manager.content_locks = KeyedLock()
+        service_manager._initialized = True
+        execution_layer.start()
+
+        yield
+
+        execution_layer.shutdown()
+        service_manager._initialized = False
+        service_manager.ingestion_slots = None
+        service_manager.content_locks = None
+        service_manager.embedding_service = None
+        service_manager.vector_store = None
+        service_manager.llm_service = None
+        service_manager.answer_cache = None
+        service_manager.document_registry = None
+
+    @pytest.fixture
+    def large_pdf(self, tmp_path):
+        """
+        * create a large multi-page pdf
+        """
+        path = tmp_path / "large.pdf"
+        write_text_pdf(path, num_pages=300)
+        return str(path)
+
+    @pytest.mark.asyncio
+    async def test_health_latency_flat_during_ingestion(self, services, large_pdf):
+        """
+        * test /health latency stays flat while a large pdf is ingested
+        """
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://test"
+        ) as client:
+
+            async def health_latency() -> float:
+                start = time.perf_counter()
+                response = await client.get("/health")
+                assert response.status_code == 200
+                return time.perf_counter() - start
+
+            idle_latency = max([await health_latency() for _ in range(5)])
+
+            ingest_start = time.perf_counter()
+            ingestion = asyncio.create_task(
+                DocumentService().process_document(
+                    file_path=large_pdf,
+                    filename="large.pdf",
+                    content_type="application/pdf",
+                )
+            )
+
+            latencies = []
+            while not ingestion.done():
+                latencies.append(await health_latency())
+                await asyncio.sleep(0.02)
+
+            processed_doc = await ingestion
+            ingest_time = time.perf_counter() - ingest_start
+
+        assert processed_doc is not None
+        assert processed_doc.chunks_created > 0
+        # * ingestion takes at least one embedding and one blocking upsert call
+        assert ingest_time >= 1.0
+        assert len(latencies) > 10
+        # * a blocked loop would delay /health by a full blocking call (>= 0.5s)
+        assert max(latencies) < max(0.2, idle_latency * 10)
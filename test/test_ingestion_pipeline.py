@@ -0,0 +1,224 @@
+import asyncio
+import time
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+from langchain_core.documents.base import Document
+
+from app.schemas.documents import ChunkMetadata
+from app.services.ingestion_pipeline import IngestionPipeline
+
+
+def build_chunks(documents, start_index):
+    # * one chunk per page
+    return [
+        ChunkMetadata(
+            document=doc.page_content,
+            source="test.pdf",
+            filename="test.pdf",
+            page_number=start_index + i,
+            chunk_index=start_index + i,
+            doc_id=1,
+            chunk_hash=doc.page_content,
+        )
+        for i, doc in enumerate(documents)
+    ]
+
+
+class TestIngestionPipeline:
+    """
+    * test suite for the streaming ingestion pipeline
+    """
+
+    @pytest.fixture
+    def embedding_service(self):
+        async def embeddings(texts):
+            return [[0.1, 0.2]] * len(texts)
+
+        service = Mock()
+        service.agenerate_embeddings_batch = AsyncMock(side_effect=embeddings)
+        return service
+
+    @pytest.fixture
+    def vector_store(self):
+        store = Mock()
+        store.upserted = []
+
+        def upsert_points(vectors, payloads, ids, wait=True):
+            store.upserted.extend(payloads)
+            return len(store.upserted)
+
+        store.upsert_points = Mock(side_effect=upsert_points)
+        store.count_document_chunks = Mock(side_effect=lambda *_: len(store.upserted))
+        return store
+
+    @pytest.mark.asyncio
+    async def test_upserts_before_all_pages_are_read(
+        self, embedding_service, vector_store
+    ):
+        """
+        * test batches reach the vector store while pages are still streaming
+        """
+        upserted_when_read = []
+
+        async def pages():
+            for page in range(10):
+                upserted_when_read.append(len(vector_store.upserted))
+                yield [Document(page_content=f"page {page}")]
+
+        pipeline = IngestionPipeline(
+            embedding_service=embedding_service,
+            vector_store=vector_store,
+            chunk_builder=build_chunks,
+            doc_id=1,
+            content_hash="abc",
+            batch_size=2,
+            queue_size=1,
+        )
+        stats = await pipeline.run(pages(), total_pages=10)
+
+        assert stats.pages == 10
+        assert stats.chunks == 10
+        assert stats.upserted == 10
+        assert [p["chunk"] for p in vector_store.upserted] == list(range(10))
+        # * bounded queues - the last page is read after earlier batches landed
+        assert upserted_when_read[-1] > 0
+
+    @pytest.mark.asyncio
+    async def test_embedding_overlaps_upsert(self, embedding_service, vector_store):
+        """
+        * test wall time approaches max(embed, upsert) instead of their sum
+        """
+
+        async def slow_embeddings(texts):
+            await asyncio.sleep(0.1)
+            return [[0.1, 0.2]] * len(texts)
+
+        def slow_upsert(vectors, payloads, ids, wait=True):
+            time.sleep(0.1)
+
+        embedding_service.agenerate_embeddings_batch = AsyncMock(
+            side_effect=slow_embeddings
+        )
+        vector_store.upsert_points = Mock(side_effect=slow_upsert)
+        vector_store.count_document_chunks = Mock(return_value=6)
+
+        async def pages():
+            for page in range(6):
+                yield [Document(page_content=f"page {page}")]
+
+        pipeline = IngestionPipeline(
+            embedding_service=embedding_service,
+            vector_store=vector_store,
+            chunk_builder=build_chunks,
+            doc_id=1,
+            content_hash="abc",
+            batch_size=1,
+        )
+        started = time.perf_counter()
+        stats = await pipeline.run(pages(), total_pages=6)
+        wall = time.perf_counter() - started
+
+        assert stats.embed_seconds >= 0.6
+        assert stats.upsert_seconds >= 0.6
+        # * sequential stages would take >= 1.2s (6 embeds + 6 upserts)
+        assert wall < 1.0
+        # * batches are acknowledged without waiting and never sent twice
+        waits = [c.kwargs["wait"] for c in vector_store.upsert_points.call_args_list]
+        assert waits == [False] * 6
+
+    @pytest.mark.asyncio
+    async def test_waits_until_upserts_are_applied(
+        self, embedding_service, vector_store
+    ):
+        """
+        * test the pipeline returns only once qdrant counts every chunk
+        """
+        vector_store.count_document_chunks = Mock(side_effect=[0, 2, 4])
+
+        async def pages():
+            yield [Document(page_content=f"page {page}") for page in range(4)]
+
+        pipeline = IngestionPipeline(
+            embedding_service=embedding_service,
+            vector_store=vector_store,
+            chunk_builder=build_chunks,
+            doc_id=1,
+            content_hash="abc",
+            batch_size=2,
+        )
+        stats = await pipeline.run(pages(), total_pages=1)
+
+        assert stats.upserted == 4
+        assert vector_store.upsert_points.call_count == 2
+        assert vector_store.count_document_chunks.call_count == 3
+        vector_store.count_document_chunks.assert_called_with("abc", 1)
+
+    @pytest.mark.asyncio
+    async def test_unapplied_upserts_fail_after_timeout(
+        self, embedding_service, vector_store
+    ):
+        """
+        * test upserts qdrant never applies fail the pipeline
+        """
+        vector_store.count_document_chunks = Mock(return_value=1)
+
+        async def pages():
+            yield [Document(page_content="a"), Document(page_content="b")]
+
+        pipeline = IngestionPipeline(
+            embedding_service=embedding_service,
+            vector_store=vector_store,
+            chunk_builder=build_chunks,
+            doc_id=1,
+            content_hash="abc",
+            confirm_timeout=0.2,
+        )
+        with pytest.raises(RuntimeError, match="applied 1/2 chunks"):
+            await pipeline.run(pages(), total_pages=1)
+
+    @pytest.mark.asyncio
+    async def test_known_vectors_are_reused(self, embedding_service, vector_store):
+        """
+        * test chunks with a known chunk_hash skip embedding
+        """
+
+        async def pages():
+            yield [Document(page_content="same"), Document(page_content="new")]
+
+        pipeline = IngestionPipeline(
+            embedding_service=embedding_service,
+            vector_store=vector_store,
+            chunk_builder=build_chunks,
+            doc_id=1,
+            content_hash="abc",
+            known_vectors={"same": [0.9, 0.9]},
+        )
+        stats = await pipeline.run(pages(), total_pages=1)
+
+        assert stats.embedded == 1
+        assert stats.reused == 1
+        embedding_service.agenerate_embeddings_batch.assert_awaited_once_with(["new"])
+        vectors = vector_store.upsert_points.call_args[0][0]
+        assert vectors == [[0.9, 0.9], [0.1, 0.2]]
+
+    @pytest.mark.asyncio
+    async def test_stage_failure_is_raised(self, embedding_service, vector_store):
+        """
+        * test a failing stage stops the pipeline with the original error
+        """
+        embedding_service.agenerate_embeddings_batch = AsyncMock(return_value=[])
+
+        async def pages():
+            yield [Document(page_content="page")]
+
+        pipeline = IngestionPipeline(
+            embedding_service=embedding_service,
+            vector_store=vector_store,
+            chunk_builder=build_chunks,
+            doc_id=1,
+            content_hash="abc",
+        )
+        with pytest.raises(ValueError):
+            await pipeline.run(pages(), total_pages=1)
+        vector_store.upsert_points.assert_not_called()
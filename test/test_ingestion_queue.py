@@ -0,0 +1,177 @@
+import os
+import threading
+from unittest.mock import Mock
+
+import pytest
+
+from app.schemas.documents import ProcessedDocument
+from app.schemas.jobs import IngestionJob, JobStage, JobStatus
+from app.services.ingestion_queue import IngestionQueue, QueueFullError
+from app.services.job_store import IngestionJobStore
+
+
+class FakeProcessor:
+    """
+    * document processor stand-in that reports every stage
+    """
+
+    def __init__(self, fail: bool = False):
+        self.fail = fail
+        self.calls = []
+
+    async def process_document(
+        self,
+        file_path,
+        filename,
+        content_type,
+        content_hash=None,
+        progress_callback=None,
+    ):
+        self.calls.append(filename)
+        if self.fail:
+            raise Exception("Processing failed")
+        for stage in JobStage:
+            progress_callback(stage, 3, 3)
+        return ProcessedDocument(
+            filename=filename, chunks_created=3, content_type=content_type
+        )
+
+
+class TestIngestionQueue:
+    """
+    * test suite for background ingestion queue
+    """
+
+    @pytest.fixture
+    def job_store(self, tmp_path):
+        """
+        * create sqlite job store in a temporary directory
+        """
+        store = IngestionJobStore(str(tmp_path / "jobs.db"))
+        yield store
+        store.close()
+
+    @pytest.fixture
+    def upload_file(self, tmp_path):
+        """
+        * create stored upload file
+        """
+        path = tmp_path / "upload.txt"
+        path.write_text("test content")
+        return str(path)
+
+    @pytest.mark.asyncio
+    async def test_submit_and_process_job(self, job_store, upload_file):
+        """
+        * test job runs through every stage and cleans up the stored file
+        """
+        processor = FakeProcessor()
+        queue = IngestionQueue(
+            job_store, num_workers=2, processor_factory=lambda: processor
+        )
+        await queue.start()
+
+        job = await queue.submit(upload_file, "test.txt", "text/plain")
+        await queue.join()
+        await queue.shutdown()
+
+        stored = await queue.get_job(job.id)
+        assert stored.status == JobStatus.completed
+        assert stored.chunks_created == 3
+        assert stored.stage == JobStage.upserting
+        assert set(stored.progress) == {stage.value for stage in JobStage}
+        assert not os.path.exists(upload_file)
+
+    @pytest.mark.asyncio
+    async def test_progress_writes_run_off_the_event_loop(self, job_store, upload_file):
+        """
+        * test per-batch progress writes do not block the event loop thread
+        """
+        write_threads = set()
+        update_progress = job_store.update_progress
+
+        def recording_update_progress(*args):
+            write_threads.add(threading.get_ident())
+            update_progress(*args)
+
+        job_store.update_progress = recording_update_progress
+        queue = IngestionQueue(
+            job_store, num_workers=1, processor_factory=lambda: FakeProcessor()
+        )
+        await queue.start()
+
+        await queue.submit(upload_file, "test.txt", "text/plain")
+        await queue.join()
+        await queue.shutdown()
+
+        assert write_threads
+        assert threading.get_ident() not in write_threads
+
+    @pytest.mark.asyncio
+    async def test_failed_job_records_error(self, job_store, upload_file):
+        """
+        * test processing errors mark the job as failed
+        """
+        queue = IngestionQueue(
+            job_store, num_workers=1, processor_factory=lambda: FakeProcessor(True)
+        )
+        await queue.start()
+
+        job = await queue.submit(upload_file, "test.txt", "text/plain")
+        await queue.join()
+        await queue.shutdown()
+
+        stored = await queue.get_job(job.id)
+        assert stored.status == JobStatus.failed
+        assert stored.error == "Processing failed"
+
+    @pytest.mark.asyncio
+    async def test_unfinished_jobs_recovered_on_start(self, job_store, upload_file):
+        """
+        * test queued and interrupted jobs are requeued after a restart
+        """
+        job_store.create_job(
+            IngestionJob(
+                id="queued-job",
+                filename="a.txt",
+                content_type="text/plain",
+                file_path=upload_file,
+            )
+        )
+        job_store.create_job(
+            IngestionJob(
+                id="running-job",
+                filename="b.txt",
+                content_type="text/plain",
+                file_path=upload_file,
+                status=JobStatus.running,
+            )
+        )
+
+        processor = FakeProcessor()
+        queue = IngestionQueue(
+            job_store, num_workers=1, processor_factory=lambda: processor
+        )
+        await queue.start()
+        await queue.join()
+        await queue.shutdown()
+
+        assert processor.calls == ["a.txt", "b.txt"]
+        assert (await queue.get_job("queued-job")).status == JobStatus.completed
+        assert (await queue.get_job("running-job")).status == JobStatus.completed
+
+    @pytest.mark.asyncio
+    async def test_submit_rejects_when_queue_full(self, job_store, upload_file):
+        """
+        * test bounded queue rejects new jobs when full
+        """
+        queue = IngestionQueue(
+            job_store, num_workers=0, max_queue_size=1, processor_factory=Mock()
+        )
+        await queue.start()
+
+        await queue.submit(upload_file, "a.txt", "text/plain")
+        with pytest.raises(QueueFullError):
+            await queue.submit(upload_file, "b.txt", "text/plain")
+
+        await queue.shutdown()
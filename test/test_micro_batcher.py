@@ -0,0 +1,65 @@
+import asyncio
+
+import pytest
+
+from app.services.micro_batcher import MicroBatcher
+
+
+class TestMicroBatcher:
+    """
+    * test suite for the query micro-batcher
+    """
+
+    @pytest.fixture
+    def calls(self):
+        return []
+
+    @pytest.fixture
+    def batcher(self, calls):
+        async def batch_fn(items):
+            calls.append(list(items))
+            await asyncio.sleep(0.01)
+            return [item * 10 for item in items]
+
+        return MicroBatcher(batch_fn, max_batch=4, max_wait_ms=20)
+
+    @pytest.mark.asyncio
+    async def test_concurrent_requests_share_one_call(self, batcher, calls):
+        """
+        * test concurrent submits are sent together and get their own results
+        """
+        results = await asyncio.gather(*(batcher.submit(i) for i in range(3)))
+
+        assert results == [0, 10, 20]
+        assert calls == [[0, 1, 2]]
+
+    @pytest.mark.asyncio
+    async def test_full_batch_is_sent_without_waiting(self, batcher, calls):
+        """
+        * test max_batch splits requests and flushes immediately
+        """
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        results = await asyncio.gather(*(batcher.submit(i) for i in range(8)))
+
+        assert results == [i * 10 for i in range(8)]
+        assert calls == [[0, 1, 2, 3], [4, 5, 6, 7]]
+        # * no max_wait delay for full batches
+        assert loop.time() - started < 0.02
+
+    @pytest.mark.asyncio
+    async def test_errors_reach_every_caller(self):
+        """
+        * test a failing batch call fails all of its callers
+        """
+
+        async def batch_fn(items):
+            raise RuntimeError("api down")
+
+        batcher = MicroBatcher(batch_fn, max_batch=4, max_wait_ms=1)
+
+        results = await asyncio.gather(
+            batcher.submit(1), batcher.submit(2), return_exceptions=True
+        )
+
+        assert all(isinstance(result, RuntimeError) for result in results)
@@ -0,0 +1,261 @@
+import asyncio
+from unittest.mock import Mock, patch
+
+import pytest
+from qdrant_client import QdrantClient
+
+from app.core.config import settings
+from app.schemas.documents import DocumentStatus
+from app.services.document_registry import SQLiteDocumentRegistry
+from app.services.qdrant_vector_store import QdrantVectorStore, chunk_point_id
+
+
+class TestQdrantVectorStore:
+    """
+    * test suite for qdrant vector store (in-memory qdrant)
+    """
+
+    @pytest.fixture
+    def vector_store(self, tmp_path):
+        """
+        * create vector store backed by an in-memory qdrant client
+        """
+        registry = SQLiteDocumentRegistry(str(tmp_path / "documents.db"))
+        asyncio.run(registry.open())
+        with (
+            patch(
+                "app.services.qdrant_vector_store.QdrantClient",
+                return_value=QdrantClient(":memory:"),
+            ),
+            patch.object(settings, "embedding_size", 4),
+        ):
+            yield QdrantVectorStore(
+                embedding_service=Mock(), document_registry=registry
+            )
+        asyncio.run(registry.close())
+
+    def _payloads(self, content_hash: str, count: int):
+        return [
+            {"document": f"chunk {i}", "chunk_index": i, "content_hash": content_hash}
+            for i in range(count)
+        ]
+
+    def test_chunk_point_id_is_deterministic(self):
+        """
+        * test point ids depend only on document, content hash and chunk index
+        """
+        assert chunk_point_id(1, "abc", 0) == chunk_point_id(1, "abc", 0)
+        assert chunk_point_id(1, "abc", 0) != chunk_point_id(1, "abc", 1)
+        assert chunk_point_id(1, "abc", 0) != chunk_point_id(1, "abd", 0)
+        # * identical content of two documents never shares points
+        assert chunk_point_id(1, "abc", 0) != chunk_point_id(2, "abc", 0)
+
+    def test_reingest_overwrites_points(self, vector_store):
+        """
+        * test upserting the same chunks twice does not duplicate points
+        """
+        payloads = self._payloads("hash-a", 3)
+        point_ids = [chunk_point_id(1, "hash-a", i) for i in range(3)]
+        embeddings = [[0.1, 0.2, 0.3, 0.4]] * 3
+
+        vector_store.upsert_points(embeddings, payloads, point_ids)
+        vector_store.upsert_points(embeddings, payloads, point_ids)
+
+        assert vector_store.client.count(vector_store.collection_name).count == 3
+        assert vector_store.count_document_chunks("hash-a") == 3
+        assert vector_store.count_document_chunks("hash-b") == 0
+
+    def test_get_chunk_vectors_and_delete_stale_points(self, vector_store):
+        """
+        * test incremental update helpers keyed by filename
+        """
+        old_payloads = [
+            {
+                "document": f"chunk {i}",
+                "filename": "manual.pdf",
+                "chunk_index": i,
+                "content_hash": "hash-v1",
+                "chunk_hash": f"chunk-hash-{i}",
+            }
+            for i in range(3)
+        ]
+        vector_store.upsert_points(
+            [[0.1, 0.2, 0.3, float(i)] for i in range(3)],
+            old_payloads,
+            [chunk_point_id(1, "hash-v1", i) for i in range(3)],
+        )
+
+        stored = vector_store.get_chunk_vectors("manual.pdf")
+        assert set(stored) == {"chunk-hash-0", "chunk-hash-1", "chunk-hash-2"}
+
+        # * revised version keeps two chunks and adds one
+        new_payloads = [
+            dict(payload, content_hash="hash-v2") for payload in old_payloads[:2]
+        ]
+        vector_store.upsert_points(
+            [stored["chunk-hash-0"], stored["chunk-hash-1"]],
+            new_payloads,
+            [chunk_point_id(1, "hash-v2", i) for i in range(2)],
+        )
+
+        deleted = vector_store.delete_stale_points("manual.pdf", "hash-v2")
+
+        assert deleted == 3
+        assert vector_store.count_document_chunks("hash-v1") == 0
+        assert vector_store.count_document_chunks("hash-v2") == 2
+        assert vector_store.get_chunk_vectors("other.pdf") == {}
+
+    def test_retrieve_by_vector_returns_selected_fields(self, vector_store):
+        """
+        * test retrieval returns typed chunks without unused payload fields
+        """
+        payload = {
+            "document": "chunk text",
+            "source": "/tmp/upload/manual.pdf",
+            "filename": "manual.pdf",
+            "page_number": 2,
+            "chunk_index": 7,
+            "content_hash": "hash-a",
+            "created_at": "2025-01-01T00:00:00",
+        }
+        vector_store.upsert_points(
+            [[0.1, 0.2, 0.3, 0.4]], [payload], [chunk_point_id(1, "hash-a", 7)]
+        )
+
+        (retrieved_chunk,) = vector_store.retrieve_by_vector([0.1, 0.2, 0.3, 0.4])
+
+        assert retrieved_chunk.id == chunk_point_id(1, "hash-a", 7)
+        assert retrieved_chunk.document == "chunk text"
+        assert retrieved_chunk.filename == "manual.pdf"
+        assert (retrieved_chunk.page_number, retrieved_chunk.chunk_index) == (2, 7)
+        assert "source" not in retrieved_chunk.model_dump()
+
+    @pytest.mark.asyncio
+    async def test_migrate_payloads_rewrites_legacy_points(self, vector_store):
+        """
+        * test legacy payloads become compact, versioned payloads in place
+        """
+        legacy_payloads = [
+            {
+                "document": f"chunk {i}",
+                "source": "/tmp/upload/manual.pdf",
+                "filename": "manual.pdf",
+                "page_number": 1,
+                "chunk_index": i,
+                "content_hash": "hash-a",
+                "chunk_hash": f"chunk-hash-{i}",
+                "created_at": "2025-01-01T00:00:00",
+            }
+            for i in range(3)
+        ]
+        point_ids = [chunk_point_id(1, "hash-a", i) for i in range(3)]
+        vector_store.upsert_points(
+            [[0.1, 0.2, 0.3, 0.4]] * 3, legacy_payloads, point_ids
+        )
+
+        # * pre-series points were written before content hashes existed
+        vector_store.upsert_points(
+            [[0.4, 0.3, 0.2, 0.1]] * 2,
+            [
+                {"document": f"old {i}", "filename": "old.txt", "chunk_index": i}
+                for i in range(2)
+            ],
+            [chunk_point_id(1, "old", i) for i in range(2)],
+        )
+
+        (before,) = vector_store.client.retrieve(
+            vector_store.collection_name, [point_ids[1]], with_vectors=True
+        )
+
+        assert await vector_store.migrate_payloads(batch_size=2) == 5
+        assert await vector_store.migrate_payloads() == 0
+
+        record = await vector_store.document_registry.get_by_filename("manual.pdf")
+        assert (record.content_hash, record.chunk_count) == ("hash-a", 3)
+        assert record.status == DocumentStatus.ready
+        old_record = await vector_store.document_registry.get_by_filename("old.txt")
+        assert (old_record.content_hash, old_record.chunk_count) == (None, 2)
+        assert old_record.status == DocumentStatus.ready
+        (point,) = vector_store.client.retrieve(
+            vector_store.collection_name, [point_ids[1]], with_vectors=True
+        )
+        assert point.payload == {
+            "v": 2,
+            "doc_id": record.doc_id,
+            "text": "chunk 1",
+            "page": 1,
+            "chunk": 1,
+            "content_hash": "hash-a",
+            "chunk_hash": "chunk-hash-1",
+            "ts": point.payload["ts"],
+        }
+        assert point.vector == before.vector
+
+        await vector_store.document_registry.register("old.txt")
+        await vector_store.document_registry.mark_failed(old_record.doc_id)
+        assert (
+            await vector_store.document_registry.get(old_record.doc_id)
+        ).status == DocumentStatus.ready
+
+        retrieved_chunk = vector_store.retrieve_by_vector([0.1, 0.2, 0.3, 0.4])[0]
+        assert retrieved_chunk.filename == "manual.pdf"
+        assert set(vector_store.get_chunk_vectors("manual.pdf", record.doc_id)) == {
+            f"chunk-hash-{i}" for i in range(3)
+        }
+
+    @pytest.mark.asyncio
+    async def test_delete_document_removes_every_chunk(self, vector_store):
+        """
+        * test a 10,000-chunk document is fully removed by one filtered delete
+        """
+        registry = vector_store.document_registry
+        doc_id = await registry.register("large.pdf")
+        other_id = await registry.register("other.pdf")
+        for start in range(0, 10_000, 2_500):
+            vector_store.upsert_points(
+                [[0.1, 0.2, 0.3, 0.4]] * 2_500,
+                [
+                    {"v": 2, "doc_id": doc_id, "text": "chunk", "chunk": i}
+                    for i in range(start, start + 2_500)
+                ],
+                [
+                    chunk_point_id(doc_id, "hash-large", i)
+                    for i in range(start, start + 2_500)
+                ],
+            )
+        vector_store.upsert_points(
+            [[0.1, 0.2, 0.3, 0.4]] * 5,
+            [
+                {"v": 2, "doc_id": other_id, "text": "chunk", "chunk": i}
+                for i in range(5)
+            ],
+            [chunk_point_id(other_id, "hash-other", i) for i in range(5)],
+        )
+        # * legacy point of the same document (before payload migration)
+        vector_store.upsert_points(
+            [[0.1, 0.2, 0.3, 0.4]],
+            [{"document": "chunk", "filename": "large.pdf", "chunk_index": 0}],
+        )
+        vector_store.client.scroll = Mock(side_effect=AssertionError("no scroll"))
+
+        assert vector_store.delete_document(doc_id, "large.pdf")
+
+        # * only the other document is left
+        assert vector_store.client.count(vector_store.collection_name).count == 5
+
+    def test_missing_payload_indexes_are_created(self):
+        """
+        * test startup indexes filter fields an existing collection lacks
+        """
+        client = Mock()
+        client.get_collection.return_value = Mock(payload_schema={"filename": Mock()})
+
+        with patch(
+            "app.services.qdrant_vector_store.QdrantClient", return_value=client
+        ):
+            QdrantVectorStore(embedding_service=Mock(), document_registry=Mock())
+
+        assert {
+            call.kwargs["field_name"]
+            for call in client.create_payload_index.call_args_list
+        } == {"doc_id", "content_hash"}
@@ -0,0 +1,52 @@
+from unittest.mock import patch
+
+import pytest
+
+from app.services.rate_limiter import RateLimiter, TokenBucket
+
+
+class TestRateLimiter:
+    """
+    * test suite for the embedding api rate limiter
+    """
+
+    @pytest.fixture
+    def clock(self):
+        """
+        * controllable monotonic clock
+        """
+        now = [1000.0]
+        with patch("app.services.rate_limiter.time.monotonic", lambda: now[0]):
+            yield now
+
+    def test_bucket_waits_for_refill(self, clock):
+        """
+        * test requests beyond the bucket wait for the refill rate
+        """
+        bucket = TokenBucket(rate_per_minute=60)
+
+        assert bucket.reserve(60) == 0.0
+        # * one token per second
+        assert bucket.reserve(1) == pytest.approx(1.0)
+        assert bucket.reserve(1) == pytest.approx(2.0)
+
+        clock[0] += 2.0
+        assert bucket.reserve(1) == pytest.approx(1.0)
+
+    def test_limiter_uses_the_tighter_limit(self, clock):
+        """
+        * test the token budget throttles even when requests are available
+        """
+        limiter = RateLimiter(requests_per_minute=600, tokens_per_minute=120)
+
+        assert limiter.reserve(tokens=120) == 0.0
+        # * 2 tokens per second
+        assert limiter.reserve(tokens=10) == pytest.approx(5.0)
+
+    def test_disabled_limits(self, clock):
+        """
+        * test a limit of 0 never throttles
+        """
+        limiter = RateLimiter(requests_per_minute=0, tokens_per_minute=0)
+
+        assert all(limiter.reserve(tokens=10**6) == 0.0 for _ in range(100))
@@ -0,0 +1,105 @@
+import asyncio
+
+import pytest
+
+from app.services.single_flight import KeyedLock, SingleFlight
+
+
+class TestSingleFlight:
+    """
+    * test suite for in-flight request coalescing
+    """
+
+    @pytest.fixture
+    def single_flight(self):
+        return SingleFlight()
+
+    @pytest.mark.asyncio
+    async def test_concurrent_identical_calls_run_once(self, single_flight):
+        """
+        * test concurrent callers with one key share a single run
+        """
+        runs = []
+
+        async def answer():
+            runs.append(1)
+            await asyncio.sleep(0.01)
+            return "answer"
+
+        results = await asyncio.gather(
+            *(single_flight.do("question", answer) for _ in range(5))
+        )
+
+        assert results == ["answer"] * 5
+        assert len(runs) == 1
+        metrics = single_flight.snapshot()
+        assert metrics.coalesced == 4
+        assert metrics.in_flight == 0
+
+    @pytest.mark.asyncio
+    async def test_errors_are_shared_and_not_cached(self, single_flight):
+        """
+        * test waiters get the leader's error and the next call runs again
+        """
+
+        async def fail():
+            await asyncio.sleep(0.01)
+            raise RuntimeError("llm down")
+
+        async def answer():
+            return "answer"
+
+        results = await asyncio.gather(
+            single_flight.do("question", fail),
+            single_flight.do("question", fail),
+            return_exceptions=True,
+        )
+
+        assert all(isinstance(result, RuntimeError) for result in results)
+        assert await single_flight.do("question", answer) == "answer"
+
+    @pytest.mark.asyncio
+    async def test_cancelled_leader_does_not_cancel_waiters(self, single_flight):
+        """
+        * test a disconnecting first caller does not fail the others
+        """
+
+        async def answer():
+            await asyncio.sleep(0.05)
+            return "answer"
+
+        leader = asyncio.create_task(single_flight.do("question", answer))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(single_flight.do("question", answer))
+        await asyncio.sleep(0)
+        leader.cancel()
+
+        assert await waiter == "answer"
+
+
+class TestKeyedLock:
+    """
+    * test suite for per-key locks
+    """
+
+    @pytest.mark.asyncio
+    async def test_same_key_runs_one_at_a_time(self):
+        """
+        * test callers of one key are serialized and other keys are not
+        """
+        locks = KeyedLock()
+        running = {"a": 0, "b": 0}
+        peaks = {"a": 0, "b": 0}
+
+        async def work(key):
+            async with locks.hold(key):
+                running[key] += 1
+                peaks[key] = max(peaks[key], running[key])
+                await asyncio.sleep(0.01)
+                running[key] -= 1
+
+        await asyncio.gather(work("a"), work("a"), work("b"), work("b"))
+
+        assert peaks == {"a": 1, "b": 1}
+        # * unused locks are dropped
+        assert len(locks) == 0